@@ -1,17 +1,23 @@
 import google.generativeai as genai
 import os
 from dotenv import load_dotenv
-from functools import cache
 
-@cache
-def translate_with_gemini(text: str, translated_language: str,  start_language: str='English') -> str:
+# Change model if needed
+GEMINI_MODEL = 'gemini-2.5-flash'
+# Increase whenever the prompt below (or what is cached from its answers) changes, so old translations are not reused
+PROMPT_VERSION = 2
+
+def request_gemini_translation(text: str, translated_language: str,  start_language: str) -> str:
+    '''
+    Asks Gemini to translate a song, returning its answer without caching or retrying it.
+    Songs are translated through translation_backends.GeminiBackend, which caches and retries them
+    '''
     # make sure GEMINI_API_KEY is defined in your .env file
     load_dotenv()
 
     genai.configure(api_key=os.environ["GEMINI_API_KEY"])
 
-    # Change model if needed
-    model = genai.GenerativeModel('gemini-2.5-flash')
+    model = genai.GenerativeModel(GEMINI_MODEL)
 
     prompt = f'''
 You are a song translator. For the song below, please translate the song line by line into {translated_language}.
@@ -38,9 +44,10 @@ DO NOT PROVIDE ANY OTHER OUTPUTS OTHER THAN THE SONG LINES IN THE FORMAT ABOVE
     return response.text
 
 if __name__ == '__main__':
-    print(translate_with_gemini("""What gift of grace is Jesus, my Redeemer
+    # Prints Gemini's answer to the prompt as it is
+    print(request_gemini_translation("""What gift of grace is Jesus, my Redeemer
     There is no more for Heaven now to give
     He is my joy, my righteousness, and freedom
-    My steadfast love, my deep and boundless peace""", "Chinese (Simplified)"))
+    My steadfast love, my deep and boundless peace""", "Chinese (Simplified)", "English"))
 
 
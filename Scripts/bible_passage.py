@@ -2,6 +2,7 @@ from random import choice
 import re
 from meaningless import WebExtractor # Meaningless extractor obtains necessary bible verses
 import meaningless
+import bible_store
 from meaningless.utilities.exceptions import InvalidSearchError
 import google.generativeai as genai
 import os
@@ -76,13 +77,11 @@ def bible_passage(output_translation="NIV", verse_max=2, newlines_max=4, test_mo
 
         
         try:
-            extractor = WebExtractor(translation=output_translation, output_as_list=True)
-            verse_text = extractor.search(verse_reference)
+            verse_text = bible_store.search(verse_reference, output_translation)
             break
         except meaningless.utilities.exceptions.UnsupportedTranslationError:
             print("Invalid translation entered, defaulting to specified default version")
-            extractor = WebExtractor(output_as_list=True)
-            verse_text = extractor.search(verse_reference)
+            verse_text = bible_store.search(verse_reference)
             break
         except InvalidSearchError:
             go_again = input("No text found. Would you like to try again? (Y for yes, any other key to exit)\n")
@@ -120,7 +119,7 @@ def bible_passage(output_translation="NIV", verse_max=2, newlines_max=4, test_mo
 
 def bible_passage_auto(verse_reference: str, output_translation="NIV", verse_max=2, newlines_max=4):
     '''
-    Obtains a bible passage using the meaningless extractor.
+    Obtains a bible passage using the meaningless extractor, through the chapter store in bible_store.
     The passages are split into parts, which have their size restricted by a number of verses or newlines
 
     verse_max - The max number of verses that compose a part
@@ -131,8 +130,8 @@ def bible_passage_auto(verse_reference: str, output_translation="NIV", verse_max
         return 'T'
 
     try:
-        extractor = WebExtractor(translation=output_translation, output_as_list=True)
-        verse_text = extractor.search(verse_reference)
+        # Chapters which have been read before come from the local store
+        verse_text = bible_store.search(verse_reference, output_translation)
     except InvalidSearchError:
         # make a call to GenAI to try fix the input 
         # make sure GEMINI_API_KEY is defined in your .env file
@@ -0,0 +1,157 @@
+"""
+Module for keeping the bible chapters fetched from Bible Gateway.
+
+Chapters are stored in the bible folder of the cache folder, in one JSON file for each translation which maps
+"<book> <chapter>" to the chapter's verses as meaningless' WebExtractor lists them. A passage is looked up by
+getting its chapters from the store, fetching only the chapters which are not there yet, and picking out its verses
+by their verse numbers. Passages which are read again (or are in a chapter already read) need no network requests.
+
+References which cannot be split into a book, chapters and verses (e.g. several passages at once) are searched on
+Bible Gateway directly, and are not stored.
+"""
+import json
+import os
+import re
+import threading
+from meaningless import WebExtractor
+from meaningless.utilities import common
+from meaningless.utilities.exceptions import InvalidSearchError
+from cache_utils import cache_path, atomic_write
+
+STORE_VERSION = 1
+
+# e.g. "John 3", "1 John 3:16", "John 3:16-20", "John 3:16 - 4:2", "Psalms 1-2"
+REFERENCE_PATTERN = re.compile(r'^\s*(?P<book>(?:[1-3]\s*)?[A-Za-z][A-Za-z ]*?)\s*(?P<chapter_from>\d+)(?::(?P<verse_from>\d+))?'
+                               r'(?:\s*[-–]\s*(?:(?P<chapter_to>\d+):)?(?P<to>\d+))?\s*$')
+
+# Names Bible Gateway accepts which are not the names meaningless uses
+BOOK_ALIASES = {'Psalm': 'Psalms', 'Song Of Songs': 'Song Of Solomon'}
+
+SUPERSCRIPT_DIGITS = str.maketrans('⁰¹²³⁴⁵⁶⁷⁸⁹', '0123456789')
+
+# Maps a translation to its store, each loaded from disk at most once per process
+_stores = {}
+# Passages may be looked up from several threads at once
+_lock = threading.Lock()
+
+def _store_path(translation: str) -> str:
+    return cache_path(os.path.join('bible', f'{translation.upper()}.json'))
+
+def _get_store(translation: str) -> dict:
+    translation = translation.upper()
+    if translation not in _stores:
+        try:
+            with open(_store_path(translation), encoding='utf-8') as file:
+                store = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            store = {}
+        _stores[translation] = store if store.get('version') == STORE_VERSION else {'version': STORE_VERSION, 'chapters': {}}
+    return _stores[translation]
+
+def _save_store(translation: str) -> None:
+    store = _get_store(translation)
+    atomic_write(_store_path(translation), json.dumps(store, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+def get_chapter(book: str, chapter: int, translation: str = 'NIV') -> list[str]:
+    '''
+    Returns the verses of a chapter from the store, fetching the chapter from Bible Gateway if it is not stored yet
+    '''
+    key = f'{book} {chapter}'
+    with _lock:
+        verses = _get_store(translation)['chapters'].get(key)
+    if verses is not None:
+        return verses
+
+    verses = WebExtractor(translation=translation, output_as_list=True).get_chapter(book, chapter)
+    with _lock:
+        _get_store(translation)['chapters'][key] = verses
+        _save_store(translation)
+    return verses
+
+def parse_reference(reference: str, translation: str = 'NIV') -> tuple[str, int, int, int, int] | None:
+    '''
+    Splits a reference into (book, first chapter, first verse, last chapter, last verse), where a last verse of
+    common.get_end_of_chapter() means the end of the chapter. Returns None if the reference is not a single passage
+    of a book meaningless knows
+    '''
+    match = REFERENCE_PATTERN.match(reference)
+    if match is None:
+        return None
+
+    book = re.sub(r'\s+', ' ', match['book']).strip().title()
+    book = BOOK_ALIASES.get(book, book)
+    if common.get_chapter_count(book, translation) == 0:
+        return None
+
+    chapter_from = int(match['chapter_from'])
+    end = common.get_end_of_chapter()
+    if match['verse_from'] is None:
+        # Whole chapters, e.g. "John 3" or "Psalms 1-2"
+        chapter_to = int(match['to']) if match['to'] is not None else chapter_from
+        return book, chapter_from, 1, chapter_to, end
+
+    verse_from = int(match['verse_from'])
+    if match['to'] is None:
+        return book, chapter_from, verse_from, chapter_from, verse_from
+    chapter_to = int(match['chapter_to']) if match['chapter_to'] is not None else chapter_from
+    return book, chapter_from, verse_from, chapter_to, int(match['to'])
+
+def _verse_numbers(verses: list[str]) -> list[int]:
+    '''
+    Returns the number of each verse in a chapter. The first verse of a chapter is not numbered (Bible Gateway
+    shows the chapter number instead), and neither is text which carries on the verse before it
+    '''
+    numbers = []
+    for verse in verses:
+        match = re.match(r'\s*([⁰¹²³⁴⁵⁶⁷⁸⁹]+)', verse)
+        if match is not None:
+            numbers.append(int(match[1].translate(SUPERSCRIPT_DIGITS)))
+        else:
+            numbers.append(numbers[-1] if numbers else 1)
+    return numbers
+
+def _paragraph_break(verses: list[str]) -> str:
+    '''
+    Returns the whitespace which ends a paragraph in a chapter, as found at the end of a verse which ends one
+    '''
+    for verse in verses:
+        trailing = verse[len(verse.rstrip()):]
+        if '\n' in trailing:
+            return trailing[trailing.index('\n'):]
+    return '\n'
+
+def search(reference: str, translation: str = 'NIV') -> list[str]:
+    '''
+    Returns the verses of a passage as a list, like WebExtractor(translation, output_as_list=True).search(reference).
+    Chapters are read from the store where possible
+
+    Raises InvalidSearchError if the passage does not exist
+    '''
+    passage = parse_reference(reference, translation)
+    if passage is None:
+        return WebExtractor(translation=translation, output_as_list=True).search(reference)
+
+    book, chapter_from, verse_from, chapter_to, verse_to = passage
+    chapter_to = min(chapter_to, common.get_chapter_count(book, translation))
+    passage_verses = []
+    paragraph_break = '\n'
+    for chapter in range(chapter_from, chapter_to + 1):
+        verses = get_chapter(book, chapter, translation)
+        first = verse_from if chapter == chapter_from else 1
+        last = verse_to if chapter == chapter_to else common.get_end_of_chapter()
+        chapter_verses = [verse for verse, number in zip(verses, _verse_numbers(verses)) if first <= number <= last]
+
+        if passage_verses and chapter_verses and not re.match(r'\s*[⁰¹²³⁴⁵⁶⁷⁸⁹]', chapter_verses[0]):
+            # Bible Gateway shows the chapter number instead of the first verse's number, and only splits verses at
+            # verse numbers, so a chapter's first verse carries on from the last verse before it after a blank line
+            passage_verses[-1] = passage_verses[-1].rstrip() + paragraph_break + '\n' + chapter_verses.pop(0).lstrip()
+        passage_verses += chapter_verses
+        paragraph_break = _paragraph_break(verses)
+
+    if not passage_verses:
+        raise InvalidSearchError(reference)
+
+    # Bible Gateway strips the whitespace around a passage, which inside a chapter belongs to the verses around it
+    passage_verses[0] = passage_verses[0].lstrip()
+    passage_verses[-1] = passage_verses[-1].rstrip()
+    return passage_verses
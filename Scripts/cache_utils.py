@@ -0,0 +1,41 @@
+"""
+Module containing helpers shared by the on-disk caches used when building powerpoints
+"""
+import os
+import tempfile
+
+# Global variable to store relative path information
+scripts_folder = os.path.dirname(__file__)
+cache_folder = f'{scripts_folder}/../.cache'
+
+def cache_path(file_name: str) -> str:
+    '''
+    Returns the path of a file inside the cache folder, creating the folder if needed
+    '''
+    os.makedirs(cache_folder, exist_ok=True)
+    return os.path.join(cache_folder, file_name)
+
+def file_signature(path: str) -> tuple[int, int]:
+    '''
+    Returns (modified time in nanoseconds, size in bytes) of a file.
+    Used to decide whether a cached copy of a file's contents is still valid
+    '''
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+def atomic_write(path: str, data: bytes) -> None:
+    '''
+    Writes data to a file so that readers never see a half written file.
+    The data is written to a temporary file first, which then replaces the original
+    '''
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    file_descriptor, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp_')
+    try:
+        with os.fdopen(file_descriptor, 'wb') as file:
+            file.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
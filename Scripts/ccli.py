@@ -1,57 +1,173 @@
 """
-Module for obtaining CCLI data"""
+Module for obtaining CCLI data
+
+The CCLI csv file is loaded into a CCLIIndex once per process, and loaded again only when the file changes.
+"""
 import csv
 import os
+import re
 import fuzzywuzzy
 import fuzzywuzzy.fuzz
+from fuzzywuzzy.bitparallel import lcs_length
+from cache_utils import file_signature
 from helpers import scripts_folder, get_spreadsheet_to_csv_file
 
-def find_ccli(song_title: str, ccli_file_name="ccli.csv", matching=12) -> str:
-    '''
-    Finds the required CCLI information for a song from a csv file. If no information found returns nothing
+# Lowest fuzzy score (exclusive) for part of a song name to count as a match
+MATCH_SCORE = 80
 
-    CCLI information should be provided in the same directory as this file, 
-    and the file should be organised as so:
+class CCLIIndex:
+    '''
+    Holds the rows of a CCLI csv file, organised so a song title can be looked up without rescanning the file.
 
     Song Name | Song CCLI message | Song CCLI number
+
+    Lookups give the same row as scanning the file in order: an exact match of the lowercase name first,
+    then the first row where a window of the name (matching characters long) has a partial_ratio above
+    MATCH_SCORE with the title.
+
+    - exact maps each lowercase name to its first row
+    - normalised maps each name with punctuation removed to its first row. That row is usually the fuzzy
+      match, so only the rows before it need to be searched
+    - bigrams maps each pair of adjacent characters to the rows whose names contain it. A window which
+      scores above MATCH_SCORE against a title of 3 or more characters must share a pair of adjacent
+      characters with it, so only these rows are searched
     '''
 
-    ccli_file_name = f'{scripts_folder}/{ccli_file_name}'
-    song_title = song_title.replace("(live)", "").lower().strip()
+    def __init__(self, rows, signature=None):
+        self.signature = signature
+        self.rows = []
+        self.names = []
+        self.exact = {}
+        self.normalised = {}
+        self.bigrams = {}
+        # Results of fuzzy lookups, by (title, matching)
+        self._fuzzy_results = {}
 
-    if not os.path.exists(ccli_file_name):
-        get_spreadsheet_to_csv_file(os.environ.get("CCLI_URL"), ccli_file_name)
+        for row in rows:
+            if not row:
+                continue
+            row_index = len(self.rows)
+            name = row[0].lower().strip()
+            self.rows.append(row)
+            self.names.append(name)
+            self.exact.setdefault(name, row_index)
+            self.normalised.setdefault(normalise_title(name), row_index)
+            for bigram in {name[i:i + 2] for i in range(len(name) - 1)}:
+                self.bigrams.setdefault(bigram, []).append(row_index)
+
+    @classmethod
+    def from_file(cls, ccli_file_name: str) -> 'CCLIIndex':
+        signature = file_signature(ccli_file_name)
+        with open(ccli_file_name, mode='r', newline='', encoding='utf-8') as csvfile:
+            return cls(csv.reader(csvfile), signature)
+
+    def message(self, row_index: int) -> str:
+        row = self.rows[row_index]
+        return f'{row[1]}. CCLI Song number: {row[2]}'
+
+    def _window_matches(self, row_index: int, song_title: str, matching: int, title_bigrams: set | None) -> bool:
+        '''
+        Returns True if any window of the row's name has a partial_ratio above MATCH_SCORE with the title
+        '''
+        name = self.names[row_index]
+        window_count = len(name) - matching + 1
+        shorter = min(matching, len(song_title))
+        if window_count <= 0 or not _can_match(name, song_title, shorter):
+            return False
 
-    with open(ccli_file_name, mode='r', newline='', encoding='utf-8') as csvfile:
-        reader = list(csv.reader(csvfile))
-        
-        # Iterate over each row to find an exact match first
-        for row in reader:
-            song_name = row[0].lower().strip()
-
-            # Prioritize an exact match
-            if song_title == song_name:
-                return f'{row[1]}. CCLI Song number: {row[2]}'
-        
-        # Iterate over each row for partial matches. 
-        if len(song_title) < matching:
-            # Iterate over each row for partial matches. 
-            for row in reader:
-                song_name = row[0].lower().strip()
-                # Check if there is a partial match
-                for i in range(len(song_name) - matching + 1):
-                    if fuzzywuzzy.fuzz.partial_ratio(song_name[i:i+matching], song_title) > 80:
-                        return f'{row[1]}. CCLI Song number: {row[2]}'
-
-        for row in reader:
-            song_name = row[0].lower().strip()
-            # Check if there is a match
-            for i in range(len(song_name) - matching + 1):
-                if fuzzywuzzy.fuzz.partial_ratio(song_name[i:i+matching], song_title) > 80:
-                    return f'{row[1]}. CCLI Song number: {row[2]}'
-
-    # If no match is found, return just the ccli license number
+        if title_bigrams is None:
+            windows = range(window_count)
+        else:
+            # Only windows containing a pair of characters from the title can match
+            positions = [i for i in range(len(name) - 1) if name[i:i + 2] in title_bigrams]
+            windows = sorted({start for i in positions
+                              for start in range(max(0, i - matching + 2), min(i, window_count - 1) + 1)})
+
+        for start in windows:
+            window = name[start:start + matching]
+            if not _can_match(window, song_title, shorter):
+                continue
+            if fuzzywuzzy.fuzz.partial_ratio(window, song_title) > MATCH_SCORE:
+                return True
+        return False
+
+    def fuzzy_lookup(self, song_title: str, matching: int = 12) -> int | None:
+        '''
+        Returns the first row where part of the name matches the title, or None
+        '''
+        key = (song_title, matching)
+        if key in self._fuzzy_results:
+            return self._fuzzy_results[key]
+
+        result = None
+        if song_title:
+            title_bigrams = None
+            candidates = range(len(self.rows))
+            if min(matching, len(song_title)) >= 3:
+                title_bigrams = {song_title[i:i + 2] for i in range(len(song_title) - 1)}
+                candidates = sorted({row_index for bigram in title_bigrams
+                                     for row_index in self.bigrams.get(bigram, ())})
+
+            # The row with the same normalised name usually matches, in which case only earlier rows can beat it
+            normalised_row = self.normalised.get(normalise_title(song_title))
+            if normalised_row is not None and self._window_matches(normalised_row, song_title, matching, title_bigrams):
+                result = normalised_row
+                candidates = [row_index for row_index in candidates if row_index < normalised_row]
+
+            for row_index in candidates:
+                if self._window_matches(row_index, song_title, matching, title_bigrams):
+                    result = row_index
+                    break
+
+        self._fuzzy_results[key] = result
+        return result
+
+    def lookup(self, song_title: str, matching: int = 12) -> str | None:
+        '''
+        Returns the CCLI message for a song title which has already been lowercased and stripped,
+        or None if there is no match
+        '''
+        row_index = self.exact.get(song_title)
+        if row_index is None:
+            row_index = self.fuzzy_lookup(song_title, matching)
+        if row_index is None:
+            return None
+        return self.message(row_index)
+
+# Loaded indexes, by csv file path
+_ccli_indexes = {}
+
+def normalise_title(title: str) -> str:
+    '''
+    Lowercases a title and reduces it to words separated by single spaces
+    '''
+    return ' '.join(re.findall(r'\w+', title.lower()))
+
+def _can_match(text: str, song_title: str, shorter: int) -> bool:
+    '''
+    Returns False if no window within text can have a partial_ratio above MATCH_SCORE with the title.
 
+    partial_ratio compares the shorter string (of length shorter) with parts of the longer one of at most the same
+    length. With at most L characters in common that ratio is at most 2L / (shorter + L), and L is at most the
+    longest common subsequence of the title and text. The ratio has to be at least 0.8 for a score above 80
+    '''
+    common = min(lcs_length(text, song_title), shorter)
+    return 3 * common >= 2 * shorter
+
+def get_ccli_index(ccli_file_name: str) -> CCLIIndex:
+    '''
+    Returns the index of a CCLI csv file, loading it again only if the file was modified since it was loaded
+    '''
+    index = _ccli_indexes.get(ccli_file_name)
+    if index is None or index.signature != file_signature(ccli_file_name):
+        index = CCLIIndex.from_file(ccli_file_name)
+        _ccli_indexes[ccli_file_name] = index
+    return index
+
+def licence_message(song_title: str) -> str:
+    '''
+    Message used for songs without CCLI information, giving just the CCLI license number
+    '''
     # Replace with your own CCLI license number, or use the file method below
     number = os.environ.get("CCLI_NUM")
     if number is None:
@@ -59,3 +175,47 @@ def find_ccli(song_title: str, ccli_file_name="ccli.csv", matching=12) -> str:
             number = l.read().strip()
     print(f"Warning: CCLI License number not found for {song_title}. Feel free to ignore this message if the song is in the public domain")
     return f"CCLI Licence No: {number}"
+
+def load_ccli_source(ccli_file_name="ccli.csv") -> CCLIIndex:
+    '''
+    Returns the index of the CCLI csv file in the same directory as this file, downloading the file first if it is missing.
+    Can be called ahead of time so the download happens while other information is being fetched
+    '''
+    ccli_file_name = f'{scripts_folder}/{ccli_file_name}'
+    if not os.path.exists(ccli_file_name):
+        get_spreadsheet_to_csv_file(os.environ.get("CCLI_URL"), ccli_file_name)
+    return get_ccli_index(ccli_file_name)
+
+def _ccli_title(song_title: str) -> str:
+    return song_title.replace("(live)", "").lower().strip()
+
+def find_ccli_many(song_titles, ccli_file_name="ccli.csv", matching=12) -> dict:
+    '''
+    Finds the CCLI information for several songs at once, returning a map from each title to its message.
+    The csv file is downloaded (if missing) and loaded only once for all the titles, so a whole service
+    can be looked up before any slides are made
+    '''
+
+    index = load_ccli_source(ccli_file_name)
+    messages = {}
+    for song_title in song_titles:
+        if song_title in messages:
+            continue
+        message = index.lookup(_ccli_title(song_title), matching)
+        if message is None:
+            # If no match is found, use just the ccli license number
+            message = licence_message(_ccli_title(song_title))
+        messages[song_title] = message
+    return messages
+
+def find_ccli(song_title: str, ccli_file_name="ccli.csv", matching=12) -> str:
+    '''
+    Finds the required CCLI information for a song from a csv file. If no information found returns
+    just the CCLI licence number
+
+    CCLI information should be provided in the same directory as this file,
+    and the file should be organised as so:
+
+    Song Name | Song CCLI message | Song CCLI number
+    '''
+    return find_ccli_many([song_title], ccli_file_name, matching)[song_title]
@@ -0,0 +1,81 @@
+"""
+Module for compacting the PowerPoint templates in the Templates folder.
+
+The slide builders only ever add slides with a template's blank layout, but every generated powerpoint carries all
+of its template's slides, layouts, masters and media. Compacting a template removes its slides, every slide master
+except the one holding the blank layout, and every other layout. When the template is saved again, parts which are
+no longer referenced (including media only used by the removed layouts) are left out of the file.
+
+Run with --dry-run to only report the savings, otherwise the templates are rewritten in place.
+Templates to compact can be given as arguments, by default every template is compacted.
+"""
+import sys
+from io import BytesIO
+from cache_utils import atomic_write
+from template_cache import template_paths, template_bytes, load_template
+from template_manifest import blank_layout_index
+
+def compact_template(path: str) -> bytes:
+    '''
+    Returns the contents of a template with only its blank layout, that layout's slide master and theme,
+    and the media they use
+    '''
+    prs = load_template(path)
+    index = blank_layout_index(prs)
+    if index is None:
+        raise ValueError(f"{path} does not have a blank slide layout")
+    keep_layout = prs.slide_layouts[index]
+    keep_master = keep_layout.slide_master
+
+    # Slides
+    slide_id_list = prs.slides._sldIdLst
+    for slide_id in list(slide_id_list):
+        prs.part.drop_rel(slide_id.rId)
+        slide_id_list.remove(slide_id)
+
+    # Slide masters other than the one with the blank layout
+    master_id_list = prs.slide_masters._sldMasterIdLst
+    for master_id in list(master_id_list):
+        if prs.part.related_part(master_id.rId) is not keep_master.part:
+            prs.part.drop_rel(master_id.rId)
+            master_id_list.remove(master_id)
+
+    # Layouts other than the blank one
+    for layout in list(keep_master.slide_layouts):
+        if layout.part is not keep_layout.part:
+            keep_master.slide_layouts.remove(layout)
+
+    # Only parts which can still be reached through relationships are saved
+    output = BytesIO()
+    prs.save(output)
+    return output.getvalue()
+
+def compact_templates(paths: list[str] = None, dry_run: bool = False) -> tuple[int, int]:
+    '''
+    Compacts templates, printing the savings for each one. Templates which would not get smaller are left as they are.
+    Returns the total size of the templates in bytes before and after compacting
+    '''
+    if paths is None:
+        paths = sorted(template_paths())
+
+    total_before = total_after = 0
+    for path in paths:
+        before = len(template_bytes(path))
+        compacted = compact_template(path)
+        after = min(before, len(compacted))
+        total_before += before
+        total_after += after
+
+        print(f'{path}: {before:,} -> {after:,} bytes ({before - after:,} saved)')
+        if not dry_run and len(compacted) < before:
+            atomic_write(path, compacted)
+
+    return total_before, total_after
+
+if __name__ == '__main__':
+    arguments = sys.argv[1:]
+    dry_run = '--dry-run' in arguments
+    paths = [argument for argument in arguments if argument != '--dry-run'] or None
+
+    before, after = compact_templates(paths, dry_run)
+    print(f'Total: {before:,} -> {after:,} bytes ({before - after:,} saved)')
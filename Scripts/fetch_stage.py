@@ -0,0 +1,78 @@
+"""
+Module for running the network requests of a service at the same time.
+
+Fetches which do not depend on each other (song lyrics, the CCLI csv, bible passages and translations) are run on a
+thread pool. Each service has a limit on how many of its requests can run at once, so no service is sent too many
+requests, and every fetch has to finish before an overall deadline. Fetches still running at the deadline are given
+up on, and whatever needed them falls back to doing without.
+
+The deadline only bounds how long the build waits for fetches, not how long the process runs. A fetch which has
+already started cannot be stopped, and Python waits for the pool's threads to finish before the process exits, so a
+hung request is only ended by the timeout of the library making it (e.g. the Genius client's timeout).
+"""
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+from threading import BoundedSemaphore
+from typing import Callable
+
+# Most requests each service is sent at once
+SERVICE_LIMITS = {
+    'genius': 2,
+    'ccli': 1,
+    'bible': 2,
+    # Translation backends have their own rate limits in translation_scheduler, so every song can be translated at once
+    'translation': 8,
+}
+
+# Seconds all fetches have to finish in, unless set by the FETCH_DEADLINE environment variable
+DEFAULT_DEADLINE = 300
+
+class FetchStage:
+    '''
+    Runs fetches on a thread pool, limiting the number of requests to each service and giving up on fetches
+    which have not finished by the deadline. Use as a context manager, so the pool is shut down afterwards
+    '''
+
+    def __init__(self, deadline: float = None, max_workers: int = 8, limits: dict[str, int] = None):
+        if deadline is None:
+            deadline = float(os.environ.get('FETCH_DEADLINE', DEFAULT_DEADLINE))
+        self.deadline = time.monotonic() + deadline
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='fetch')
+        self._semaphores = {service: BoundedSemaphore(limit) for service, limit in (limits or SERVICE_LIMITS).items()}
+
+    def __enter__(self) -> 'FetchStage':
+        return self
+
+    def __exit__(self, *exc_info):
+        # Fetches which have not started yet are not needed any more. Running ones cannot be stopped, and the
+        # build carries on without waiting for them, but the process still waits for them before it exits
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, service: str, function: Callable, args: tuple):
+        semaphore = self._semaphores.get(service)
+        if semaphore is None:
+            return function(*args)
+        with semaphore:
+            if time.monotonic() > self.deadline:
+                raise TimeoutError(f'The deadline passed before the {service} request could be made')
+            return function(*args)
+
+    def submit(self, service: str, function: Callable, *args) -> Future:
+        '''
+        Starts function(*args) on the pool, counting it against the limit of service
+        '''
+        return self._executor.submit(self._run, service, function, args)
+
+    def result(self, future: Future, default=None, description: str = 'fetch'):
+        '''
+        Waits (until the deadline at most) for a fetch to finish and returns its result.
+        Returns default if the fetch failed or did not finish in time, in which case it may still be running
+        '''
+        try:
+            return future.result(timeout=max(0.0, self.deadline - time.monotonic()))
+        except TimeoutError:
+            print(f"Warning: {description} did not finish before the deadline, continuing without it")
+        except Exception as e:
+            print(f"Warning: {description} failed ({e}), continuing without it")
+        return default
@@ -6,9 +6,15 @@ StringMatcher.py
 ported from python-Levenshtein
 [https://github.com/miohtama/python-Levenshtein]
 License available here: https://github.com/miohtama/python-Levenshtein/blob/master/COPYING
+
+Uses the python-Levenshtein C extension when it is installed, and the
+pure python bit-parallel versions in bitparallel.py otherwise
 """
 
-from Levenshtein import *
+try:
+    from Levenshtein import ratio, distance, editops, opcodes, matching_blocks
+except ImportError:
+    from .bitparallel import ratio, distance, editops, opcodes, matching_blocks
 from warnings import warn
 
 
@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+bitparallel.py
+
+Pure python versions of the python-Levenshtein functions used by
+StringMatcher, so the fast matcher is available without a C extension.
+
+Strings are compared with bit-parallel algorithms, where each bit of a
+python int stands for one character of the first string and a whole
+column of the dynamic programming table is updated with a few integer
+operations per character of the second string:
+
+    - ratio uses the longest common subsequence of Allison and Dix
+      (as formulated by Hyyrö), matching Levenshtein.ratio
+    - distance and editops use Myers' edit distance (as formulated by
+      Hyyrö). editops keeps every column so the alignment can be traced
+      back without building the full table
+"""
+
+from __future__ import unicode_literals
+
+
+# (string, masks) of the last pattern, since partial_ratio compares the same
+# string with many substrings in a row
+_last_pattern = (None, None)
+
+
+def _pattern_masks(s):
+    """Map each character of s to a bit mask of the positions it occurs at"""
+    global _last_pattern
+
+    last, masks = _last_pattern
+    if s == last:
+        return masks
+
+    masks = {}
+    bit = 1
+    for ch in s:
+        masks[ch] = masks.get(ch, 0) | bit
+        bit <<= 1
+    _last_pattern = (s, masks)
+    return masks
+
+
+def lcs_length(s1, s2):
+    """Length of the longest common subsequence of two strings"""
+    if not s1 or not s2:
+        return 0
+    # the python loop runs once per character of s2, so make it the shorter string
+    if len(s2) > len(s1):
+        s1, s2 = s2, s1
+
+    masks = _pattern_masks(s1)
+    all_ones = (1 << len(s1)) - 1
+    v = all_ones
+    for ch in s2:
+        u = v & masks.get(ch, 0)
+        v = ((v + u) | (v - u)) & all_ones
+    # every zero bit left in v is a character of the common subsequence
+    return len(s1) - v.bit_count()
+
+
+def ratio(s1, s2):
+    """Similarity of two strings between 0 and 1, computed like Levenshtein.ratio"""
+    lensum = len(s1) + len(s2)
+    if lensum == 0:
+        return 1.0
+    return 2.0 * lcs_length(s1, s2) / lensum
+
+
+def _distance_columns(s1, s2, keep_columns):
+    """Run Myers' algorithm with s1 as the pattern.
+
+    Returns the edit distance, and when keep_columns is True also the
+    vertical positive and negative deltas of every column. Bit i-1 of a
+    column's deltas is D[i][j] - D[i-1][j]."""
+    m = len(s1)
+    masks = _pattern_masks(s1)
+    all_ones = (1 << m) - 1
+    last_bit = 1 << (m - 1)
+
+    vp, vn = all_ones, 0
+    dist = m
+    columns = [(vp, vn)] if keep_columns else None
+    for ch in s2:
+        x = masks.get(ch, 0) | vn
+        d0 = (((x & vp) + vp) ^ vp) | x
+        hp = vn | (~(d0 | vp) & all_ones)
+        hn = vp & d0
+        if hp & last_bit:
+            dist += 1
+        elif hn & last_bit:
+            dist -= 1
+        hp = ((hp << 1) | 1) & all_ones
+        hn = (hn << 1) & all_ones
+        vp = hn | (~(d0 | hp) & all_ones)
+        vn = hp & d0
+        if keep_columns:
+            columns.append((vp, vn))
+    return dist, columns
+
+
+def distance(s1, s2):
+    """Levenshtein edit distance between two strings"""
+    if not s1:
+        return len(s2)
+    if not s2:
+        return len(s1)
+    if len(s2) > len(s1):
+        s1, s2 = s2, s1
+    return _distance_columns(s1, s2, False)[0]
+
+
+def _editops(s1, s2):
+    # the common prefix and suffix are left out of the alignment, as in python-Levenshtein
+    prefix = 0
+    while prefix < min(len(s1), len(s2)) and s1[prefix] == s2[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < min(len(s1), len(s2)) - prefix and s1[-1 - suffix] == s2[-1 - suffix]:
+        suffix += 1
+    s1 = s1[prefix:len(s1) - suffix]
+    s2 = s2[prefix:len(s2) - suffix]
+
+    ops = []
+    i, j = len(s1), len(s2)
+    if s1 and s2:
+        _, columns = _distance_columns(s1, s2, True)
+
+        # Trace the alignment back from the end, preferring deletions, then insertions, then replacements
+        # in the same order as python-Levenshtein, so both produce the same matching blocks
+        while i > 0 and j > 0:
+            if columns[j][0] >> (i - 1) & 1:
+                i -= 1
+                ops.append(('delete', prefix + i, prefix + j))
+                continue
+            j -= 1
+            if j > 0 and columns[j][1] >> (i - 1) & 1:
+                ops.append(('insert', prefix + i, prefix + j))
+                continue
+            i -= 1
+            if s1[i] != s2[j]:
+                ops.append(('replace', prefix + i, prefix + j))
+
+    while i > 0:
+        i -= 1
+        ops.append(('delete', prefix + i, prefix + j))
+    while j > 0:
+        j -= 1
+        ops.append(('insert', prefix + i, prefix + j))
+    ops.reverse()
+    return ops
+
+
+def _opcodes_from_editops(ops, len1, len2):
+    result = []
+    i = j = 0
+    k = 0
+    while k < len(ops):
+        tag, spos, dpos = ops[k]
+        if spos > i or dpos > j:
+            result.append(('equal', i, spos, j, dpos))
+            i, j = spos, dpos
+        i1, j1 = i, j
+        while k < len(ops) and ops[k] == (tag, i, j):
+            if tag != 'insert':
+                i += 1
+            if tag != 'delete':
+                j += 1
+            k += 1
+        result.append((tag, i1, i, j1, j))
+    if i < len1 or j < len2:
+        result.append(('equal', i, len1, j, len2))
+    return result
+
+
+def _editops_from_opcodes(codes):
+    ops = []
+    for tag, i1, i2, j1, j2 in codes:
+        if tag == 'replace':
+            ops.extend(('replace', i1 + k, j1 + k) for k in range(i2 - i1))
+        elif tag == 'delete':
+            ops.extend(('delete', i, j1) for i in range(i1, i2))
+        elif tag == 'insert':
+            ops.extend(('insert', i1, j) for j in range(j1, j2))
+    return ops
+
+
+def _length(s):
+    return s if isinstance(s, int) else len(s)
+
+
+def editops(*args):
+    """editops(s1, s2) or editops(opcodes, s1, s2), as in python-Levenshtein.
+
+    Returns the ('replace' | 'insert' | 'delete', spos, dpos) operations
+    which turn s1 into s2."""
+    if len(args) == 3:
+        return _editops_from_opcodes(args[0])
+    return _editops(*args)
+
+
+def opcodes(*args):
+    """opcodes(s1, s2) or opcodes(editops, s1, s2), as in python-Levenshtein.
+
+    Returns difflib style (tag, i1, i2, j1, j2) opcodes."""
+    if len(args) == 3:
+        ops, s1, s2 = args
+    else:
+        s1, s2 = args
+        ops = _editops(s1, s2)
+    return _opcodes_from_editops(ops, _length(s1), _length(s2))
+
+
+def matching_blocks(edit_operations, s1, s2):
+    """matching_blocks(editops or opcodes, s1, s2), as in python-Levenshtein.
+
+    Returns difflib style (i, j, size) matching blocks, ending with
+    (len(s1), len(s2), 0). s1 and s2 may be given as lengths."""
+    len1, len2 = _length(s1), _length(s2)
+    if edit_operations and len(edit_operations[0]) == 3:
+        edit_operations = _opcodes_from_editops(edit_operations, len1, len2)
+    elif not edit_operations:
+        edit_operations = [('equal', 0, len1, 0, len2)] if len1 else []
+
+    blocks = [(i1, j1, i2 - i1) for tag, i1, i2, j1, j2 in edit_operations if tag == 'equal' and i2 > i1]
+    blocks.append((len1, len2, 0))
+    return blocks
@@ -54,8 +54,13 @@ def partial_ratio(s1, s2):
     #   block = (1,3,3)
     #   best score === ratio("abcd", "Xbcd")
     scores = []
+    tried_starts = set()
     for block in blocks:
         long_start = block[1] - block[0] if (block[1] - block[0]) > 0 else 0
+        # blocks on the same diagonal give the same substring
+        if long_start in tried_starts:
+            continue
+        tried_starts.add(long_start)
         long_end = long_start + len(shorter)
         long_substr = longer[long_start:long_end]
 
@@ -77,6 +82,8 @@ def _process_and_sort(s, force_ascii, full_process=True):
     """Return a cleaned string with token sorted."""
     # pull tokens
     ts = utils.full_process(s, force_ascii=force_ascii) if full_process else s
+    if isinstance(ts, utils.PreparedString):
+        return ts.sorted_tokens
     tokens = ts.split()
 
     # sort tokens and join
@@ -134,8 +141,8 @@ def _token_set(s1, s2, partial=True, force_ascii=True, full_process=True):
         return 0
 
     # pull tokens
-    tokens1 = set(p1.split())
-    tokens2 = set(p2.split())
+    tokens1 = p1.token_set if isinstance(p1, utils.PreparedString) else set(p1.split())
+    tokens2 = p2.token_set if isinstance(p2, utils.PreparedString) else set(p2.split())
 
     intersection = tokens1.intersection(tokens2)
     diff1to2 = tokens1.difference(tokens2)
@@ -179,7 +186,7 @@ def partial_token_set_ratio(s1, s2, force_ascii=True, full_process=True):
 ###################
 
 # q is for quick
-def QRatio(s1, s2, force_ascii=True, full_process=True):
+def QRatio(s1, s2, force_ascii=True, full_process=True, score_cutoff=0):
     """
     Quick ratio comparison between two strings.
 
@@ -190,6 +197,7 @@ def QRatio(s1, s2, force_ascii=True, full_process=True):
     :param s2:
     :param force_ascii: Allow only ASCII characters (Default: True)
     :full_process: Process inputs, used here to avoid double processing in extract functions (Default: True)
+    :score_cutoff: Return 0 for scores below this, without computing them if their upper bound is below it (Default: 0)
     :return: similarity ratio
     """
 
@@ -205,10 +213,14 @@ def QRatio(s1, s2, force_ascii=True, full_process=True):
     if not utils.validate_string(p2):
         return 0
 
-    return ratio(p1, p2)
+    if score_cutoff > 0 and QRatio_bound(utils.prepare(p1), utils.prepare(p2), score_cutoff) < score_cutoff:
+        return 0
+
+    score = ratio(p1, p2)
+    return score if score >= score_cutoff else 0
 
 
-def UQRatio(s1, s2, full_process=True):
+def UQRatio(s1, s2, full_process=True, score_cutoff=0):
     """
     Unicode quick ratio
 
@@ -218,11 +230,11 @@ def UQRatio(s1, s2, full_process=True):
     :param s2:
     :return: similarity ratio
     """
-    return QRatio(s1, s2, force_ascii=False, full_process=full_process)
+    return QRatio(s1, s2, force_ascii=False, full_process=full_process, score_cutoff=score_cutoff)
 
 
 # w is for weighted
-def WRatio(s1, s2, force_ascii=True, full_process=True):
+def WRatio(s1, s2, force_ascii=True, full_process=True, score_cutoff=0):
     """
     Return a measure of the sequences' similarity between 0 and 100, using different algorithms.
 
@@ -249,11 +261,16 @@ def WRatio(s1, s2, force_ascii=True, full_process=True):
     #. Take the highest value from these results
        round it and return it as an integer.
 
+    The processed strings are tokenized once and shared by every ratio.
+    The ratios are worked out in order of their upper bounds, and any which
+    cannot beat the highest value so far, or reach score_cutoff, are skipped.
+
     :param s1:
     :param s2:
     :param force_ascii: Allow only ascii characters
     :type force_ascii: bool
     :full_process: Process inputs, used here to avoid double processing in extract functions (Default: True)
+    :score_cutoff: Return 0 for scores below this, stopping as soon as it cannot be reached (Default: 0)
     :return:
     """
 
@@ -274,8 +291,8 @@ def WRatio(s1, s2, force_ascii=True, full_process=True):
     unbase_scale = .95
     partial_scale = .90
 
-    base = ratio(p1, p2)
-    len_ratio = float(max(len(p1), len(p2))) / min(len(p1), len(p2))
+    len1, len2 = len(p1), len(p2)
+    len_ratio = float(max(len1, len2)) / min(len1, len2)
 
     # if strings are similar length, don't use partials
     if len_ratio < 1.5:
@@ -285,23 +302,207 @@ def WRatio(s1, s2, force_ascii=True, full_process=True):
     if len_ratio > 8:
         partial_scale = .6
 
-    if try_partial:
-        partial = partial_ratio(p1, p2) * partial_scale
-        ptsor = partial_token_sort_ratio(p1, p2, full_process=False) \
-            * unbase_scale * partial_scale
-        ptser = partial_token_set_ratio(p1, p2, full_process=False) \
-            * unbase_scale * partial_scale
-
-        return utils.intr(max(base, partial, ptsor, ptser))
+    # the lengths alone may be enough to rule out the cutoff
+    if score_cutoff > 0:
+        best_other = 100 * partial_scale if try_partial else 100 * unbase_scale
+        if utils.intr(max(_ratio_bound(min(len1, len2), len1, len2), best_other)) < score_cutoff:
+            return 0
+
+    # Counting the characters the strings share only pays off for strings which are
+    # scored many times (PreparedStrings from process) or when there is a cutoff to reach
+    count_chars = score_cutoff > 0 or \
+        (isinstance(p1, utils.PreparedString) and isinstance(p2, utils.PreparedString))
+
+    # Tokenize both strings once for every ratio below
+    p1, p2 = utils.prepare(p1), utils.prepare(p2)
+    if count_chars:
+        common = _common_char_count(p1.char_counts, p2.char_counts)
+        base_common = common + min(len1 - p1.token_length, len2 - p2.token_length)
     else:
-        tsor = token_sort_ratio(p1, p2, full_process=False) * unbase_scale
-        tser = token_set_ratio(p1, p2, full_process=False) * unbase_scale
+        # bound the ratios by the lengths alone
+        common = base_common = max(len1, len2)
 
-        return utils.intr(max(base, tsor, tser))
+    # The token ratios often compare the same strings as each other or as the base ratio,
+    # e.g. when the tokens are already sorted, so each comparison is only made once
+    compared = {}
 
+    def compare(ratio_func, a, b):
+        key = (ratio_func, a, b)
+        if key not in compared:
+            compared[key] = ratio_func(a, b)
+        return compared[key]
 
-def UWRatio(s1, s2, full_process=True):
+    # (upper bound, ratio) for each ratio, scaled as above
+    if try_partial:
+        scores = [
+            (_ratio_bound(base_common, len1, len2),
+             lambda: compare(ratio, p1, p2)),
+            (_partial_ratio_bound(base_common, len1, len2) * partial_scale,
+             lambda: compare(partial_ratio, p1, p2) * partial_scale),
+            (_token_sort_bound(p1, p2, common, True) * unbase_scale * partial_scale,
+             lambda: compare(partial_ratio, p1.sorted_tokens, p2.sorted_tokens) * unbase_scale * partial_scale),
+            (_token_set_bound(p1, p2, common, True) * unbase_scale * partial_scale,
+             lambda: _prepared_token_set(p1, p2, True, compare) * unbase_scale * partial_scale),
+        ]
+    else:
+        scores = [
+            (_ratio_bound(base_common, len1, len2),
+             lambda: compare(ratio, p1, p2)),
+            (_token_sort_bound(p1, p2, common, False) * unbase_scale,
+             lambda: compare(ratio, p1.sorted_tokens, p2.sorted_tokens) * unbase_scale),
+            (_token_set_bound(p1, p2, common, False) * unbase_scale,
+             lambda: _prepared_token_set(p1, p2, False, compare) * unbase_scale),
+        ]
+
+    scores.sort(key=lambda score: score[0], reverse=True)
+    best = 0
+    for bound, score in scores:
+        # every ratio left is at most bound
+        if bound <= best:
+            break
+        if utils.intr(bound) < score_cutoff:
+            return 0
+        best = max(best, score())
+
+    best = utils.intr(best)
+    return best if best >= score_cutoff else 0
+
+
+def UWRatio(s1, s2, full_process=True, score_cutoff=0):
     """Return a measure of the sequences' similarity between 0 and 100,
     using different algorithms. Same as WRatio but preserving unicode.
     """
-    return WRatio(s1, s2, force_ascii=False, full_process=full_process)
+    return WRatio(s1, s2, force_ascii=False, full_process=full_process, score_cutoff=score_cutoff)
+
+
+def _prepared_token_set(p1, p2, partial, compare):
+    """_token_set for two PreparedStrings which have already been processed,
+    with compare(ratio_func, s1, s2) used to run the ratio functions.
+
+    sorted_sect is the start of both combined strings, so it is all they have
+    in common with it, and the ratios against it need no matching."""
+    if p1 == p2:
+        return 100
+
+    intersection = p1.token_set & p2.token_set
+    sorted_sect = u" ".join(sorted(intersection))
+    combined_1to2 = (sorted_sect + u" " + u" ".join(sorted(p1.token_set - intersection))).strip()
+    combined_2to1 = (sorted_sect + u" " + u" ".join(sorted(p2.token_set - intersection))).strip()
+
+    pairwise = [0]
+    if sorted_sect:
+        if partial:
+            return 100
+        sect_len = len(sorted_sect)
+        for combined in (combined_1to2, combined_2to1):
+            pairwise.append(utils.intr(100 * (2.0 * sect_len / (sect_len + len(combined)))))
+
+    ratio_func = partial_ratio if partial else ratio
+    pairwise.append(compare(ratio_func, combined_1to2, combined_2to1))
+    return max(pairwise)
+
+
+######################
+# Score Upper Bounds #
+######################
+
+# Cheap upper bounds on scores, used by QRatio and WRatio to skip work which
+# cannot reach the score cutoff. They only use the lengths, character counts and
+# token sets of two PreparedStrings, and are never lower than the real score.
+#
+# Every ratio above is 2 * M / T, where M is at most the length of the longest
+# common subsequence of the two strings. That is at most the number of
+# characters the strings have in common, counted with repeats.
+
+# Allowance for the ratio of the C extension being computed in a different order
+_BOUND_EPSILON = 1e-9
+
+
+def _common_char_count(counts1, counts2):
+    if len(counts1) > len(counts2):
+        counts1, counts2 = counts2, counts1
+    get = counts2.get
+    return sum([min(n, get(ch, 0)) for ch, n in counts1.items()])
+
+
+def _ratio_bound(common, len1, len2):
+    """Upper bound of ratio for strings of these lengths with at most common characters in common"""
+    if len1 == 0 or len2 == 0:
+        return 100 if len1 == len2 else 0
+    return utils.intr(100 * (2.0 * min(common, len1, len2) / (len1 + len2)) + _BOUND_EPSILON)
+
+
+def _partial_ratio_bound(common, len1, len2):
+    """Upper bound of partial_ratio for strings of these lengths with at most common characters in common.
+
+    partial_ratio compares the shorter string, of length s, with substrings of
+    the longer one of length t <= s. With c characters in common that ratio is
+    at most 2 * min(c, t) / (s + t), which is largest at 2 * c / (s + c)."""
+    shorter = min(len1, len2)
+    if shorter == 0:
+        return 100 if len1 == len2 else 0
+    common = min(common, shorter)
+    r = 2.0 * common / (shorter + common) + _BOUND_EPSILON
+    if r > .995:
+        return 100
+    return utils.intr(100 * r)
+
+
+def _token_sort_bound(p1, p2, common, partial):
+    # the sorted tokens are joined by single spaces
+    tokens1, tokens2 = len(p1.tokens), len(p2.tokens)
+    len1 = p1.token_length + tokens1 - 1
+    len2 = p2.token_length + tokens2 - 1
+    common += min(tokens1, tokens2) - 1
+    if partial:
+        return _partial_ratio_bound(common, len1, len2)
+    return _ratio_bound(common, len1, len2)
+
+
+def _token_set_bound(p1, p2, common, partial):
+    tokens1, tokens2 = p1.token_set, p2.token_set
+    intersection = tokens1 & tokens2
+    shared = len(intersection)
+    only1, only2 = len(tokens1) - shared, len(tokens2) - shared
+
+    # lengths of sorted_1to2 and sorted_2to1, and the characters they can have in common
+    sect_chars = sum(map(len, intersection))
+    diff1 = p1.token_set_length - sect_chars + only1 - 1 if only1 else 0
+    diff2 = p2.token_set_length - sect_chars + only2 - 1 if only2 else 0
+    diff_common = common - sect_chars + min(only1, only2) - 1 if only1 and only2 else 0
+
+    if not shared:
+        # sorted_sect is empty, so only the two remainders are compared
+        if partial:
+            return _partial_ratio_bound(diff_common, diff1, diff2)
+        return _ratio_bound(diff_common, diff1, diff2)
+
+    if partial:
+        # sorted_sect is the start of both combined strings, so partial_ratio finds it
+        return 100
+
+    # sorted_sect is the start of both combined strings, so it is all they can have in common with it,
+    # and it adds exactly its length to what the combined strings have in common with each other
+    sect = sect_chars + shared - 1
+    combined1 = sect + 1 + diff1 if only1 else sect
+    combined2 = sect + 1 + diff2 if only2 else sect
+    bounds = [_ratio_bound(sect, sect, combined1), _ratio_bound(sect, sect, combined2)]
+    if only1 and only2:
+        bounds.append(_ratio_bound(sect + 1 + min(diff1, diff2, diff_common), combined1, combined2))
+    return max(bounds)
+
+
+def QRatio_bound(p1, p2, score_cutoff=0):
+    """Upper bound of QRatio(p1, p2, full_process=False) for two PreparedStrings"""
+    if not p1 or not p2:
+        return 0
+
+    len1, len2 = len(p1), len(p2)
+    bound = _ratio_bound(min(len1, len2), len1, len2)
+    if bound < score_cutoff:
+        return bound
+
+    # whitespace between the tokens can match too
+    common = _common_char_count(p1.char_counts, p2.char_counts) + \
+        min(len1 - p1.token_length, len2 - p2.token_length)
+    return _ratio_bound(common, len1, len2)
@@ -5,6 +5,7 @@ from . import utils
 import heapq
 import logging
 from functools import partial
+from itertools import repeat
 
 
 default_scorer = fuzz.WRatio
@@ -13,6 +14,78 @@ default_scorer = fuzz.WRatio
 default_processor = utils.full_process
 
 
+def _no_process(x):
+    return x
+
+
+def _prepare_if_string(x):
+    # Custom processors and scorers may work with objects other than strings
+    return utils.prepare(x) if isinstance(x, str) else x
+
+
+# Scorers which run full_process on their own inputs, and the force_ascii setting they use
+_FULL_PROCESS_SCORERS = {
+    fuzz.WRatio: True, fuzz.QRatio: True,
+    fuzz.token_set_ratio: True, fuzz.token_sort_ratio: True,
+    fuzz.partial_token_set_ratio: True, fuzz.partial_token_sort_ratio: True,
+    fuzz.UWRatio: False, fuzz.UQRatio: False,
+}
+
+# Scorers which take a score_cutoff, and skip the work for choices which cannot reach it
+_CUTOFF_SCORERS = {fuzz.WRatio, fuzz.UWRatio, fuzz.QRatio, fuzz.UQRatio}
+
+
+class PreparedChoices(object):
+    """A list or dictionary of choices which is processed once and reused across queries.
+
+    Searching the same choices many times normally runs the processor and
+    full_process on every choice for every query. PreparedChoices keeps the
+    processed form of each choice, along with its tokens, sorted tokens and
+    token set, the first time a query uses them. Every function in this
+    module accepts a PreparedChoices wherever choices are expected.
+
+    For example:
+
+        prepared = PreparedChoices(all_songs)
+        for song in songs:
+            extract(song, prepared, limit=10)
+    """
+
+    # Processed forms are kept for this many (processor, force_ascii) combinations
+    max_forms = 8
+
+    def __init__(self, choices):
+        try:
+            self.keys = list(choices.keys())
+            self.choices = [choices[key] for key in self.keys]
+        except AttributeError:
+            self.keys = None
+            self.choices = list(choices)
+        self._forms = {}
+
+    def __len__(self):
+        return len(self.choices)
+
+    def __iter__(self):
+        return iter(self.choices)
+
+    def processed(self, processor, force_ascii):
+        """Return each choice run through processor and then full_process(force_ascii),
+        or just processor if force_ascii is None. The result is computed once per combination."""
+        form_key = (processor, force_ascii)
+        forms = self._forms.get(form_key)
+        if forms is None:
+            if force_ascii is None:
+                forms = [_prepare_if_string(processor(choice)) for choice in self.choices]
+            else:
+                forms = [utils.PreparedString(utils.full_process(processor(choice), force_ascii=force_ascii), force_ascii)
+                         for choice in self.choices]
+            if len(self._forms) >= self.max_forms:
+                self._forms.pop(next(iter(self._forms)))
+            self._forms[form_key] = forms
+        return forms
+
+
 def extractWithoutOrder(query, choices, processor=default_processor, scorer=default_scorer, score_cutoff=0):
     """Select the best match in a list or dictionary of choices.
 
@@ -59,10 +132,18 @@ def extractWithoutOrder(query, choices, processor=default_processor, scorer=defa
 
         ('train', 22, 'bard'), ('man', 0, 'dog')
     """
-    # Catch generators without lengths
-    def no_process(x):
-        return x
+    for result in _extract_scored(query, choices, processor, scorer, score_cutoff):
+        yield result
+
+
+def _extract_scored(query, choices, processor, scorer, score_cutoff, limit=None):
+    """Generate the (match, score) or (match, score, key) tuples of extractWithoutOrder.
 
+    If limit is given, only the matches which could still be among the best
+    limit matches are generated: once limit matches have been found, a later
+    match has to score higher than the worst of them, as ties go to the
+    earlier match. Scorers which take a score_cutoff are given the score
+    each choice needs, so they can skip choices which cannot reach it."""
     try:
         if choices is None or len(choices) == 0:
             return
@@ -72,7 +153,7 @@ def extractWithoutOrder(query, choices, processor=default_processor, scorer=defa
     # If the processor was removed by setting it to None
     # perfom a noop as it still needs to be a function
     if processor is None:
-        processor = no_process
+        processor = _no_process
 
     # Run the processor on the input query.
     processed_query = processor(query)
@@ -83,40 +164,52 @@ def extractWithoutOrder(query, choices, processor=default_processor, scorer=defa
                         "[Query: \'{0}\']".format(query))
 
     # Don't run full_process twice
-    if scorer in [fuzz.WRatio, fuzz.QRatio,
-                  fuzz.token_set_ratio, fuzz.token_sort_ratio,
-                  fuzz.partial_token_set_ratio, fuzz.partial_token_sort_ratio,
-                  fuzz.UWRatio, fuzz.UQRatio] \
-            and processor == utils.full_process:
-        processor = no_process
+    force_ascii = _FULL_PROCESS_SCORERS.get(scorer)
+    takes_cutoff = scorer in _CUTOFF_SCORERS
+    if force_ascii is not None and processor == utils.full_process:
+        processor = _no_process
 
     # Only process the query once instead of for every choice
-    if scorer in [fuzz.UWRatio, fuzz.UQRatio]:
-        pre_processor = partial(utils.full_process, force_ascii=False)
-        scorer = partial(scorer, full_process=False)
-    elif scorer in [fuzz.WRatio, fuzz.QRatio,
-                    fuzz.token_set_ratio, fuzz.token_sort_ratio,
-                    fuzz.partial_token_set_ratio, fuzz.partial_token_sort_ratio]:
-        pre_processor = partial(utils.full_process, force_ascii=True)
+    if force_ascii is not None:
+        pre_processor = partial(utils.full_process, force_ascii=force_ascii)
         scorer = partial(scorer, full_process=False)
     else:
-        pre_processor = no_process
+        pre_processor = _no_process
     processed_query = pre_processor(processed_query)
+    processed_query = utils.PreparedString(processed_query, force_ascii) if force_ascii is not None else \
+        _prepare_if_string(processed_query)
 
-    try:
-        # See if choices is a dictionary-like object.
-        for key, choice in choices.items():
-            processed = pre_processor(processor(choice))
-            score = scorer(processed_query, processed)
-            if score >= score_cutoff:
-                yield (choice, score, key)
-    except AttributeError:
-        # It's a list; just iterate over it.
-        for choice in choices:
-            processed = pre_processor(processor(choice))
+    if not isinstance(choices, PreparedChoices):
+        choices = PreparedChoices(choices)
+
+    processed_choices = choices.processed(processor, force_ascii)
+    keys = choices.keys if choices.keys is not None else repeat(None)
+
+    # Scores of the best limit matches so far, only kept for scorers which take a score_cutoff
+    best_scores = [] if takes_cutoff and limit is not None and limit > 0 else None
+    cutoff = score_cutoff
+
+    for key, choice, processed in zip(keys, choices.choices, processed_choices):
+        if takes_cutoff:
+            score = scorer(processed_query, processed, score_cutoff=cutoff)
+        else:
             score = scorer(processed_query, processed)
-            if score >= score_cutoff:
-                yield (choice, score)
+        if score < cutoff:
+            continue
+
+        if best_scores is not None:
+            if len(best_scores) < limit:
+                heapq.heappush(best_scores, score)
+            else:
+                heapq.heapreplace(best_scores, score)
+            if len(best_scores) == limit:
+                cutoff = max(score_cutoff, best_scores[0] + 1)
+
+        if choices.keys is not None:
+            # It was a dictionary; also return the key of each match
+            yield (choice, score, key)
+        else:
+            yield (choice, score)
 
 
 def extract(query, choices, processor=default_processor, scorer=default_scorer, limit=5):
@@ -164,7 +257,7 @@ def extract(query, choices, processor=default_processor, scorer=default_scorer,
 
         [('train', 22, 'bard'), ('man', 0, 'dog')]
     """
-    sl = extractWithoutOrder(query, choices, processor, scorer)
+    sl = _extract_scored(query, choices, processor, scorer, 0, limit)
     return heapq.nlargest(limit, sl, key=lambda i: i[1]) if limit is not None else \
         sorted(sl, key=lambda i: i[1], reverse=True)
 
@@ -189,7 +282,7 @@ def extractBests(query, choices, processor=default_processor, scorer=default_sco
     Returns: A a list of (match, score) tuples.
     """
 
-    best_list = extractWithoutOrder(query, choices, processor, scorer, score_cutoff)
+    best_list = _extract_scored(query, choices, processor, scorer, score_cutoff, limit)
     return heapq.nlargest(limit, best_list, key=lambda i: i[1]) if limit is not None else \
         sorted(best_list, key=lambda i: i[1], reverse=True)
 
@@ -215,7 +308,7 @@ def extractOne(query, choices, processor=default_processor, scorer=default_score
         A tuple containing a single match and its score, if a match
         was found that was above score_cutoff. Otherwise, returns None.
     """
-    best_list = extractWithoutOrder(query, choices, processor, scorer, score_cutoff)
+    best_list = _extract_scored(query, choices, processor, scorer, score_cutoff, 1)
     try:
         return max(best_list, key=lambda i: i[1])
     except ValueError:
@@ -253,10 +346,13 @@ def dedupe(contains_dupes, threshold=70, scorer=fuzz.token_set_ratio):
 
     extractor = []
 
+    # every item is compared against every other item, so only process them once
+    prepared = contains_dupes if isinstance(contains_dupes, PreparedChoices) else PreparedChoices(contains_dupes)
+
     # iterate over items in *contains_dupes*
-    for item in contains_dupes:
+    for item in prepared:
         # return all duplicate matches found
-        matches = extract(item, contains_dupes, limit=None, scorer=scorer)
+        matches = extract(item, prepared, limit=None, scorer=scorer)
         # filter matches based on the threshold
         filtered = [x for x in matches if x[1] > threshold]
         # if there is only 1 item in *filtered*, no duplicates were found so append to *extracted*
@@ -1,6 +1,7 @@
 from __future__ import unicode_literals
 import sys
 import functools
+from collections import Counter
 
 from fuzzywuzzy.string_processing import StringProcessor
 
@@ -82,13 +83,69 @@ def make_type_consistent(s1, s2):
         return unicode(s1), unicode(s2)
 
 
+class PreparedString(str):
+    """A string which has already been through full_process.
+
+    The tokens, sorted tokens and token set of the string are computed the
+    first time they are needed and then kept, so scoring the same string
+    against many others only tokenizes it once. The character counts kept
+    alongside them are used to bound scores before computing them.
+
+    force_ascii records the full_process setting used to make the string,
+    or None if it was made some other way.
+    """
+
+    def __new__(cls, value, force_ascii=None):
+        prepared = super(PreparedString, cls).__new__(cls, value)
+        prepared.force_ascii = force_ascii
+        return prepared
+
+    @functools.cached_property
+    def tokens(self):
+        return self.split()
+
+    @functools.cached_property
+    def sorted_tokens(self):
+        return u" ".join(sorted(self.tokens)).strip()
+
+    @functools.cached_property
+    def token_set(self):
+        return frozenset(self.tokens)
+
+    @functools.cached_property
+    def char_counts(self):
+        """Number of times each character appears in the tokens"""
+        return Counter(u"".join(self.tokens))
+
+    @functools.cached_property
+    def token_length(self):
+        """Number of characters in the tokens, not counting whitespace"""
+        return sum(map(len, self.tokens))
+
+    @functools.cached_property
+    def token_set_length(self):
+        """Number of characters in the distinct tokens"""
+        return sum(map(len, self.token_set))
+
+
+def prepare(s, force_ascii=None):
+    """Wrap an already processed string so its tokens are cached"""
+    if isinstance(s, PreparedString):
+        return s
+    return PreparedString(s, force_ascii)
+
+
 def full_process(s, force_ascii=False):
     """Process string by
         -- removing all but letters and numbers
         -- trim whitespace
         -- force to lower case
-        if force_ascii == True, force convert to ascii"""
+        if force_ascii == True, force convert to ascii
+
+    Strings prepared with the same force_ascii setting are returned as is"""
 
+    if isinstance(s, PreparedString) and s.force_ascii == force_ascii:
+        return s
     if force_ascii:
         s = asciidammit(s)
     # Keep only Letters and Numbers (see Unicode docs).
@@ -8,9 +8,9 @@ import re
 import csv
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import Set
 import webbrowser
 from song_finder import fetch_lyrics
+from lyric_search import search_lyrics
 from urllib.request import urlopen
 from bs4 import BeautifulSoup
 
@@ -206,23 +206,11 @@ def is_running_in_ci():
     # Reference: https://docs.github.com/en/actions/writing-workflows/choosing-what-your-workflow-does/store-information-in-variables#default-environment-variables
     return ('CI' in os.environ and os.environ['CI']) or ('GITHUB_RUN_ID' in os.environ)
 
-def find_song_names(directory: str) -> Set[str]:
-    '''
-    Finds all unique song .txt files that could be in the directory provided as an argument  
-    '''
-    last_dirs = set()
-    for root, _, files in os.walk(directory):
-        for file in files:
-            if file.endswith('.txt'):
-                last_dir = os.path.basename(root)
-                last_dirs.add(last_dir)
-    return last_dirs
-
-
-
 def select_song(matching_songs, response=False):
     '''
     Allows the user to select a song based upon all songs that match the user's search request. 
+    Search terms starting with ~ search the song lyrics instead of the song names, and lyrics are also
+    searched when no song name matches.
     If nothing matches, the user can choose to add a new song and create a new .txt file for a new song if needed
     matching_songs - A list of all songs the user can select from
 
@@ -232,15 +220,28 @@ def select_song(matching_songs, response=False):
     while True:
         while True:
             if response:
-                search_term = input('Search for a response song (n to exit): ').lower().strip()
+                search_term = input('Search for a response song (n to exit, start with ~ to search lyrics): ').lower().strip()
             else:
-                search_term = input('Search for a song (n to exit): ').lower().strip()
+                search_term = input('Search for a song (n to exit, start with ~ to search lyrics): ').lower().strip()
 
             if search_term == 'n':
                 return False
 
+            lyrics_only = search_term.startswith('~')
+            search_term = search_term.lstrip('~').strip()
+
             # Use filter() with a lambda function to filter exact matching songs
-            filtered_songs = list(filter(lambda song: search_term in song.lower().strip(), matching_songs))
+            filtered_songs = [] if lyrics_only else list(filter(lambda song: search_term in song.lower().strip(), matching_songs))
+
+            # Fall back to searching song lyrics, which helps when only a line of the song is remembered
+            if len(filtered_songs) == 0:
+                lyric_hits = [hit for hit in search_lyrics(search_term) if hit[0] in matching_songs]
+                if lyric_hits:
+                    print("Songs containing these lyrics:")
+                    for index, (song_name, section, line) in enumerate(lyric_hits, start=1):
+                        print(f'{index}: {song_name} [{section}] "{line}"')
+                    filtered_songs = [song_name for song_name, _, _ in lyric_hits]
+                    break
 
             # if len(filtered_songs) == 0:
             #     # Use fuzzywuzzy process.extract to find matches if you enter in a typo
@@ -287,6 +288,3 @@ def select_song(matching_songs, response=False):
                     print("Invalid index. Please enter a valid index.")
             except ValueError:
                 print("Invalid input. Please enter a valid number.")
-
-if __name__ == '__main__':
-    print(find_song_names('./Songs'))
\ No newline at end of file
@@ -0,0 +1,121 @@
+"""
+Module for preparing images before they are added to slides.
+
+Images are scaled down to the size they are shown at on the slide (at TARGET_DPI) and compressed again, so a
+powerpoint does not carry images at a higher resolution than they can be shown at. Prepared images are kept in
+the images folder of the cache folder, keyed by a hash of the source image and the size they were prepared for,
+so each image is only resized once.
+
+The hash of each source image is kept in the cache folder with the image's modified time and size, so an image
+which has not changed is not read at all when its prepared copy is already in the cache.
+"""
+import atexit
+import hashlib
+import json
+import os
+from io import BytesIO
+from PIL import Image
+from pptx.util import Emu
+from cache_utils import cache_path, atomic_write, file_signature
+
+# 1920 pixels across a standard 13.33 inch wide slide
+TARGET_DPI = 144
+
+HASHES_FILE_NAME = os.path.join('images', 'source_hashes.json')
+
+# Maps an image path to [mtime, size, sha256 of its contents]. Loaded from disk at most once per process
+_source_hashes = None
+# Whether hashes have been added since the hashes file was last written
+_dirty = False
+
+def _get_source_hashes() -> dict:
+    global _source_hashes
+
+    if _source_hashes is None:
+        try:
+            with open(cache_path(HASHES_FILE_NAME), encoding='utf-8') as file:
+                _source_hashes = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            _source_hashes = {}
+    return _source_hashes
+
+def save_source_hashes() -> None:
+    '''
+    Writes the hashes of source images if any have been added. Called when the process exits
+    '''
+    global _dirty
+
+    if _dirty:
+        atomic_write(cache_path(HASHES_FILE_NAME), json.dumps(_source_hashes).encode('utf-8'))
+        _dirty = False
+
+atexit.register(save_source_hashes)
+
+def _read_image(path: str) -> bytes:
+    with open(path, 'rb') as file:
+        return file.read()
+
+def _source_hash(path: str) -> tuple[str, bytes | None]:
+    '''
+    Returns the sha256 of an image, and its contents if they had to be read to hash it (otherwise None).
+    The image is only read if it changed since it was last hashed
+    '''
+    global _dirty
+
+    signature = file_signature(path)
+    source_hashes = _get_source_hashes()
+    cached = source_hashes.get(path)
+    if cached is not None and (cached[0], cached[1]) == signature:
+        return cached[2], None
+
+    data = _read_image(path)
+    digest = hashlib.sha256(data).hexdigest()
+    source_hashes[path] = [signature[0], signature[1], digest]
+    _dirty = True
+    return digest, data
+
+def target_pixels(width: int, height: int, dpi: int = TARGET_DPI) -> tuple[int, int]:
+    '''
+    Returns the number of pixels needed to show an image in a box of the given size (in EMU) at dpi
+    '''
+    return max(1, round(Emu(width).inches * dpi)), max(1, round(Emu(height).inches * dpi))
+
+def _resize(data: bytes, pixels: tuple[int, int]) -> bytes:
+    '''
+    Scales an image down to at most the given number of pixels and compresses it again as a png.
+    Images are stretched to fill their box on the slide, so each side is scaled separately
+    '''
+    with Image.open(BytesIO(data)) as image:
+        width = min(image.width, pixels[0])
+        height = min(image.height, pixels[1])
+        if (width, height) != image.size:
+            image = image.resize((width, height), Image.LANCZOS)
+        output = BytesIO()
+        image.save(output, 'PNG', optimize=True)
+    return output.getvalue()
+
+def prepared_image(path: str, width: int, height: int, dpi: int = TARGET_DPI) -> BytesIO:
+    '''
+    Returns the image to add to a slide for a box of the given size (in EMU), ready to be passed to add_picture.
+    The original image is used if preparing it would not make it smaller
+
+    Raises PIL.UnidentifiedImageError if the file is not an image
+    '''
+    path = os.path.normpath(os.path.abspath(path))
+    digest, data = _source_hash(path)
+
+    pixels = target_pixels(width, height, dpi)
+    prepared_path = cache_path(os.path.join('images', f'{digest}_{pixels[0]}x{pixels[1]}.png'))
+    try:
+        with open(prepared_path, 'rb') as file:
+            prepared = file.read()
+    except FileNotFoundError:
+        if data is None:
+            data = _read_image(path)
+        prepared = _resize(data, pixels)
+        if len(prepared) >= len(data):
+            # Store the original so it is not resized again next time
+            prepared = data
+        atomic_write(prepared_path, prepared)
+
+    return BytesIO(prepared)
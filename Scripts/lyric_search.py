@@ -0,0 +1,128 @@
+"""
+Module for searching the lyrics of every song in the Songs folder.
+
+Each lyrics line is stored in a SQLite FTS5 table in the cache folder along with its song title and section title.
+Only the lyrics lines are searched; the titles are stored to be shown with the results.
+The table is brought up to date using the song library index, so only songs which changed are indexed again.
+"""
+import os
+import re
+import sqlite3
+import sys
+from contextlib import closing
+from cache_utils import cache_path
+from song_library import get_song_index, songs_folder
+from song_parser import stream_song
+
+DATABASE_FILE_NAME = 'lyrics_search.sqlite3'
+SCHEMA_VERSION = 2
+
+# The index only needs to be checked against the song library once per process
+_index_checked = False
+
+def _connect() -> sqlite3.Connection:
+    connection = sqlite3.connect(cache_path(DATABASE_FILE_NAME))
+    version = connection.execute('PRAGMA user_version').fetchone()[0]
+    if version != SCHEMA_VERSION:
+        connection.executescript(f'''
+            DROP TABLE IF EXISTS songs;
+            DROP TABLE IF EXISTS lyric_lines;
+            CREATE TABLE songs (name TEXT PRIMARY KEY, mtime INTEGER, size INTEGER, first_row INTEGER, last_row INTEGER);
+            CREATE VIRTUAL TABLE lyric_lines USING fts5(name UNINDEXED, title UNINDEXED, section UNINDEXED, line,
+                                                        tokenize='unicode61 remove_diacritics 2');
+            PRAGMA user_version = {SCHEMA_VERSION};
+        ''')
+    return connection
+
+def _index_song(connection: sqlite3.Connection, name: str, entry: dict) -> None:
+    '''
+    Adds every lyrics line of a song to the search table. A song's lines are given consecutive row ids
+    so they can be removed with a single range delete when the song changes
+    '''
+    first_row = connection.execute('SELECT coalesce(max(rowid), 0) + 1 FROM lyric_lines').fetchone()[0]
+    rows = []
+    with open(os.path.join(songs_folder, name, entry['lyrics_file']), encoding='utf-8') as file:
+        title, _, sections = stream_song(file, max_lines=sys.maxsize)
+        for section_title, lines in sections:
+            for line in lines:
+                if line:
+                    rows.append((first_row + len(rows), name, title.strip(), section_title, line))
+
+    connection.executemany('INSERT INTO lyric_lines (rowid, name, title, section, line) VALUES (?, ?, ?, ?, ?)', rows)
+    connection.execute('INSERT INTO songs (name, mtime, size, first_row, last_row) VALUES (?, ?, ?, ?, ?)',
+                       (name, entry['mtime'], entry['size'], first_row, first_row + len(rows) - 1))
+
+def update_search_index(refresh: bool = False) -> int:
+    '''
+    Brings the search table up to date with the song library. Returns the number of songs which were indexed again
+    '''
+    global _index_checked
+
+    songs = {name: entry for name, entry in get_song_index(refresh).items() if entry['lyrics_file'] is not None}
+    changed = 0
+
+    with closing(_connect()) as connection, connection:
+        indexed = {name: (mtime, size, first_row, last_row) for name, mtime, size, first_row, last_row
+                   in connection.execute('SELECT name, mtime, size, first_row, last_row FROM songs')}
+
+        for name, (mtime, size, first_row, last_row) in indexed.items():
+            entry = songs.get(name)
+            if entry is None or (entry['mtime'], entry['size']) != (mtime, size):
+                connection.execute('DELETE FROM lyric_lines WHERE rowid BETWEEN ? AND ?', (first_row, last_row))
+                connection.execute('DELETE FROM songs WHERE name = ?', (name,))
+
+        for name, entry in songs.items():
+            if name in indexed and (entry['mtime'], entry['size']) == indexed[name][:2]:
+                continue
+            _index_song(connection, name, entry)
+            changed += 1
+
+    _index_checked = True
+    return changed
+
+def _match_expression(query: str) -> str:
+    '''
+    Turns free text into an FTS5 query which matches lines containing every word, treating the last word as
+    a prefix so partially typed words still match. Words are split into tokens as the table's tokenizer splits them,
+    so a word with an apostrophe (e.g. "don't") is matched as the phrase of its tokens ("don t")
+    '''
+    phrases = [' '.join(re.findall(r'\w+', word)) for word in query.lower().split()]
+    phrases = [phrase for phrase in phrases if phrase]
+    if not phrases:
+        return ''
+    return ' '.join(f'"{phrase}"' for phrase in phrases[:-1]) + f' "{phrases[-1]}"*'
+
+def search_lyrics(query: str, limit: int = 10) -> list[tuple[str, str, str]]:
+    '''
+    Searches the lyrics of every song for a line containing all the words in the query.
+    Returns up to limit (song name, section title, matching line) tuples, best match first, with one line per song
+    '''
+    match_expression = _match_expression(query)
+    if not match_expression:
+        return []
+
+    if not _index_checked:
+        update_search_index()
+
+    hits = {}
+    with closing(_connect()) as connection:
+        # Matches come back best first, so the first line seen for each song is its best line
+        rows = connection.execute('''
+            SELECT name, section, line
+            FROM lyric_lines
+            WHERE lyric_lines MATCH ?
+            ORDER BY rank
+        ''', (match_expression,))
+        for name, section, line in rows:
+            if name not in hits:
+                hits[name] = (name, section, line)
+                if len(hits) >= limit:
+                    break
+
+    return list(hits.values())
+
+if __name__ == '__main__':
+    print(f'Indexed {update_search_index(refresh=True)} changed songs')
+    search_term = ' '.join(sys.argv[1:]) or input('Search lyrics: ')
+    for song_name, section, line in search_lyrics(search_term):
+        print(f'{song_name} [{section}]: {line}')
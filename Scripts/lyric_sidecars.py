@@ -0,0 +1,157 @@
+"""
+Module for the pre-translated lyrics kept next to each song's lyrics file.
+
+A song's translation into a language is stored in "<folder>_Lyrics.<language code>.txt" in its song folder,
+e.g. "Amazing Grace_Lyrics.zh-CN.txt". The file records a hash of the lyrics file it was translated from, and is
+only used while the lyrics file is unchanged, so edited songs are translated live until the sidecar is rewritten.
+
+The file format is:
+Source: [sha256 of the lyrics file]
+Title: [translated title]
+[gemini or google]
+Lyrics slide, with each line followed by its translation
+[gemini or google]
+Lyrics slide...
+
+Slides translated by Gemini and by Google translate are shown slightly differently, so each slide records which one
+translated it. The CCLI line under the title is not stored, since it can change without the lyrics file changing.
+
+Run this file directly to write sidecars for every song which does not have an up to date one, e.g.
+python lyric_sidecars.py "Chinese (Simplified)" --workers 4
+Add --dry-run to only list the songs which would be translated.
+"""
+import hashlib
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from cache_utils import atomic_write
+
+# Songs translated at once by the bulk job. Each translation backend also has its own rate limit
+DEFAULT_WORKERS = 4
+
+class LyricSidecar:
+    '''
+    The pre-translated title and lyrics slides of a song. lyric_slides is a list of (translated, text)
+    like in SongSlides, where translated is True for slides translated by Google translate
+    '''
+
+    def __init__(self, source_hash: str, title_translation: str, lyric_slides: list[tuple[bool, str]]):
+        self.source_hash = source_hash
+        self.title_translation = title_translation
+        self.lyric_slides = lyric_slides
+
+def sidecar_path(lyrics_path: str, language_code: str) -> str:
+    '''
+    Returns the path of the sidecar holding the translation of a lyrics file into a language
+    '''
+    folder = os.path.dirname(lyrics_path)
+    return os.path.join(folder, f'{os.path.basename(folder)}_Lyrics.{language_code}.txt')
+
+def source_hash(lyrics_path: str) -> str:
+    '''
+    Returns the sha256 of a lyrics file
+    '''
+    with open(lyrics_path, 'rb') as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+def read_sidecar(lyrics_path: str, language_code: str) -> LyricSidecar | None:
+    '''
+    Returns the translation of a lyrics file into a language, or None if there is no sidecar for it
+    or the lyrics file has changed since it was translated
+    '''
+    try:
+        with open(sidecar_path(lyrics_path, language_code), encoding='utf-8') as file:
+            lines = file.read().split('\n')
+    except FileNotFoundError:
+        return None
+
+    if len(lines) < 2 or not lines[0].startswith('Source: ') or not lines[1].startswith('Title: '):
+        print(f"Warning: {sidecar_path(lyrics_path, language_code)} is not a lyrics translation, ignoring it")
+        return None
+    if lines[0][len('Source: '):] != source_hash(lyrics_path):
+        return None
+
+    lyric_slides = []
+    for line in lines[2:]:
+        if line in ('[gemini]', '[google]'):
+            lyric_slides.append((line == '[google]', []))
+        elif lyric_slides:
+            lyric_slides[-1][1].append(line)
+    # Every slide is followed by a newline, which leaves an empty line at the end of the last one
+    if lyric_slides and lyric_slides[-1][1] and lyric_slides[-1][1][-1] == '':
+        lyric_slides[-1][1].pop()
+
+    return LyricSidecar(lines[0][len('Source: '):], lines[1][len('Title: '):],
+                        [(translated, '\n'.join(slide_lines)) for translated, slide_lines in lyric_slides])
+
+def write_sidecar(lyrics_path: str, language_code: str, sidecar: LyricSidecar) -> None:
+    '''
+    Writes the translation of a lyrics file into a language to its sidecar
+    '''
+    lines = [f'Source: {sidecar.source_hash}', f'Title: {sidecar.title_translation}']
+    for translated, text in sidecar.lyric_slides:
+        lines.append('[google]' if translated else '[gemini]')
+        lines.append(text)
+    atomic_write(sidecar_path(lyrics_path, language_code), ('\n'.join(lines) + '\n').encode('utf-8'))
+
+def _translate_song(song_name: str, lyrics_path: str, language: str, language_code: str, new_song, song_hash: str) -> None:
+    from slide_builders import song_title, translate_text, translate_song_lyrics
+
+    title_translation = translate_text(song_title(new_song), language)
+    lyric_slides = translate_song_lyrics(new_song, language)
+    write_sidecar(lyrics_path, language_code, LyricSidecar(song_hash, title_translation, lyric_slides))
+    print(f"Wrote {sidecar_path(lyrics_path, language_code)}")
+
+def pretranslate_songs(language: str = "Chinese (Simplified)", workers: int = DEFAULT_WORKERS, dry_run: bool = False) -> tuple[int, int]:
+    '''
+    Writes sidecars for every song which does not have one for the language, or whose lyrics changed since it was
+    written. Songs are translated workers at a time. Returns (number of songs, number of songs translated)
+    '''
+    # Imported here since slide_builders reads sidecars through this module
+    from slide_builders import get_language_code, lyrics_path_from_name, song_object_from_name
+    from song_library import get_song_names
+
+    language_code = get_language_code(language)
+    song_names = sorted(get_song_names(refresh=True))
+
+    # Songs are read here so they are only parsed (and cached) by one thread
+    stale_songs = []
+    for song_name in song_names:
+        lyrics_path = lyrics_path_from_name(song_name)
+        try:
+            song_hash = source_hash(lyrics_path)
+            if read_sidecar(lyrics_path, language_code) is None:
+                stale_songs.append((song_name, lyrics_path, song_object_from_name(song_name, 2), song_hash))
+        except FileNotFoundError:
+            print(f"Warning: {song_name} does not have a lyrics file, skipping it")
+
+    if dry_run:
+        for song_name, *_ in stale_songs:
+            print(f"Would translate {song_name}")
+        return len(song_names), len(stale_songs)
+
+    translated = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [(song_name, executor.submit(_translate_song, song_name, lyrics_path, language, language_code, new_song, song_hash))
+                   for song_name, lyrics_path, new_song, song_hash in stale_songs]
+        for song_name, future in futures:
+            try:
+                future.result()
+                translated += 1
+            except Exception as e:
+                print(f"Warning: Could not translate {song_name} ({e})")
+
+    return len(song_names), translated
+
+if __name__ == '__main__':
+    arguments = sys.argv[1:]
+    dry_run = '--dry-run' in arguments
+    workers = DEFAULT_WORKERS
+    if '--workers' in arguments:
+        workers = int(arguments[arguments.index('--workers') + 1])
+        del arguments[arguments.index('--workers'):arguments.index('--workers') + 2]
+    languages = [argument for argument in arguments if argument != '--dry-run'] or ["Chinese (Simplified)"]
+
+    for language in languages:
+        songs, translated = pretranslate_songs(language, workers, dry_run)
+        print(f"{language}: {translated} of {songs} songs {'need translating' if dry_run else 'translated'}")
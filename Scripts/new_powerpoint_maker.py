@@ -1,8 +1,11 @@
 import os, sys
 import webbrowser
 from bible_passage import bible_passage, get_correct_copyright_message
-from slide_builders import create_from_template, create_bulletin_slide, create_offering_slide,create_starting_slides, create_title_and_text_slide, create_title_slide, add_title_with_image_on_right, append_song_to_powerpoint, append_song_to_powerpoint_translated
-from helpers import get_next_sunday, kill_powerpoint, find_song_names, select_song 
+from slide_builders import create_from_template, create_bulletin_slide, create_offering_slide,create_starting_slides, create_title_and_text_slide, create_title_slide, add_title_with_image_on_right, append_song_to_powerpoint, add_song_slides, find_songs_ccli
+from helpers import get_next_sunday, kill_powerpoint, select_song 
+from song_library import get_song_names
+from template_manifest import font_sizes
+from translation_scheduler import translate_songs
 from test import test
 from dotenv import load_dotenv
 import PIL
@@ -29,10 +32,6 @@ def main():
     Mingle time slide
     '''
 
-    font_sizes_large = {'title': 40, 'song': 27, 'bible reading': 23, 'tithing': 16}
-    font_sizes_medium = {'title': 50, 'song': 33, 'bible reading': 32, 'tithing': 23}
-    font_sizes_small = {'title': 70, 'song': 53, 'bible reading': 43, 'tithing': 32}
-
     # Open up the roster when running 
     test_mode = input("Test mode? (t for yes, o to open planning sheet): ").lower().strip()
     if test_mode == 't':
@@ -83,19 +82,11 @@ def main():
         elif proceed == 'p':
             webbrowser.open(f"file://{powerpoint_path}")
 
-    template_name = os.path.basename(template_path)
-    
-    used_font = font_sizes_medium
-    if template_name.startswith('small'):
-        used_font = font_sizes_small
-    elif template_name.startswith('med'):
-        used_font = font_sizes_medium
-    elif template_name.startswith('large'):
-        used_font = font_sizes_large
+    used_font = font_sizes(template_path)
         
     complete_ppt = create_starting_slides(complete_ppt, used_font['title'], used_font['title'] - 10)
 
-    song_names = find_song_names(f'{scripts_folder}/../')
+    song_names = get_song_names()
     searched_songs = []
 
     # Select all songs
@@ -125,12 +116,15 @@ def main():
         break
     
     # Add all the songs to the powerpoint
+    ccli_messages = find_songs_ccli(searched_songs)
     if translate:
-        for song in searched_songs:
-            complete_ppt = append_song_to_powerpoint_translated(song, complete_ppt, used_font['title'], used_font['song'], 2, language)
+        # Every song in the set is translated at once
+        for song_slides in translate_songs(searched_songs, language, ccli_messages):
+            if song_slides is not None:
+                complete_ppt = add_song_slides(song_slides, complete_ppt, used_font['title'], used_font['song'])
     else:
         for song in searched_songs:
-            complete_ppt = append_song_to_powerpoint(song, complete_ppt, used_font['title'], used_font['song'])
+            complete_ppt = append_song_to_powerpoint(song, complete_ppt, used_font['title'], used_font['song'], ccli_messages=ccli_messages)
 
     if communion:
         try:
@@ -206,12 +200,15 @@ def main():
 
         break
     # response songs
+    ccli_messages = find_songs_ccli(response_songs)
     if translate:
-        for song in response_songs:
-            complete_ppt = append_song_to_powerpoint_translated(song, complete_ppt, used_font['title'], used_font['song'], 2, language)
+        # Every song in the set is translated at once
+        for song_slides in translate_songs(response_songs, language, ccli_messages):
+            if song_slides is not None:
+                complete_ppt = add_song_slides(song_slides, complete_ppt, used_font['title'], used_font['song'])
     else:
         for song in response_songs:
-            complete_ppt = append_song_to_powerpoint(song, complete_ppt, used_font['title'], used_font['song'])
+            complete_ppt = append_song_to_powerpoint(song, complete_ppt, used_font['title'], used_font['song'], ccli_messages=ccli_messages)
 
     '''
     TODO - Low priority. Create functionality to add custom announcements (maybe use the offering slide)
@@ -1,8 +1,9 @@
 import os, sys
-from bible_passage import bible_passage_auto
-from slide_builders import append_song_to_powerpoint_translated, create_from_template, create_bulletin_slide, create_offering_slide, create_starting_slides, create_title_and_text_slide, create_title_slide, add_title_with_image_on_right, append_song_to_powerpoint, add_multiple_songs
-from helpers import get_next_sunday_auto, kill_powerpoint, find_song_names, parse_roster_row, is_running_in_ci
-import PIL
+from helpers import get_next_sunday_auto, kill_powerpoint, parse_roster_row, is_running_in_ci
+from service_plan import plan_auto_service
+from template_manifest import choose_template
+from translation_cache import print_translation_cache_stats
+from translation_backends import print_backend_metrics
 
 from dotenv import load_dotenv
 
@@ -28,11 +29,7 @@ def main():
     '''
 
     print("Starting auto-script...")
-    font_sizes_large = {'title': 40, 'song': 27, 'bible reading': 23, 'tithing': 16}
-    font_sizes_medium = {'title': 50, 'song': 33, 'bible reading': 32, 'tithing': 23}
-    font_sizes_small = {'title': 70, 'song': 53, 'bible reading': 43, 'tithing': 32}
-
-    complete_ppt, template_path = create_from_template()
+    template_path, _ = choose_template()
     roster_sheet_link = os.environ.get('ROSTER_SHEET_LINK')
     if not roster_sheet_link:
         print("No roster link provided, check the ROSTER_SHEET_LINK environment variable")
@@ -70,90 +67,19 @@ def main():
     if os.path.exists(powerpoint_path):
         print("Warning: {powerpoint_path} already exists, this will be overwritten")
         
-    template_name = os.path.basename(template_path)
-    
-    # templates are named small_1, small_2, med_1, large_1, etc 
-    used_font = font_sizes_medium
-    if template_name.startswith('small'):
-        used_font = font_sizes_small
-    elif template_name.startswith('med'):
-        used_font = font_sizes_medium
-    elif template_name.startswith('large'):
-        used_font = font_sizes_large
-        
-    complete_ppt = create_starting_slides(complete_ppt, used_font['title'], used_font['title'] - 10)
-
-    song_names = find_song_names(f'{scripts_folder}/../')
-    # print(f"All songs: {song_names}")
-    
-    print("Adding worship songs")
-    add_multiple_songs(complete_ppt, sunday_data['songs'], song_names, translate, used_font['title'], used_font['song'])
-    
-
-    if communion:
-        try:
-            complete_ppt = add_title_with_image_on_right(complete_ppt, "Holy Communion", 'Communion', used_font['title'] - 10)
-            print("Communion slides added successfully!")
-        except PIL.UnidentifiedImageError:
-            # An error sometimes occurs (I have no idea why) when the image cannot be found. 
-            # In this case just create a simple text slide without the image
-            print("Warning: Could not find communion image, continuing without image")
-            # complete_ppt = create_title_slide('Holy Communion', '', complete_ppt, used_font['title'])
-
-    # Bible passage slide/s
-    complete_ppt = add_title_with_image_on_right(complete_ppt, 'Bible reading', 'Bible', used_font['title'] - 10)
-
-    # Get Bible passage text
-    verse_references = []
-    passages = sunday_data["passage"]
-    print(f"Provided passages: {passages}")
-    # process the passages, splitting by newlines/commas if necessary
-    
-    for reference in [passages]:
-
-        verses = bible_passage_auto(reference)
-        print(f"Obtained verses: {verses}")
-
-        try:
-            verse_reference = reference.strip().lower().title()
-            for verse in verses:
-                # Create a verse slide for each verse 'group'
-                complete_ppt = create_title_and_text_slide(verse_reference, verse, complete_ppt, used_font['title'], used_font['bible reading'])
-            verse_references.append(verse_reference)
-
-        except TypeError:
-            print('No bible passage found - trying again!')
-
-    print("Adding response songs")
-    add_multiple_songs(complete_ppt, sunday_data['response_songs'], song_names, translate, used_font['title'], used_font['song'])
-    
-    print("Creating bulletin/title/offering and other slides")
-    create_bulletin_slide(complete_ppt.slides[0], complete_ppt, saved_file_name, sunday_data['songs'], verse_references, sunday_data["response_songs"], sunday_data["speaker"], sunday_data["topic"])
-
-    '''
-    TODO - Low priority. Create functionality to add custom announcements (maybe use the offering slide)
-    '''
-
-    # Announcements slide
-    complete_ppt = create_title_slide('Announcements', '', complete_ppt, used_font['title'])
-    
-    # Tithing slide
-    complete_ppt = create_offering_slide(complete_ppt, used_font['title'], used_font['tithing'])
-
-    # Prayer points slide (identical to announcements)
-    complete_ppt = create_title_slide('Prayer points', '', complete_ppt, used_font['title'])
+    # Everything is looked up before any slides are made
+    plan = plan_auto_service(sunday_data, saved_file_name, template_path, translate, communion)
 
-    # Mingle time slide
-    if os.path.exists(f'{scripts_folder}/../Images/Mingle/'):
-        complete_ppt = add_title_with_image_on_right(complete_ppt, 'Mingle time!', 'Mingle', used_font['title'] - 10)
-    else:
-        complete_ppt = create_title_slide('Mingle time!', '', complete_ppt, used_font['title'])
+    print("Creating slides")
+    complete_ppt = plan.render()
 
     # Blindly overwrite file, may need to check if this has the potential to corrupt a file
     if os.path.exists(powerpoint_path):
         print("Overwriting existing file...")
         kill_powerpoint()
     complete_ppt.save(powerpoint_path)
+    print_translation_cache_stats()
+    print_backend_metrics()
 
     if not is_running_in_ci():
         if os.path.exists(powerpoint_path):
@@ -0,0 +1,266 @@
+"""
+Module for planning a service before its powerpoint is made.
+
+A ServicePlan holds the items of a service in order (songs, bible passages, the bulletin, communion, offering, etc.),
+with everything they need already looked up: lyrics are read, CCLI messages found, translations done and bible
+passages fetched. Making the plan is where all files are read and network requests are made. Rendering a plan into a
+powerpoint then only builds slides, so it is fast and always gives the same powerpoint for the same plan.
+"""
+import os
+from concurrent.futures import Future
+import PIL
+from pptx import Presentation
+from bible_passage import bible_passage_auto
+from ccli import load_ccli_source, licence_message
+from fetch_stage import FetchStage
+from slide_builders import SongSlides, create_bulletin_slide, create_blank_slide, create_offering_slide, create_title_and_text_slide, \
+    create_title_slide, add_title_with_image_on_right, add_song_slides, prepare_song, prepare_song_translated, match_song_locally, \
+    fetch_song, find_songs_ccli, song_ccli_title, song_object_from_name
+from song_library import get_song_names
+from translation_scheduler import start_translating_songs, finish_translating_song
+from template_cache import load_template
+from template_manifest import font_sizes
+
+# Global variable to store relative path information
+scripts_folder = os.path.dirname(__file__)
+
+class BulletinItem:
+    '''
+    The bulletin slide, which summarises the service
+    '''
+
+    def __init__(self, date, songs, verses, response_songs="TBA", speaker="TBA", topic="TBA"):
+        self.date = date
+        self.songs = songs
+        self.verses = verses
+        self.response_songs = response_songs
+        self.speaker = speaker
+        self.topic = topic
+
+    def render(self, prs, fonts):
+        create_bulletin_slide(create_blank_slide(prs), prs, self.date, self.songs, self.verses,
+                              self.response_songs, self.speaker, self.topic)
+
+class TitleItem:
+    '''
+    A slide with just a title (and an optional subtitle), e.g. announcements
+    '''
+
+    def __init__(self, title, subtitle=''):
+        self.title = title
+        self.subtitle = subtitle
+
+    def render(self, prs, fonts):
+        create_title_slide(self.title, self.subtitle, prs, fonts['title'])
+
+class ImageItem:
+    '''
+    A slide with a title on the left and a random image from a folder in Images on the right, e.g. communion
+    '''
+
+    def __init__(self, title, image_type):
+        self.title = title
+        self.image_type = image_type
+
+    def render(self, prs, fonts):
+        try:
+            add_title_with_image_on_right(prs, self.title, self.image_type, fonts['title'] - 10)
+        except PIL.UnidentifiedImageError:
+            # An error sometimes occurs (I have no idea why) when the image cannot be found.
+            print(f"Warning: Could not find {self.image_type.lower()} image, continuing without image")
+
+class SongItem:
+    '''
+    A song, with its slides already prepared by prepare_song or prepare_song_translated
+    '''
+
+    def __init__(self, name, song_slides: SongSlides):
+        self.name = name
+        self.song_slides = song_slides
+
+    def render(self, prs, fonts):
+        add_song_slides(self.song_slides, prs, fonts['title'], fonts['song'])
+
+class PassageItem:
+    '''
+    A bible passage, split into the parts shown on each slide
+    '''
+
+    def __init__(self, reference, verses):
+        self.reference = reference
+        self.verses = verses
+
+    def render(self, prs, fonts):
+        for verse in self.verses:
+            # Create a verse slide for each verse 'group'
+            create_title_and_text_slide(self.reference, verse, prs, fonts['title'], fonts['bible reading'])
+
+class OfferingItem:
+    '''
+    The slide with tithing details
+    '''
+
+    def render(self, prs, fonts):
+        create_offering_slide(prs, fonts['title'], fonts['tithing'])
+
+class ServicePlan:
+    '''
+    The items of a service in the order their slides appear, and the template they are made with
+    '''
+
+    def __init__(self, template_path, items=None):
+        self.template_path = template_path
+        self.items = items if items is not None else []
+
+    def render(self) -> Presentation:
+        '''
+        Makes the powerpoint for the plan. No files other than the template and images are read
+        '''
+        prs = load_template(self.template_path)
+        fonts = font_sizes(self.template_path)
+        for item in self.items:
+            item.render(prs, fonts)
+        return prs
+
+def prepare_songs(song_names: list[str], translate: bool, ccli_messages: dict[str, str], language="Chinese (Simplified)",
+                  stage: FetchStage = None, translations: dict[str, Future] = None) -> list[SongItem]:
+    '''
+    Prepares the slides of songs which have already been matched to song files, leaving out songs which do not exist.
+    Translations already started with start_translating_songs on stage can be given, otherwise songs are translated here
+    '''
+    items = []
+    for song in song_names:
+        if len(song) == 0:
+            continue
+        if translations is not None and song in translations:
+            song_slides = finish_translating_song(song, translations, ccli_messages, stage)
+        elif translate:
+            print(f"Preparing slides with translation for {song}")
+            song_slides = prepare_song_translated(song, language, ccli_messages)
+        else:
+            print(f"Preparing slides for {song}")
+            song_slides = prepare_song(song, ccli_messages)
+        if song_slides is not None:
+            items.append(SongItem(song, song_slides))
+    return items
+
+def start_matching_songs(songs: list[str], all_songs: set[str], prepared_songs, stage: FetchStage) -> list:
+    '''
+    Matches each song to a song file with match_song_locally, and starts fetching the lyrics of songs without one on
+    the stage. Returns the name of each matched song or the fetch of each unmatched one, for finish_matching_songs
+    '''
+    print(f"Searching for these songs: {songs}")
+    matches = []
+    for song in songs:
+        if len(song) == 0:
+            continue
+        song_name = match_song_locally(song, all_songs, prepared_songs)
+        matches.append(song_name if song_name is not None else stage.submit('genius', fetch_song, song))
+    return matches
+
+def finish_matching_songs(matches: list, stage: FetchStage) -> list[str]:
+    '''
+    Waits for the fetches started by start_matching_songs, returning the names of the songs which were found
+    '''
+    searched_songs = []
+    for match in matches:
+        if isinstance(match, Future):
+            match = stage.result(match, description='Fetching lyrics')
+        if match is not None:
+            searched_songs.append(match)
+    return searched_songs
+
+def service_ccli_messages(song_names: list[str], ccli_source: Future, stage: FetchStage) -> dict[str, str]:
+    '''
+    Looks up the CCLI information of the songs once the CCLI file has been loaded. If it could not be loaded in time,
+    every song gets the licence message instead
+    '''
+    if stage.result(ccli_source, description='Loading the CCLI file') is not None:
+        return find_songs_ccli(song_names)
+
+    messages = {}
+    for song_name in song_names:
+        try:
+            title = song_ccli_title(song_object_from_name(song_name))
+        except FileNotFoundError:
+            continue
+        messages[title] = licence_message(title)
+    return messages
+
+def plan_auto_service(sunday_data: dict, saved_file_name: str, template_path: str, translate: bool, communion: bool,
+                      language: str = "Chinese (Simplified)") -> ServicePlan:
+    '''
+    Makes the plan of a service from its row in the roster sheet (as returned by parse_roster_row).
+    If translate is True, songs are shown with their translation into language.
+    Every song, CCLI message, translation and bible passage is looked up here. Lookups which do not depend on
+    each other are run at the same time on a FetchStage, so planning takes about as long as the slowest of them
+    '''
+    from fuzzywuzzy import process
+
+    song_names = get_song_names()
+    prepared_songs = process.PreparedChoices(song_names)
+
+    with FetchStage() as stage:
+        ccli_source = stage.submit('ccli', load_ccli_source)
+
+        # Get Bible passage text
+        passages = sunday_data["passage"]
+        print(f"Provided passages: {passages}")
+        passage_fetches = [(reference, stage.submit('bible', bible_passage_auto, reference)) for reference in [passages]]
+
+        # Songs without a song file are fetched while the others are matched
+        print("Searching for worship and response songs")
+        worship_matches = start_matching_songs(sunday_data['songs'], song_names, prepared_songs, stage)
+        response_matches = start_matching_songs(sunday_data['response_songs'], song_names, prepared_songs, stage)
+        worship_songs = finish_matching_songs(worship_matches, stage)
+        response_songs = finish_matching_songs(response_matches, stage)
+
+        # CCLI information for the whole service is looked up in one go. Reading the songs here also means songs
+        # are parsed in this thread, before they are translated on the stage
+        ccli_messages = service_ccli_messages(worship_songs + response_songs, ccli_source, stage)
+        if translate:
+            for song in worship_songs + response_songs:
+                try:
+                    song_object_from_name(song, 2)
+                except FileNotFoundError:
+                    pass
+
+        # Every song in the service is translated at once
+        translations = start_translating_songs(worship_songs + response_songs, language, ccli_messages, stage) if translate else None
+        worship_items = prepare_songs(worship_songs, translate, ccli_messages, language, stage, translations)
+        response_items = prepare_songs(response_songs, translate, ccli_messages, language, stage, translations)
+
+        passage_items = []
+        for reference, future in passage_fetches:
+            verses = stage.result(future, description=f'Fetching {reference}')
+            print(f"Obtained verses: {verses}")
+
+            if verses is None:
+                print('No bible passage found - trying again!')
+                continue
+            passage_items.append(PassageItem(reference.strip().lower().title(), verses))
+
+    bulletin = BulletinItem(saved_file_name, sunday_data['songs'], [item.reference for item in passage_items],
+                            sunday_data["response_songs"], sunday_data["speaker"], sunday_data["topic"])
+
+    items = [bulletin, TitleItem('BCCC english service')]
+    items += worship_items
+    if communion:
+        items.append(ImageItem("Holy Communion", 'Communion'))
+    items.append(ImageItem('Bible reading', 'Bible'))
+    items += passage_items
+    items += response_items
+
+    '''
+    TODO - Low priority. Create functionality to add custom announcements (maybe use the offering slide)
+    '''
+    items.append(TitleItem('Announcements'))
+    items.append(OfferingItem())
+    # Prayer points slide (identical to announcements)
+    items.append(TitleItem('Prayer points'))
+    if os.path.exists(f'{scripts_folder}/../Images/Mingle/'):
+        items.append(ImageItem('Mingle time!', 'Mingle'))
+    else:
+        items.append(TitleItem('Mingle time!'))
+
+    return ServicePlan(template_path, items)
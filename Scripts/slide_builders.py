@@ -11,11 +11,17 @@ from pptx.enum.shapes import MSO_SHAPE
 from pptx.enum.dml import MSO_THEME_COLOR
 from pptx.dml.color import RGBColor
 from helpers import scripts_folder
-from ccli import find_ccli
+from song_library import get_lyrics_path
+from song_cache import load_parsed_song
+from lyric_sidecars import read_sidecar
+from song_parser import parse_song_file
+from ccli import find_ccli, find_ccli_many
+from template_cache import load_template
+from image_assets import prepared_image
+from slide_prototypes import add_prototype_slide
+from template_manifest import get_template_manifest, choose_template, template_path, blank_layout_index
 # from tkinter import filedialog, Tk
-from functools import cache
-from deep_translator import GoogleTranslator
-from ai_translate import  translate_with_gemini
+from translation_backends import get_language_code, translate_texts
 import tempfile
 
 class Song:
@@ -32,6 +38,22 @@ class Song:
         self.ccli = ccli
         self.lyrics = lyrics
 
+class SongSlides:
+    '''
+    Used to hold everything needed to add a song's slides, once its lyrics file has been read,
+    its CCLI message found and its lyrics translated (if needed)
+
+    title_texts - title and subtitle of the song's title slide
+    lyric_slides - a list of (translated, text) for each lyrics slide. translated slides alternate
+                   between English and translated lines
+    translated - whether the song is shown with translations
+    '''
+
+    def __init__(self, title_texts, lyric_slides, translated=False):
+        self.title_texts = title_texts
+        self.lyric_slides = lyric_slides
+        self.translated = translated
+
 class MyPresentation:
     '''
     Used to return presentation values and their associated font size.
@@ -40,13 +62,22 @@ class MyPresentation:
         self.presentation = presentation
         self.font_size = font_size
 
+def blank_layout(prs):
+    '''
+    Returns the blank slide layout of a presentation
+
+    Each template must have the 7th layout be a blank slide, unless it has been compacted to just the blank layout
+    '''
+    index = blank_layout_index(prs)
+    if index is None:
+        raise ValueError("The template does not have a blank slide layout")
+    return prs.slide_layouts[index]
+
 def create_blank_slide(prs):
     '''
     Adds a blank slide using the powerpoint oject
-
-    Each template must have the 7th template to be a blank slide
     '''
-    layout = prs.slide_layouts[6]  # Blank slide layout. 
+    layout = blank_layout(prs)
     return prs.slides.add_slide(layout)
 
 def add_text_to_slide(slide, text, prs, font_size, alignment=PP_ALIGN.CENTER, position_percent=0.35,
@@ -75,6 +106,7 @@ def add_text_to_slide(slide, text, prs, font_size, alignment=PP_ALIGN.CENTER, po
             paragraph.font.color.rgb = RGBColor.from_string(colour)
     
     text_frame.word_wrap = True
+    return text_box
 
 def create_bulletin_slide(slide, prs, date, songs, verses, response_songs="TBA", speaker="TBA", topic="TBA"):
     '''
@@ -132,12 +164,20 @@ def create_title_slide(title_text: str, subtitle_text: str, prs, title_size, def
     Creates a custom slide with a title text and body text.
     Usually used for song titles with small descriptions
     '''
-    blank_slide = create_blank_slide(prs)
-
     subtitle_text = subtitle_text.replace("\n", " ")
+    return add_title_texts_slide([title_text, subtitle_text], prs, title_size, default_body_size)
 
-    add_text_to_slide(blank_slide, title_text, prs, title_size, position_percent=0.2)
-    add_text_to_slide(blank_slide, subtitle_text, prs, default_body_size, position_percent=0.6)
+def add_title_texts_slide(texts: list[str], prs, title_size, default_body_size=8):
+    '''
+    Adds a slide with a title and subtitle, given as [title, subtitle], exactly as they are given
+    '''
+    def build():
+        blank_slide = create_blank_slide(prs)
+        title_box = add_text_to_slide(blank_slide, texts[0], prs, title_size, position_percent=0.2)
+        subtitle_box = add_text_to_slide(blank_slide, texts[1], prs, default_body_size, position_percent=0.6)
+        return blank_slide, [(title_box, 1), (subtitle_box, 1)]
+
+    add_prototype_slide(prs, ('title', title_size, default_body_size), texts, build)
 
     return prs
 
@@ -159,48 +199,53 @@ def create_title_and_text_slide(title_text, body_text, prs, title_size,
     Usually used in song lyrics slides
     '''
 
-    # Make a new blank slide
-    blank_slide_layout = prs.slide_layouts[6]  # Use the blank slide layout
-    lyric_slide = prs.slides.add_slide(blank_slide_layout)
+    # Slides after the first are copied from it, with their text replaced
+    def build():
+        # Make a new blank slide
+        blank_slide_layout = blank_layout(prs)
+        lyric_slide = prs.slides.add_slide(blank_slide_layout)
 
-    # Calculate the center and top position for title text box
-    title_width = prs.slide_width * 0.9
-    title_height = prs.slide_height * 0.15
+        # Calculate the center and top position for title text box
+        title_width = prs.slide_width * 0.9
+        title_height = prs.slide_height * 0.15
 
-    title_left = (prs.slide_width - title_width) / 2
-    title_top = Inches(0.3)  # Adjust vertically as needed
+        title_left = (prs.slide_width - title_width) / 2
+        title_top = Inches(0.3)  # Adjust vertically as needed
 
-    # Add a text box for the title
-    title_box = lyric_slide.shapes.add_textbox(left=title_left, top=title_top, width=title_width, height=title_height)
-    title_frame = title_box.text_frame
-    title_frame.text = title_text
+        # Add a text box for the title
+        title_box = lyric_slide.shapes.add_textbox(left=title_left, top=title_top, width=title_width, height=title_height)
+        title_frame = title_box.text_frame
+        title_frame.text = title_text
 
-    # Calculate the center and top position for body text box
-    body_width = prs.slide_width * 0.9
-    body_height = prs.slide_height * 0.8
-    body_left = (prs.slide_width - body_width) / 2
-    body_top = title_height + title_top  # Adjust vertically as needed
+        # Calculate the center and top position for body text box
+        body_width = prs.slide_width * 0.9
+        body_height = prs.slide_height * 0.8
+        body_left = (prs.slide_width - body_width) / 2
+        body_top = title_height + title_top  # Adjust vertically as needed
 
-    # Add a text box for the body text
-    body_box = lyric_slide.shapes.add_textbox(left=body_left, top=body_top, width=body_width, height=body_height)
-    body_frame = body_box.text_frame
-    body_frame.text = body_text
+        # Add a text box for the body text
+        body_box = lyric_slide.shapes.add_textbox(left=body_left, top=body_top, width=body_width, height=body_height)
+        body_frame = body_box.text_frame
+        body_frame.text = body_text
 
-    # Enable text wrapping for both title and body text
-    title_frame.word_wrap = True
-    body_frame.word_wrap = True
+        # Enable text wrapping for both title and body text
+        title_frame.word_wrap = True
+        body_frame.word_wrap = True
 
-    # Set font size and boldness for both title and body text
-    for paragraph in title_frame.paragraphs:
-        paragraph.font.size = Pt(title_size)  # Adjust the font size as needed
-        paragraph.font.bold = True
-        paragraph.alignment = PP_ALIGN.CENTER
+        # Set font size and boldness for both title and body text
+        for paragraph in title_frame.paragraphs:
+            paragraph.font.size = Pt(title_size)  # Adjust the font size as needed
+            paragraph.font.bold = True
+            paragraph.alignment = PP_ALIGN.CENTER
+
+        for paragraph in body_frame.paragraphs:
+            paragraph.font.size = Pt(body_size)  # Adjust the font size as needed
+            paragraph.font.bold = False
+            paragraph.alignment = PP_ALIGN.CENTER
 
-    for paragraph in body_frame.paragraphs:
-        paragraph.font.size = Pt(body_size)  # Adjust the font size as needed
-        paragraph.font.bold = False
-        paragraph.alignment = PP_ALIGN.CENTER
+        return lyric_slide, [(title_box, 1), (body_box, 1)]
 
+    lyric_slide = add_prototype_slide(prs, ('title and text', title_size, body_size), [title_text, body_text], build)
 
     # Presents the little box on the bottom right to show if slides are changing
     # if song_mode:
@@ -215,34 +260,40 @@ def create_text_slide(title_text, body_text, prs, title_size,
     Usually used in song lyrics slides
     '''
 
-    # Make a new blank slide
-    blank_slide_layout = prs.slide_layouts[6]  # Use the blank slide layout
-    lyric_slide = prs.slides.add_slide(blank_slide_layout)
+    # Slides after the first are copied from it, with their text replaced
+    def build():
+        # Make a new blank slide
+        blank_slide_layout = blank_layout(prs)
+        lyric_slide = prs.slides.add_slide(blank_slide_layout)
 
-    # Calculate the center and top position for title text box
-    title_width = prs.slide_width * 0.9
-    title_height = prs.slide_height * 0.15
+        # Calculate the center and top position for title text box
+        title_width = prs.slide_width * 0.9
+        title_height = prs.slide_height * 0.15
 
-    title_left = (prs.slide_width - title_width) / 2
+        title_left = (prs.slide_width - title_width) / 2
 
-    # Calculate the center and top position for body text box
-    body_width = prs.slide_width * 0.9
-    body_height = prs.slide_height * 0.8
-    body_left = (prs.slide_width - body_width) / 2
-    body_top = title_height  # Adjust vertically as needed
+        # Calculate the center and top position for body text box
+        body_width = prs.slide_width * 0.9
+        body_height = prs.slide_height * 0.8
+        body_left = (prs.slide_width - body_width) / 2
+        body_top = title_height  # Adjust vertically as needed
 
-    # Add a text box for the body text
-    body_box = lyric_slide.shapes.add_textbox(left=body_left, top=body_top, width=body_width, height=body_height)
-    body_frame = body_box.text_frame
-    body_frame.text = body_text
+        # Add a text box for the body text
+        body_box = lyric_slide.shapes.add_textbox(left=body_left, top=body_top, width=body_width, height=body_height)
+        body_frame = body_box.text_frame
+        body_frame.text = body_text
+
+        # Enable text wrapping for both title and body text
+        body_frame.word_wrap = True
+
+        for paragraph in body_frame.paragraphs:
+            paragraph.font.size = Pt(body_size)  # Adjust the font size as needed
+            paragraph.font.bold = False
+            paragraph.alignment = PP_ALIGN.CENTER
 
-    # Enable text wrapping for both title and body text
-    body_frame.word_wrap = True
+        return lyric_slide, [(body_box, 1)]
 
-    for paragraph in body_frame.paragraphs:
-        paragraph.font.size = Pt(body_size)  # Adjust the font size as needed
-        paragraph.font.bold = False
-        paragraph.alignment = PP_ALIGN.CENTER
+    lyric_slide = add_prototype_slide(prs, ('text', body_size), [body_text], build)
 
     # Presents the little box on the bottom right to show if slides are changing
     # if song_mode:
@@ -297,55 +348,63 @@ def song_object_from_name(song_name: str, max_lines: int=4) -> Song:
     Reads the content from a song text file and returns a song object with filled data
     '''
     
-    song_name = song_name.lower().title().strip()
-    # Locate where the text file is stored
-    lyrics_text_file = f"{scripts_folder}/../Songs/{song_name}/{song_name}_Lyrics.txt"
-
-    new_song = Song('', '', '')
-
-    with open(lyrics_text_file, encoding='utf-8') as file:
+    lyrics_text_file = lyrics_path_from_name(song_name)
 
-        # Extract all parts into a dictionary
-        lines = file.readlines()
+    # Parsed songs are cached, so the file is only read again once it has been edited
+    title, ccli, lyrics = load_parsed_song(lyrics_text_file, max_lines, parse_song_file)
 
-        lyrics = []
-
-        line_number = 0
-
-        current_section = None
+    # Create a new song object with the required data
+    new_song = Song(title, ccli, [list(section) for section in lyrics])
 
-        for line in lines:
-            line_number += 1
+    if new_song.title == '' and new_song.ccli == '' and new_song.lyrics == '':
+        raise FileNotFoundError(f'The song of name {song_name} does not seem to exist. Check the Songs directory to see if it is there.')
+    return new_song
 
-            # First two lines are reserved for the song name and ccli description
-            if line_number <= 2:
-                continue
+def lyrics_path_from_name(song_name: str) -> str:
+    '''
+    Returns where the lyrics text file of a song is stored
+    '''
+    song_name = song_name.lower().title().strip()
+    lyrics_text_file = get_lyrics_path(song_name)
+    if lyrics_text_file is None:
+        lyrics_text_file = f"{scripts_folder}/../Songs/{song_name}/{song_name}_Lyrics.txt"
+    return lyrics_text_file
 
-            line = line.strip()
-            if line.strip().startswith("[") and line.strip().endswith("]"):
-                # New section detected - append the current section to the lyrics.
-                # Every section corresponds to a slide that will be shown
-                current_section = [line[1:-1].strip(), '']
-                lyrics.append(current_section)
+def song_title(new_song: Song) -> str:
+    '''
+    The title shown on a song's title slide
+    '''
+    return new_song.title.strip().lower().title().replace(' (Live)', '')
 
-            elif current_section is not None:
-                # Check if the current lyrics exceed a maximum number of lines
-                if len(current_section[1].split('\n')) > max_lines:
-                    # If we exceed, create a new section with the same title
-                    current_section = [current_section[0], '']
-                    lyrics.append(current_section)
+def song_ccli_title(new_song: Song) -> str:
+    '''
+    The title a song's CCLI information is looked up by
+    '''
+    return new_song.title.replace("\n", "").replace("(live)", "").strip().lower()
 
-                # Append lyrics to the current section
-                current_section[1] += line + '\n'
-        
-        # Create a new song object with the required data
-        new_song = Song(lines[0], lines[1], lyrics)
+def find_songs_ccli(song_names: list[str]) -> dict[str, str]:
+    '''
+    Looks up the CCLI information of every song in a service at once, returning a map from each song's
+    CCLI title to its message. Songs which cannot be found are left out
+    '''
+    titles = []
+    for song_name in song_names:
+        try:
+            titles.append(song_ccli_title(song_object_from_name(song_name)))
+        except FileNotFoundError:
+            continue
+    return find_ccli_many(titles)
 
-    if new_song.title == '' and new_song.ccli == '' and new_song.lyrics == '':
-        raise FileNotFoundError(f'The song of name {song_name} does not seem to exist. Check the Songs directory to see if it is there.')
-    return new_song
+def song_ccli_info(new_song: Song, ccli_messages: Optional[dict[str, str]]) -> str:
+    '''
+    Returns a song's CCLI message from the messages already looked up, or looks it up if it is not there
+    '''
+    title = song_ccli_title(new_song)
+    if ccli_messages is not None and title in ccli_messages:
+        return ccli_messages[title]
+    return find_ccli(title)
 
-def append_song_to_powerpoint(song_name, prs, title_size, font_size, max_lines=4):
+def append_song_to_powerpoint(song_name, prs, title_size, font_size, max_lines=4, ccli_messages=None):
     '''
     Will append a song's lyrics from a text file with all its lyrics to the current powerpoint. 
     Operates by selecting the required song from the Songs folder and using the contained .txt file to create a song with its associated parts
@@ -357,48 +416,74 @@ def append_song_to_powerpoint(song_name, prs, title_size, font_size, max_lines=4
     Lyrics for the section
     [Section title]
     Lyrics for the section
+
+    ccli_messages can give CCLI messages already looked up with find_songs_ccli, by CCLI title
     '''
 
+    song_slides = prepare_song(song_name, ccli_messages)
+    if song_slides is None:
+        return
+    return add_song_slides(song_slides, prs, title_size, font_size)
+
+def prepare_song(song_name, ccli_messages=None) -> Optional[SongSlides]:
+    '''
+    Reads a song's lyrics and finds its CCLI message, returning the song's slides for add_song_slides
+    or None if the song does not exist
+    '''
     # Copy a song - I'm gonna use a specific one for now - we need to fix up a search algorithm for this that works
     try:
         new_song = song_object_from_name(song_name)
     except FileNotFoundError:
         print("Song not found - continuing without adding it")
-        return
+        return None
 
     # First slide of the song with title data and ccli data
-    song_ccli_info = find_ccli(new_song.title.replace("\n", "").replace("(live)", "").strip().lower())
-    prs = create_title_slide(new_song.title.strip().lower().title().replace(' (Live)', ''), song_ccli_info, prs, title_size)
-    for slide_number, lyrics in enumerate(new_song.lyrics):
-        # Insert a generic lyrics slide for each set of lyrics that exist
-        prs = create_text_slide(lyrics[0], lyrics[1], prs,title_size, font_size, slide_number=slide_number, total_slides=len(new_song.lyrics), song_mode=True)
-    
+    title_text = song_title(new_song)
+    subtitle_text = song_ccli_info(new_song, ccli_messages).replace("\n", " ")
+
+    # Insert a generic lyrics slide for each set of lyrics that exist
+    return SongSlides([title_text, subtitle_text], [(False, lyrics[1]) for lyrics in new_song.lyrics])
+
+def add_song_slides(song_slides: SongSlides, prs, title_size, font_size):
+    '''
+    Adds the slides of a song prepared with prepare_song or prepare_song_translated
+    '''
+    if song_slides.translated:
+        # ONLY FOR TRANSLATED VERSIONS - SOME THINGS ARE A BIT SMALL
+        font_size = font_size * 1.2
+
+    prs = add_title_texts_slide(song_slides.title_texts, prs, title_size, 8)
+    for translated, text in song_slides.lyric_slides:
+        if translated:
+            prs = create_translated_lyrics_slide(text, prs, font_size)
+        else:
+            prs = create_text_slide(text, text, prs, title_size, font_size, song_mode=True)
+
     return prs
 
 def create_from_template(test_mode=False, select_template=False) -> Presentation:
     '''
     Creates a new PowerPoint based on existing templates in the Templates folder.
     Allows users to select a specific template if needed via a GUI file picker.
+    Templates are kept in memory by template_cache, so each file is only read from disk once per process.
     '''
-    directory_path = f"{scripts_folder}/../Templates"
-    files_to_keep = [os.path.join(root, file) for root, _, files in os.walk(directory_path) for file in files if file.endswith(".pptx")]
+    # Templates are chosen from the manifest, so no template is opened until one has been chosen
+    templates = get_template_manifest()
     
-    if not files_to_keep:
+    if not templates:
         raise FileNotFoundError("No PowerPoint templates found in the Templates folder.")
     
     # If in test mode, return a list of template presentations
     if test_mode:
         ppts_to_return = []
-        for file in files_to_keep:
-            prs = Presentation(file)
-            basename = os.path.basename(file)
-            size = 'small' if basename.startswith('small') else 'medium' if basename.startswith('med') else 'large'
-            ppts_to_return.append(MyPresentation(prs, size))
+        for name, entry in sorted(templates.items()):
+            prs = load_template(template_path(name))
+            ppts_to_return.append(MyPresentation(prs, entry['font_profile']))
         return ppts_to_return
     
-    selected_template = choice(files_to_keep)
+    selected_template, _ = choose_template()
     
-    prs = Presentation(selected_template)
+    prs = load_template(selected_template)
     return prs, selected_template
 
 
@@ -428,7 +513,7 @@ def add_title_with_image_on_right(prs: Presentation, title_text: str, image_type
     margin_right = margin_top = prs.slide_height * 0.1
 
     # Create a blank slide
-    slide = prs.slides.add_slide(prs.slide_layouts[6])  # Slide layout index 6 represents a blank slide
+    slide = prs.slides.add_slide(blank_layout(prs))
 
     # Add title
     slide_title = slide.shapes.add_textbox(prs.slide_width * 0.05, margin_top, prs.slide_width * 0.4, prs.slide_height - 2 * margin_top)
@@ -460,83 +545,65 @@ def add_title_with_image_on_right(prs: Presentation, title_text: str, image_type
     image_width = image_height = prs.slide_height - 2 * margin_top
 
     # Add image on the right side
-    slide.shapes.add_picture(image_path, prs.slide_width - image_width - margin_right, margin_top, width=image_width,
-                              height=image_height)
+    # Images are scaled down to the size they are shown at
+    slide.shapes.add_picture(prepared_image(image_path, image_width, image_height), prs.slide_width - image_width - margin_right,
+                             margin_top, width=image_width, height=image_height)
 
     return prs
 
 
-def add_multiple_songs(prs: Presentation, songs: list[str], all_songs: set[str], translate: bool, title_font: str, song_font: str):
+def match_song_locally(song: str, all_songs: set[str], prepared_songs) -> Optional[str]:
     '''
-    Takes in a list of songs, tries to match these lists to a song file, then adds these songs to the powerpoint
+    Matches a song to a song file, exactly or with fuzzy matching. prepared_songs is all_songs as PreparedChoices.
+    Returns None if there is no match, in which case the lyrics can be fetched with fetch_song
     '''
     from fuzzywuzzy import process
-    from song_finder import fetch_lyrics_auto
 
-    print(f"Searching for these songs: {songs}")
-    searched_songs = []
-    
-    print(f'All songs: {all_songs}')
+    print(f"Searching for {song}")
+    if song.title() in all_songs:
+        print(f"Adding {song}")
+        return song
 
-    for song in songs:
-        print(f"Searching for {song}")
-        if song.title() in all_songs:
-            print(f"Adding {song}")
-            searched_songs.append(song)
-        else:
-            # Use fuzzywuzzy process.extract to find matches if you enter in a typo
-            print(f"An exact match for {song} was not found, have you added it?")
-            print("Attempting other methods such as fuzzy matching and a search to recover the situation")
-
-            results = process.extract(song, all_songs, limit=10)
-                
-            # Filter results based on a similarity threshold
-            threshold = 90
-            # Filter first to get valid candidates with their scores
-            candidates = [(res, score) for res, score in results if score >= threshold]
-
-            if candidates:
-                # Find the tuple with the highest score
-                best_match = max(candidates, key=lambda x: x[1])
-                
-                # Unpack
-                song_name, song_score = best_match
-                
-                print(f"Found {len(candidates)} matches. Best is {song_name} with score {song_score}")
-                searched_songs.append(song_name)
-            else:
-                print(f"Info: Fetching lyrics for {song}...")
-                try:
-                    lyrics = fetch_lyrics_auto(song, "")
-                except Exception as e:
-                    print(e)
-                    continue
-
-                if lyrics and len(lyrics) > 0 and lyrics != "Lyrics not available for this song.":
-                    print(f"Adding {song} to the setlist")
-                    searched_songs.append(song)
-                else:
-                    print(f"Warning: Could not find lyrics for {song}, skipping...")
+    # Use fuzzywuzzy process.extractBests to find matches if you enter in a typo
+    print(f"An exact match for {song} was not found, have you added it?")
+    print("Attempting other methods such as fuzzy matching and a search to recover the situation")
+
+    # Only keep results above a similarity threshold. Giving it as the score cutoff lets
+    # titles which cannot reach it be skipped without being fully scored
+    threshold = 90
+    candidates = process.extractBests(song, prepared_songs, score_cutoff=threshold, limit=10)
+    if not candidates:
+        return None
+
+    # Find the tuple with the highest score
+    best_match = max(candidates, key=lambda x: x[1])
     
-    # Add all the songs to the powerpoint
-    complete_ppt = None
-    for song in searched_songs:
-        if len(song) > 0:
-            if translate:
-                print(f"Adding slides with translation for {song}")
-                complete_ppt = append_song_to_powerpoint_translated(song, prs, title_font, song_font)
-            else:
-                print(f"Adding slides for {song}")
-                complete_ppt = append_song_to_powerpoint(song, prs, title_font, song_font)
+    # Unpack
+    song_name, song_score = best_match
     
-    print("Songs added successfully!")
+    print(f"Found {len(candidates)} matches. Best is {song_name} with score {song_score}")
+    return song_name
 
-    if not complete_ppt:
-        return prs
-    else:
-        return complete_ppt
+def fetch_song(song: str) -> Optional[str]:
+    '''
+    Fetches the lyrics of a song which is not in the Songs folder and saves them there.
+    Returns the name of the song, or None if its lyrics could not be found
+    '''
+    from song_finder import fetch_lyrics_auto
 
+    print(f"Info: Fetching lyrics for {song}...")
+    try:
+        lyrics = fetch_lyrics_auto(song, "")
+    except Exception as e:
+        print(e)
+        return None
 
+    if lyrics and len(lyrics) > 0 and lyrics != "Lyrics not available for this song.":
+        print(f"Adding {song} to the setlist")
+        return song
+
+    print(f"Warning: Could not find lyrics for {song}, skipping...")
+    return None
 
 # This code is clunky but does the job
 def create_offering_slide(prs: Presentation, tithing_heading_size: int, tithing_body_size: int) -> Presentation:
@@ -545,7 +612,7 @@ def create_offering_slide(prs: Presentation, tithing_heading_size: int, tithing_
     Creates 5 roundrects to store the tithing details with text boxes with required information on them.
     Icons are found within the tithing folder
     '''
-    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    slide = prs.slides.add_slide(blank_layout(prs))
 
     # Add a text box for the title
     title_height = Inches(1)
@@ -619,72 +686,60 @@ def create_offering_slide(prs: Presentation, tithing_heading_size: int, tithing_
         # Text differs depending on which box you're writing in
         if i == 0:
             p.text = "Account name: Blacktown Chinese Christian Church"
-            slide.shapes.add_picture(f"{scripts_folder}/../Images/Tithing/church.png", left_rect + box_height*0.1, top_rect + box_height*0.1, image_width, image_height)
+            slide.shapes.add_picture(prepared_image(f"{scripts_folder}/../Images/Tithing/church.png", image_width, image_height), left_rect + box_height*0.1, top_rect + box_height*0.1, image_width, image_height)
         elif i == 1:
             p.text = "Account number: 4216 50263"
-            slide.shapes.add_picture(f"{scripts_folder}/../Images/Tithing/account_number.png", left_rect  + box_height*0.1, top_rect + box_height*0.1, image_width, image_height)
+            slide.shapes.add_picture(prepared_image(f"{scripts_folder}/../Images/Tithing/account_number.png", image_width, image_height), left_rect  + box_height*0.1, top_rect + box_height*0.1, image_width, image_height)
         elif i == 2:
             p.text = "BSB: 112 - 879"
-            slide.shapes.add_picture(f"{scripts_folder}/../Images/Tithing/bsb.png", left_rect  +  box_height*0.1, top_rect + box_height*0.1, image_width, image_height)
+            slide.shapes.add_picture(prepared_image(f"{scripts_folder}/../Images/Tithing/bsb.png", image_width, image_height), left_rect  +  box_height*0.1, top_rect + box_height*0.1, image_width, image_height)
         elif i == 3:
             p.text = "Please put in \"offering\" as the reference"
-            slide.shapes.add_picture(f"{scripts_folder}/../Images/Tithing/hands.png", left_rect +  box_height*0.1, top_rect + box_height*0.1, image_width, image_height)
+            slide.shapes.add_picture(prepared_image(f"{scripts_folder}/../Images/Tithing/hands.png", image_width, image_height), left_rect +  box_height*0.1, top_rect + box_height*0.1, image_width, image_height)
         elif i == 4:         
             p.text = "The offering box is available at the back of the hall"
-            slide.shapes.add_picture(f"{scripts_folder}/../Images/Tithing/box.png", left_rect +  box_height*0.1, top_rect + box_height*0.1, image_width, image_height)
+            slide.shapes.add_picture(prepared_image(f"{scripts_folder}/../Images/Tithing/box.png", image_width, image_height), left_rect +  box_height*0.1, top_rect + box_height*0.1, image_width, image_height)
 
         text_frame.word_wrap = True  # Enable word wrapping
         text_frame.auto_size = True  # Enable autofit
 
     return prs
 
-@cache
 def translate_text(text: str, language: str = 'mandarin') -> str:
     '''
     Takes in a string and translates it into a language given by the language parameter (default - Mandarin simplified)
+    Translations are kept in the translation cache, so each text is only translated once
     '''
+    return translate_texts([text], language)[0]
 
-    # mapping
-    top_languages = {
-        "Mandarin Chinese": "zh-CN",
-        "Spanish": "es",
-        "Hindi": "hi",
-        "Arabic": "ar",
-        "Bengali": "bn",
-        "Portuguese": "pt",
-        "Russian": "ru",
-        "Japanese": "ja",
-        "Punjabi": "pa",
-        "German": "de"
-    }
-
-    # defaults to chinese mapping if not found
-    def get_language_code(language: str) -> str:
-        for lang, code in top_languages.items():
-            if language.lower() in lang.lower():
-                return code
-        return "zh-CN"
-    
-    return GoogleTranslator(source='auto', target=get_language_code(language)).translate(text)
+def translate_lines(lines: list[str], language: str = 'mandarin') -> list[str]:
+    '''
+    Translates each line in lines, returning the translations in the same order.
+    Lines which are not in the translation cache are translated together
+    '''
+    return translate_texts(lines, language)
 
 def create_title_slide_translated(title_text: str, subtitle_text: str, prs, title_size: int, default_body_size: int = 8, language: str = 'chinese'):
     '''
     Creates a custom slide with a title text and body text.
     Usually used for song titles with small descriptions
     '''
-    blank_slide = create_blank_slide(prs)
+    return add_title_texts_slide(translate_title(title_text, subtitle_text, language), prs, title_size, default_body_size)
 
-    title_text_translated = translate_text(title_text, language)
+def translate_title(title_text: str, subtitle_text: str, language: str = 'chinese', title_text_translated: Optional[str] = None) -> list[str]:
+    '''
+    Returns the title and subtitle of a title slide with their translations underneath.
+    The title is only translated if its translation is not given
+    '''
+    if title_text_translated is None:
+        title_text_translated = translate_text(title_text, language)
     subtitle_text_translated = translate_text(subtitle_text, language)
 
     subtitle_text = subtitle_text.replace("\n", " ")
 
-    add_text_to_slide(blank_slide, f'{title_text}\n{title_text_translated}', prs, title_size, position_percent=0.2)
-    add_text_to_slide(blank_slide, f'{subtitle_text}\n{subtitle_text_translated}', prs, default_body_size, position_percent=0.6)
-
     print(f'Adding: {title_text} | {title_text_translated}')
 
-    return prs
+    return [f'{title_text}\n{title_text_translated}', f'{subtitle_text}\n{subtitle_text_translated}']
 
 def create_text_slide_translated(title_text, body_text, prs, title_size,
                                 body_size, slide_number=0, total_slides=0, song_mode=False,
@@ -706,52 +761,79 @@ def create_text_slide_translated(title_text, body_text, prs, title_size,
         language: Target language for translation
     '''
 
-    # Make a new blank slide
-    blank_slide_layout = prs.slide_layouts[6]  # Use the blank slide layout
-    lyric_slide = prs.slides.add_slide(blank_slide_layout)
+    return create_translated_lyrics_slide(translate_lyrics(body_text, language), prs, body_size)
 
-    # Calculate the center and top position for body text box
-    body_width = prs.slide_width * 0.9
-    body_height = prs.slide_height * 0.8
-    body_left = (prs.slide_width - body_width) / 2
-    body_top = prs.slide_height * 0.1  # Start from top with some margin
+def translate_lyrics(body_text: str, language: str = "Chinese (Simplified)") -> str:
+    '''
+    Returns lyrics with the translation of each line underneath it
+    '''
+    return translate_lyrics_sections([body_text], language)[0]
 
-    # Add a text box for the body text
-    body_box = lyric_slide.shapes.add_textbox(left=body_left, top=body_top, width=body_width, height=body_height)
-    body_frame = body_box.text_frame
-    
+def translate_lyrics_sections(sections: list[str], language: str = "Chinese (Simplified)") -> list[str]:
+    '''
+    Does translate_lyrics for each section of a song, translating the lines of every section together
+    '''
     # Process body text line by line for translation
-    body_lines = body_text.strip().split('\n')
-    translated_body_lines = []
-    
-    for line in body_lines:
-        if line.strip():  # Only translate non-empty lines
-            translated_line = translate_text(line, language)
-            translated_body_lines.append(f"{line}\n{translated_line}")
-        else:
-            translated_body_lines.append(line)
-    
-    combined_body = '\n'.join(translated_body_lines)
-    body_frame.text = combined_body
-
-    # Enable text wrapping
-    body_frame.word_wrap = True
-
-    # Set font size and formatting for body text
-    for i, paragraph in enumerate(body_frame.paragraphs):
-        # Alternate between English (larger) and translated (smaller) text
-        if i % 2 == 0:  # English lines
-            paragraph.font.size = Pt(body_size)
-            paragraph.font.bold = False
-        else:  # Translated lines
-            paragraph.font.size = Pt(body_size - 4)
-            paragraph.font.bold = False
-            paragraph.font.italic = True
-        paragraph.alignment = PP_ALIGN.CENTER
+    sections_lines = [body_text.strip().split('\n') for body_text in sections]
+    # Only translate non-empty lines
+    lines = [line for body_lines in sections_lines for line in body_lines if line.strip()]
+    translations = iter(translate_lines(lines, language))
+
+    translated_sections = []
+    for body_lines in sections_lines:
+        translated_body_lines = []
+        for line in body_lines:
+            if line.strip():
+                translated_body_lines.append(f"{line}\n{next(translations)}")
+            else:
+                translated_body_lines.append(line)
+        translated_sections.append('\n'.join(translated_body_lines))
+    return translated_sections
+
+def create_translated_lyrics_slide(combined_body: str, prs, body_size):
+    '''
+    Creates a slide from lyrics already translated with translate_lyrics, with the translated lines smaller and in italics
+    '''
+    # Slides after the first are copied from it, with their text replaced
+    def build():
+        # Make a new blank slide
+        blank_slide_layout = blank_layout(prs)
+        lyric_slide = prs.slides.add_slide(blank_slide_layout)
+
+        # Calculate the center and top position for body text box
+        body_width = prs.slide_width * 0.9
+        body_height = prs.slide_height * 0.8
+        body_left = (prs.slide_width - body_width) / 2
+        body_top = prs.slide_height * 0.1  # Start from top with some margin
+
+        # Add a text box for the body text
+        body_box = lyric_slide.shapes.add_textbox(left=body_left, top=body_top, width=body_width, height=body_height)
+        body_frame = body_box.text_frame
+        body_frame.text = combined_body
+
+        # Enable text wrapping
+        body_frame.word_wrap = True
+
+        # Set font size and formatting for body text
+        for i, paragraph in enumerate(body_frame.paragraphs):
+            # Alternate between English (larger) and translated (smaller) text
+            if i % 2 == 0:  # English lines
+                paragraph.font.size = Pt(body_size)
+                paragraph.font.bold = False
+            else:  # Translated lines
+                paragraph.font.size = Pt(body_size - 4)
+                paragraph.font.bold = False
+                paragraph.font.italic = True
+            paragraph.alignment = PP_ALIGN.CENTER
+
+        # Both the English and translated formatting are kept for the slides copied from this one
+        return lyric_slide, [(body_box, 2)]
+
+    add_prototype_slide(prs, ('translated text', body_size), [combined_body], build)
 
     return prs
 
-def append_song_to_powerpoint_translated(song_name, prs, title_size, font_size, max_lines=2, language="Chinese (Simplified)"):
+def append_song_to_powerpoint_translated(song_name, prs, title_size, font_size, max_lines=2, language="Chinese (Simplified)", ccli_messages=None):
     '''
     Will append a song's lyrics from a text file with all its lyrics to the current powerpoint with translations.
     This is a translated version of the original append_song_to_powerpoint function.
@@ -762,67 +844,82 @@ def append_song_to_powerpoint_translated(song_name, prs, title_size, font_size,
         font_size: Font size for lyrics
         max_lines: Maximum lines per slide before splitting
         language: Target language for translation
+        ccli_messages: CCLI messages already looked up with find_songs_ccli, by CCLI title
     '''
-    # ONLY FOR TRANSLATED VERSIONS - SOME THINGS ARE A BIT SMALL
-    font_size = font_size * 1.2
+    song_slides = prepare_song_translated(song_name, language, ccli_messages)
+    if song_slides is None:
+        return
+    return add_song_slides(song_slides, prs, title_size, font_size)
 
+def prepare_song_translated(song_name, language="Chinese (Simplified)", ccli_messages=None, use_sidecar=True) -> Optional[SongSlides]:
+    '''
+    Reads a song's lyrics, finds its CCLI message and translates it, returning the song's slides for add_song_slides
+    or None if the song does not exist. The lyrics are read from the song's up to date sidecar if it has one
+    (see lyric_sidecars), so only the CCLI line needs translating
+    '''
     # Create a new song object with the required data
     try:
         new_song = song_object_from_name(song_name, 2)
     except FileNotFoundError:
         print(f"{song_name} doesn't seem to exist.")
-        return
+        return None
+
+    sidecar = read_sidecar(lyrics_path_from_name(song_name), get_language_code(language)) if use_sidecar else None
 
     # First slide of the song with title data and ccli data
     print("Adding title slide")
-    song_ccli_info = find_ccli(new_song.title.replace("\n", "").replace("(live)", "").strip().lower())
-    prs = create_title_slide_translated(new_song.title.strip().lower().title().replace(' (Live)', ''), song_ccli_info, prs, title_size, 8, language)
+    if sidecar is not None:
+        print(f"Using the pre-translated lyrics of {song_name}")
+        title_texts = translate_title(song_title(new_song), song_ccli_info(new_song, ccli_messages), language, sidecar.title_translation)
+        return SongSlides(title_texts, sidecar.lyric_slides, translated=True)
+
+    title_texts = translate_title(song_title(new_song), song_ccli_info(new_song, ccli_messages), language)
+    return SongSlides(title_texts, translate_song_lyrics(new_song, language), translated=True)
+
+def translate_song_lyrics(new_song: Song, language="Chinese (Simplified)") -> list[tuple[bool, str]]:
+    '''
+    Translates the lyrics of a song read with max_lines=2, returning the (translated, text) of each lyrics slide.
+    The backend for songs (Gemini by default) is tried first, with the backend for lines (Google translate by default)
+    used if it fails. See translation_backends
+    '''
+    # Parts of the same section are translated together, and each section is cached on its own
+    sections = []
+    previous_section = None
+    for section, lyrics in new_song.lyrics:
+        if sections and section == previous_section:
+            sections[-1] += lyrics
+        else:
+            sections.append(lyrics)
+        previous_section = section
 
-    lyrics_clump = ''.join([line[1] for line in new_song.lyrics])
-    translated_lyrics_text = ''
+    lyric_slides = None
 
     # If this works - use this and if it does not we go back to using standard translate
-    ai_translate = False
-    
     try:
         print("Translating with GenAI, please wait")
-        translated_lyrics_text = translate_with_gemini(lyrics_clump, language)
+        translated_sections = translate_texts(sections, language, 'songs')
         print("GenAI translation complete")
-        ai_translate = True
+
+        # One slide for each line (english then translated)
+        lyric_slides = []
+        for section, translated_section in zip(sections, translated_sections, strict=True):
+            lines = [line.strip() for line in section.split('\n') if line.strip()]
+            translated_lines = translated_section.split('\n') if translated_section else []
+            # Raises if a translation has more or fewer lines than its section, instead of mispairing them
+            for line, translated_line in zip(lines, translated_lines, strict=True):
+                lyric_slides.append((False, f'{line}\n{translated_line.strip()}'))
     except Exception as e:
         print(e)
         print("GenAI translation failed - using standard Google translate module")
+        lyric_slides = None
 
-    if ai_translate:
+    if lyric_slides is not None:
         print("Successfully translated with GenAI")
-        
-        # Parse the temporary file similar to append_song_to_powerpoint
-
-        # should be [english line, translated line, english line, translated line etc]
-        translated_lyrics_text_list = translated_lyrics_text.split('\n')
-
-        # fuse 2 lines (english then translated) into 1 string for each slide
-
-        slide_text_list = []
-        for line_index in range(1, len(translated_lyrics_text_list), 2):
-            concat_line = f'{translated_lyrics_text_list[line_index - 1].strip()}\n{translated_lyrics_text_list[line_index].strip()}'
-            slide_text_list.append(concat_line)
-        
-        # Create slides from the translated lyrics
-        for slide_number, lyrics in enumerate(slide_text_list):
-            prs = create_text_slide(lyrics, lyrics, prs, title_size, font_size,
-                                                slide_number=slide_number, total_slides=len(translated_lyrics_text_list),
-                                                song_mode=True)
-        
         print("GenAI translated slides created successfully")
-        
     else:
         # using old google translate method
         print("Creating slides with googletrans module")
-        for slide_number, lyrics in enumerate(new_song.lyrics):
-            prs = create_text_slide_translated(lyrics[0], lyrics[1], prs, title_size, font_size,
-                                                slide_number=slide_number, total_slides=len(new_song.lyrics),
-                                                song_mode=True, language=language)
+        lyric_slides = [(True, lyrics) for lyrics in translate_lyrics_sections([lyrics[1] for lyrics in new_song.lyrics], language)]
         print("Googletrans translated slides created successfully")
 
-    return prs
\ No newline at end of file
+    return lyric_slides
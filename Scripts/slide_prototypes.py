@@ -0,0 +1,78 @@
+"""
+Module for making slides by copying a prototype slide.
+
+Building a text slide through python-pptx takes many calls for each slide: adding the slide and copying its layout's
+placeholders, adding text boxes, then setting the font size, boldness and alignment of every paragraph.
+Most slides in a powerpoint (song lyrics especially) only differ from the one before them by their text,
+so the first slide of each kind is built normally and kept as a prototype. Later slides of that kind are made by
+copying the prototype's XML and replacing the text in its text boxes, giving the same XML as building them normally.
+
+Prototypes are kept for each presentation, keyed by whatever decides how their slides look (e.g. the kind of
+slide and its font sizes).
+"""
+from copy import deepcopy
+from weakref import WeakKeyDictionary
+from pptx.opc.constants import CONTENT_TYPE as CT, RELATIONSHIP_TYPE as RT
+from pptx.oxml.ns import qn
+from pptx.parts.slide import SlidePart
+
+# Maps a presentation's part to {key: SlidePrototype}
+_prototypes = WeakKeyDictionary()
+
+class SlidePrototype:
+    '''
+    A slide whose XML is copied to make new slides, with the text of some of its text boxes replaced.
+
+    Each text box keeps the formatting of its first paragraphs. When the text is replaced, paragraph i of the new
+    text is formatted like paragraph i % (number of formatted paragraphs) of the prototype
+    '''
+
+    def __init__(self, slide, text_boxes):
+        self.layout_part = slide.part.part_related_by(RT.SLIDE_LAYOUT)
+        self.element = deepcopy(slide._element)
+
+        # Positions of the text boxes in the shape tree, and their paragraphs without any text
+        shapes = list(slide.shapes._spTree)
+        self.text_boxes = []
+        for shape, paragraph_count in text_boxes:
+            paragraphs = [deepcopy(paragraph) for paragraph in shape.text_frame._txBody.p_lst[:paragraph_count]]
+            for paragraph in paragraphs:
+                for child in list(paragraph):
+                    if child.tag != qn('a:pPr'):
+                        paragraph.remove(child)
+            self.text_boxes.append((shapes.index(shape._element), paragraphs))
+
+    def add_slide(self, prs, texts):
+        '''
+        Adds a copy of the prototype to the end of the presentation, with texts in its text boxes
+        '''
+        element = deepcopy(self.element)
+        shapes = list(element.cSld.spTree)
+        for (shape_index, paragraphs), text in zip(self.text_boxes, texts):
+            text_body = shapes[shape_index].txBody
+            text_body.clear_content()
+            for index, line in enumerate(text.split('\n')):
+                paragraph = deepcopy(paragraphs[index % len(paragraphs)])
+                paragraph.append_text(line)
+                text_body.append(paragraph)
+
+        slide_part = SlidePart(prs.part._next_slide_partname, CT.PML_SLIDE, prs.part.package, element)
+        slide_part.relate_to(self.layout_part, RT.SLIDE_LAYOUT)
+        prs.slides._sldIdLst.add_sldId(prs.part.relate_to(slide_part, RT.SLIDE))
+        return slide_part.slide
+
+def add_prototype_slide(prs, key, texts: list[str], build):
+    '''
+    Adds a slide with texts in its text boxes. If there is no prototype for key yet, build() is called to build the
+    slide normally, and must return the slide and a list of (text box, number of formatted paragraphs) for each text
+    in texts. The built slide then becomes the prototype for key, as long as each text box has that many paragraphs
+    '''
+    prototypes = _prototypes.setdefault(prs.part, {})
+    prototype = prototypes.get(key)
+    if prototype is not None:
+        return prototype.add_slide(prs, texts)
+
+    slide, text_boxes = build()
+    if all(len(shape.text_frame.paragraphs) >= paragraph_count for shape, paragraph_count in text_boxes):
+        prototypes[key] = SlidePrototype(slide, text_boxes)
+    return slide
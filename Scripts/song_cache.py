@@ -0,0 +1,73 @@
+"""
+Module for caching parsed song lyrics files.
+
+Parsed songs are kept in an in-process LRU cache, which sits in front of a pickled on-disk cache in the cache folder.
+Both are keyed by the lyrics file path, its modified time and size, and the max_lines used to split sections,
+so a lyrics file is only parsed again after it has been edited.
+Songs parsed during a run are added to the on-disk cache in memory, and the file is written once when the process
+exits, rather than after every song.
+"""
+import atexit
+import os
+import pickle
+from functools import lru_cache
+from typing import Callable
+from cache_utils import cache_path, atomic_write, file_signature
+
+CACHE_FILE_NAME = 'parsed_songs.pickle'
+CACHE_VERSION = 1
+
+# Maps (lyrics path, max_lines) to (mtime, size, parsed song). Loaded from disk at most once per process
+_disk_cache = None
+# Whether songs have been added to the disk cache since it was last written
+_dirty = False
+
+def _get_disk_cache() -> dict:
+    global _disk_cache
+
+    if _disk_cache is None:
+        try:
+            with open(cache_path(CACHE_FILE_NAME), 'rb') as file:
+                version, records = pickle.load(file)
+            _disk_cache = records if version == CACHE_VERSION else {}
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError, ValueError, TypeError):
+            _disk_cache = {}
+    return _disk_cache
+
+def save_parsed_songs() -> None:
+    '''
+    Writes the disk cache if songs have been added to it. Called when the process exits
+    '''
+    global _dirty
+
+    if _dirty:
+        atomic_write(cache_path(CACHE_FILE_NAME), pickle.dumps((CACHE_VERSION, _disk_cache), protocol=pickle.HIGHEST_PROTOCOL))
+        _dirty = False
+
+atexit.register(save_parsed_songs)
+
+@lru_cache(maxsize=256)
+def _load_parsed_song(path: str, mtime: int, size: int, max_lines: int, parser: Callable):
+    global _dirty
+
+    disk_cache = _get_disk_cache()
+
+    record = disk_cache.get((path, max_lines))
+    if record is not None and record[0] == mtime and record[1] == size:
+        return record[2]
+
+    parsed = parser(path, max_lines)
+    disk_cache[(path, max_lines)] = (mtime, size, parsed)
+    _dirty = True
+    return parsed
+
+def load_parsed_song(path: str, max_lines: int, parser: Callable):
+    '''
+    Returns the result of parser(path, max_lines), reusing a cached result if the file has not changed.
+    The parser must return an immutable value, since the same value is handed to every caller
+
+    Raises FileNotFoundError if the file does not exist
+    '''
+    path = os.path.normpath(os.path.abspath(path))
+    mtime, size = file_signature(path)
+    return _load_parsed_song(path, mtime, size, max_lines, parser)
@@ -0,0 +1,181 @@
+"""
+Module for keeping a persistent index of the songs available in the Songs folder.
+
+The index is stored in the cache folder and maps each song folder to its lyrics file, the file's
+modified time and size, and the title and CCLI lines at the top of the lyrics file.
+When the index is refreshed only the song folders and lyrics files which changed are read again,
+so finding all songs never needs to walk the rest of the repository.
+"""
+import json
+import os
+import re
+from cache_utils import cache_path, atomic_write, file_signature
+
+# Global variable to store relative path information
+scripts_folder = os.path.dirname(__file__)
+songs_folder = f'{scripts_folder}/../Songs'
+
+INDEX_FILE_NAME = 'song_index.json'
+INDEX_VERSION = 1
+
+# The index is loaded from disk at most once per process
+_song_index = None
+
+def _empty_index() -> dict:
+    return {'version': INDEX_VERSION, 'songs_mtime': None, 'songs': {}}
+
+def _read_index_file() -> dict:
+    '''
+    Reads the index file from the cache folder. A missing or outdated file results in an empty index
+    '''
+    try:
+        with open(cache_path(INDEX_FILE_NAME), encoding='utf-8') as file:
+            index = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return _empty_index()
+
+    if index.get('version') != INDEX_VERSION:
+        return _empty_index()
+    return index
+
+def _write_index_file(index: dict) -> None:
+    atomic_write(cache_path(INDEX_FILE_NAME), json.dumps(index, ensure_ascii=False, indent=1).encode('utf-8'))
+
+def is_sidecar_file(file_name: str) -> bool:
+    '''
+    Returns whether a file in a song folder holds pre-translated lyrics, named "<folder>_Lyrics.<language code>.txt"
+    '''
+    return re.fullmatch(r'.*_lyrics\.[a-z]{2,3}(-[a-z0-9]{2,4})?\.txt', file_name.lower()) is not None
+
+def _find_lyrics_file(folder_path: str, folder_name: str) -> str | None:
+    '''
+    Finds the lyrics file in a song folder. The expected name is "<folder>_Lyrics.txt", but since song folders
+    are sometimes created with a different capitalisation, any other lyrics file in the folder is used as a fallback
+    '''
+    # Pre-translated lyrics (see lyric_sidecars) are never the lyrics file
+    files = sorted(file for file in os.listdir(folder_path) if file.endswith('.txt') and not is_sidecar_file(file))
+    if not files:
+        return None
+
+    expected_name = f'{folder_name}_Lyrics.txt'
+    if expected_name in files:
+        return expected_name
+
+    lyrics_files = [file for file in files if file.lower() == expected_name.lower()] or \
+                   [file for file in files if file.endswith('_Lyrics.txt')]
+    if lyrics_files:
+        return lyrics_files[0]
+    return files[0]
+
+def _read_header(lyrics_path: str) -> tuple[str, str]:
+    '''
+    Returns the first two lines of a lyrics file, which hold the song title and CCLI message
+    '''
+    with open(lyrics_path, encoding='utf-8') as file:
+        header_title = file.readline().strip()
+        ccli_line = file.readline().strip()
+    return header_title, ccli_line
+
+def refresh_song_index(index: dict) -> bool:
+    '''
+    Brings the index up to date with the Songs folder. Returns True if anything changed.
+
+    The Songs folder is only listed again if its own modified time changed (i.e. a song was added or removed),
+    a song folder is only listed again if its modified time changed, and a lyrics file is only read again
+    if its modified time or size changed.
+    '''
+    changed = False
+    songs = index['songs']
+
+    songs_mtime = os.stat(songs_folder).st_mtime_ns
+    if songs_mtime != index['songs_mtime']:
+        folder_names = {entry.name for entry in os.scandir(songs_folder) if entry.is_dir()}
+        for removed in set(songs) - folder_names:
+            del songs[removed]
+        for added in folder_names - set(songs):
+            songs[added] = {'folder_mtime': None, 'lyrics_file': None, 'mtime': None, 'size': None,
+                            'header_title': '', 'ccli_line': ''}
+        index['songs_mtime'] = songs_mtime
+        changed = True
+
+    for folder_name in list(songs):
+        entry = songs[folder_name]
+        folder_path = os.path.join(songs_folder, folder_name)
+
+        try:
+            folder_mtime = os.stat(folder_path).st_mtime_ns
+        except FileNotFoundError:
+            del songs[folder_name]
+            changed = True
+            continue
+
+        if folder_mtime != entry['folder_mtime']:
+            entry['folder_mtime'] = folder_mtime
+            entry['lyrics_file'] = _find_lyrics_file(folder_path, folder_name)
+            changed = True
+
+        if entry['lyrics_file'] is None:
+            continue
+
+        lyrics_path = os.path.join(folder_path, entry['lyrics_file'])
+        try:
+            mtime, size = file_signature(lyrics_path)
+        except FileNotFoundError:
+            # The folder changed without its modified time changing (e.g. coarse timestamps), so look again next time
+            entry['folder_mtime'] = None
+            changed = True
+            continue
+
+        if (mtime, size) != (entry['mtime'], entry['size']):
+            entry['header_title'], entry['ccli_line'] = _read_header(lyrics_path)
+            entry['mtime'], entry['size'] = mtime, size
+            changed = True
+
+    return changed
+
+def get_song_index(refresh: bool = False) -> dict[str, dict]:
+    '''
+    Returns a dictionary mapping each song folder name to its index entry.
+    The index is loaded and brought up to date the first time this is called, and again whenever refresh is True
+    '''
+    global _song_index
+
+    if _song_index is None:
+        _song_index = _read_index_file()
+        refresh = True
+
+    if refresh and refresh_song_index(_song_index):
+        _write_index_file(_song_index)
+
+    return _song_index['songs']
+
+def get_song_names(refresh: bool = False) -> set[str]:
+    '''
+    Returns the names of all songs which have lyrics in the Songs folder
+    '''
+    return {name for name, entry in get_song_index(refresh).items() if entry['lyrics_file'] is not None}
+
+def get_song_entry(song_name: str) -> dict | None:
+    '''
+    Returns the index entry of a song, ignoring capitalisation and surrounding whitespace.
+    If the song is not found the index is refreshed once in case it was added during this run
+    '''
+    wanted = song_name.strip().lower()
+    for refresh in (False, True):
+        for name, entry in get_song_index(refresh).items():
+            if name.lower() == wanted and entry['lyrics_file'] is not None:
+                return {'name': name, **entry}
+    return None
+
+def get_lyrics_path(song_name: str) -> str | None:
+    '''
+    Returns the path to the lyrics file of a song, or None if the song is not in the Songs folder
+    '''
+    entry = get_song_entry(song_name)
+    if entry is None:
+        return None
+    return os.path.join(songs_folder, entry['name'], entry['lyrics_file'])
+
+if __name__ == '__main__':
+    for song_name in sorted(get_song_names(refresh=True)):
+        print(song_name)
@@ -0,0 +1,70 @@
+"""
+Module for parsing song lyrics files.
+
+The text file format MUST be, including the square brackets:
+Song name
+CCLI: [Number here]
+[Section title]
+Lyrics for the section
+[Section title]
+Lyrics for the section
+
+Sections are produced one at a time by a generator, so a song is parsed in a single pass over its lines.
+"""
+from typing import Iterable, Iterator, TextIO
+
+def iter_song_sections(lines: Iterable[str], max_lines: int = 4) -> Iterator[tuple[str, list[str]]]:
+    '''
+    Yields (section title, lines) for every section in the lyrics lines given, which should not include the
+    title and CCLI lines at the top of the file.
+    Every section corresponds to a slide that will be shown, so sections longer than max_lines are split
+    into several sections with the same title. Lines before the first section title are ignored
+    '''
+    section_title = None
+    section_lines = []
+
+    for line in lines:
+        line = line.strip()
+        if line.startswith("[") and line.endswith("]"):
+            # New section detected - hand over the current section
+            if section_title is not None:
+                yield section_title, section_lines
+            section_title, section_lines = line[1:-1].strip(), []
+
+        elif section_title is not None:
+            # If the current section is full, create a new section with the same title
+            if len(section_lines) >= max_lines:
+                yield section_title, section_lines
+                section_lines = []
+
+            section_lines.append(line)
+
+    if section_title is not None:
+        yield section_title, section_lines
+
+def stream_song(file: TextIO, max_lines: int = 4) -> tuple[str, str, Iterator[tuple[str, list[str]]]]:
+    '''
+    Reads the title and CCLI lines from an open lyrics file and returns (title, ccli, sections),
+    where sections is a generator which reads the rest of the file as it is consumed
+    '''
+    # First two lines are reserved for the song name and ccli description
+    title = file.readline()
+    ccli = file.readline()
+    return title, ccli, iter_song_sections(file, max_lines)
+
+def parse_song(file: TextIO, max_lines: int = 4) -> tuple[str, str, tuple[tuple[str, str], ...]]:
+    '''
+    Parses an open lyrics file and returns (title, ccli, lyrics), where lyrics is a tuple of
+    (section title, section lyrics) with each lyrics line ending in a newline
+    '''
+    title, ccli, sections = stream_song(file, max_lines)
+    lyrics = tuple((section_title, ''.join(f'{line}\n' for line in section_lines))
+                   for section_title, section_lines in sections)
+    return title, ccli, lyrics
+
+def parse_song_file(lyrics_text_file: str, max_lines: int = 4) -> tuple[str, str, tuple[tuple[str, str], ...]]:
+    '''
+    Reads a song text file and returns (title, ccli, lyrics). See parse_song
+    '''
+    with open(lyrics_text_file, encoding='utf-8') as file:
+        return parse_song(file, max_lines)
@@ -0,0 +1,56 @@
+"""
+Module for caching PowerPoint templates in memory.
+
+Each template file is read from disk once per process and its bytes are kept in memory. Every call to load_template
+hands out a new Presentation parsed from those bytes, so presentations never share state and the template files
+are only read again after they have been edited.
+"""
+import os
+from io import BytesIO
+from pptx import Presentation
+from cache_utils import file_signature
+
+# Global variable to store relative path information
+scripts_folder = os.path.dirname(__file__)
+templates_folder = f'{scripts_folder}/../Templates'
+
+# Maps a template path to ((mtime, size), file contents)
+_template_bytes = {}
+
+def template_paths() -> list[str]:
+    '''
+    Returns the paths of every template in the Templates folder
+    '''
+    return [os.path.join(root, file) for root, _, files in os.walk(templates_folder) for file in files if file.endswith(".pptx")]
+
+def template_bytes(path: str) -> bytes:
+    '''
+    Returns the contents of a template file, reading it only if it has not been read yet or has changed since
+
+    Raises FileNotFoundError if the file does not exist
+    '''
+    path = os.path.normpath(os.path.abspath(path))
+    signature = file_signature(path)
+    cached = _template_bytes.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    with open(path, 'rb') as file:
+        data = file.read()
+    _template_bytes[path] = (signature, data)
+    return data
+
+def load_template(path: str) -> Presentation:
+    '''
+    Returns a new presentation made from a template
+    '''
+    return Presentation(BytesIO(template_bytes(path)))
+
+def warm_up(paths: list[str] = None) -> int:
+    '''
+    Reads templates into memory ahead of time, so later builds in the same process do not have to.
+    Reads every template in the Templates folder if no paths are given, and returns the number of bytes held
+    '''
+    if paths is None:
+        paths = template_paths()
+    return sum(len(template_bytes(path)) for path in paths)
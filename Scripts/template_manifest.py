@@ -0,0 +1,218 @@
+"""
+Module for keeping a manifest of the PowerPoint templates in the Templates folder.
+
+The manifest is stored in the cache folder and records, for each template, its slide size, the index of its blank
+layout, its theme colours, the bytes taken up by its media, its font size profile and a hash of its contents, so a
+template can be chosen and its font sizes decided without opening any template. Entries are read straight from the
+parts of the template's zip file, without parsing the whole presentation.
+
+An entry is only made again when its template's contents change. A template whose modified time changed but whose
+contents did not (e.g. after a fresh checkout in CI, where the manifest is restored from the workflow cache) is only
+hashed.
+"""
+import hashlib
+import json
+import os
+import posixpath
+import zipfile
+from io import BytesIO
+from random import choice
+from lxml import etree
+from cache_utils import cache_path, atomic_write, file_signature
+from template_cache import templates_folder, template_paths, template_bytes
+
+MANIFEST_FILE_NAME = 'template_manifest.json'
+MANIFEST_VERSION = 3
+
+# Font sizes used with each size of template
+FONT_SIZES = {
+    'small': {'title': 70, 'song': 53, 'bible reading': 43, 'tithing': 32},
+    'medium': {'title': 50, 'song': 33, 'bible reading': 32, 'tithing': 23},
+    'large': {'title': 40, 'song': 27, 'bible reading': 23, 'tithing': 16},
+}
+
+# Every template must have a blank slide as its 7th layout
+BLANK_LAYOUT_INDEX = 6
+
+NAMESPACES = {
+    'a': 'http://schemas.openxmlformats.org/drawingml/2006/main',
+    'p': 'http://schemas.openxmlformats.org/presentationml/2006/main',
+    'r': 'http://schemas.openxmlformats.org/officeDocument/2006/relationships',
+}
+RELATIONSHIP_ID = f"{{{NAMESPACES['r']}}}id"
+
+# The manifest is loaded from disk at most once per process
+_template_manifest = None
+
+def font_profile(path: str) -> str:
+    '''
+    Returns the font size profile of a template. Templates are named small_1, small_2, med_1, large_1, etc
+    '''
+    template_name = os.path.basename(path)
+    if template_name.startswith('small'):
+        return 'small'
+    elif template_name.startswith('large'):
+        return 'large'
+    return 'medium'
+
+def _empty_manifest() -> dict:
+    return {'version': MANIFEST_VERSION, 'templates': {}}
+
+def _read_manifest_file() -> dict:
+    '''
+    Reads the manifest file from the cache folder. A missing or outdated file results in an empty manifest
+    '''
+    try:
+        with open(cache_path(MANIFEST_FILE_NAME), encoding='utf-8') as file:
+            manifest = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return _empty_manifest()
+
+    if manifest.get('version') != MANIFEST_VERSION:
+        return _empty_manifest()
+    return manifest
+
+def _write_manifest_file(manifest: dict) -> None:
+    atomic_write(cache_path(MANIFEST_FILE_NAME), json.dumps(manifest, indent=1).encode('utf-8'))
+
+def _blank_layout_index(layout_names: list[str]) -> int | None:
+    if len(layout_names) > BLANK_LAYOUT_INDEX:
+        return BLANK_LAYOUT_INDEX
+    for index, name in enumerate(layout_names):
+        if name.strip().lower() == 'blank':
+            return index
+    if len(layout_names) == 1:
+        return 0
+    return None
+
+def blank_layout_index(prs) -> int | None:
+    '''
+    Returns the index of the layout used for blank slides: the 7th layout, or for templates with fewer layouts
+    (such as compacted templates, which only keep the blank layout) a layout named Blank or the only layout
+    '''
+    return _blank_layout_index([layout.name for layout in prs.slide_layouts])
+
+def _part_relationships(archive: zipfile.ZipFile, part: str) -> dict[str, tuple[str, str]]:
+    '''
+    Returns the relationships of a part of a template, mapping each relationship id to (type, e.g. 'theme',
+    path of the related part)
+    '''
+    folder, file_name = posixpath.split(part)
+    relationships = etree.fromstring(archive.read(f'{folder}/_rels/{file_name}.rels'))
+    return {relationship.get('Id'): (relationship.get('Type').rsplit('/', 1)[-1],
+                                     posixpath.normpath(posixpath.join(folder, relationship.get('Target'))))
+            for relationship in relationships}
+
+def _theme_colours(theme) -> dict:
+    '''
+    Returns the colour scheme of a theme, mapping each colour's name (dk1, accent1, etc) to a hex colour
+    '''
+    colours = {}
+    for colour in theme.iterfind('a:themeElements/a:clrScheme/*', NAMESPACES):
+        value = colour.find('a:srgbClr', NAMESPACES)
+        if value is not None:
+            colours[etree.QName(colour).localname] = value.get('val')
+            continue
+        value = colour.find('a:sysClr', NAMESPACES)
+        if value is not None:
+            colours[etree.QName(colour).localname] = value.get('lastClr')
+    return colours
+
+def _read_template(path: str, signature: tuple[int, int]) -> dict:
+    '''
+    Reads a template's zip file and returns its manifest entry. The layouts and theme are those of the first
+    slide master, which are the ones python-pptx uses
+    '''
+    # The template's bytes are kept in memory by template_cache, so loading it afterwards does not read it again
+    data = template_bytes(path)
+    with zipfile.ZipFile(BytesIO(data)) as archive:
+        presentation = etree.fromstring(archive.read('ppt/presentation.xml'))
+        slide_size = presentation.find('p:sldSz', NAMESPACES)
+
+        master_id = presentation.find('p:sldMasterIdLst/p:sldMasterId', NAMESPACES).get(RELATIONSHIP_ID)
+        master_path = _part_relationships(archive, 'ppt/presentation.xml')[master_id][1]
+        master = etree.fromstring(archive.read(master_path))
+        master_relationships = _part_relationships(archive, master_path)
+
+        layout_names = []
+        for layout_id in master.iterfind('p:sldLayoutIdLst/p:sldLayoutId', NAMESPACES):
+            layout = etree.fromstring(archive.read(master_relationships[layout_id.get(RELATIONSHIP_ID)][1]))
+            layout_names.append(layout.find('p:cSld', NAMESPACES).get('name', ''))
+        theme_path = next(target for kind, target in master_relationships.values() if kind == 'theme')
+        theme = etree.fromstring(archive.read(theme_path))
+
+        media_bytes = sum(info.file_size for info in archive.infolist() if info.filename.startswith('ppt/media/'))
+
+    blank_layout = _blank_layout_index(layout_names)
+    return {
+        'mtime': signature[0],
+        'size': signature[1],
+        'sha256': hashlib.sha256(data).hexdigest(),
+        'slide_width': int(slide_size.get('cx')),
+        'slide_height': int(slide_size.get('cy')),
+        'blank_layout': blank_layout,
+        'blank_layout_name': None if blank_layout is None else layout_names[blank_layout],
+        'theme_colours': _theme_colours(theme),
+        'media_bytes': media_bytes,
+        'font_profile': font_profile(path),
+    }
+
+def refresh_template_manifest(manifest: dict) -> bool:
+    '''
+    Brings the manifest up to date with the Templates folder. Returns True if anything changed.
+    A template is only read if its modified time or size changed, and only hashed if its size is the same
+    '''
+    changed = False
+    templates = manifest['templates']
+
+    paths = {os.path.relpath(path, templates_folder): path for path in template_paths()}
+    for removed in set(templates) - set(paths):
+        del templates[removed]
+        changed = True
+
+    for name, path in paths.items():
+        signature = file_signature(path)
+        entry = templates.get(name)
+        if entry is not None and (entry['mtime'], entry['size']) == signature:
+            continue
+        if entry is not None and entry['size'] == signature[1] and entry['sha256'] == hashlib.sha256(template_bytes(path)).hexdigest():
+            # Only the modified time changed
+            entry['mtime'] = signature[0]
+        else:
+            templates[name] = _read_template(path, signature)
+        changed = True
+    return changed
+
+def get_template_manifest() -> dict:
+    '''
+    Returns the manifest of templates, mapping each template's path (relative to the Templates folder) to its entry
+    '''
+    global _template_manifest
+
+    if _template_manifest is None:
+        _template_manifest = _read_manifest_file()
+    if refresh_template_manifest(_template_manifest):
+        _write_manifest_file(_template_manifest)
+    return _template_manifest['templates']
+
+def template_path(name: str) -> str:
+    '''
+    Returns the full path of a template from its name in the manifest
+    '''
+    return os.path.join(templates_folder, name)
+
+def choose_template() -> tuple[str, dict]:
+    '''
+    Picks a random template, returning its path and manifest entry
+    '''
+    templates = get_template_manifest()
+    if not templates:
+        raise FileNotFoundError("No PowerPoint templates found in the Templates folder.")
+    name = choice(sorted(templates))
+    return template_path(name), templates[name]
+
+def font_sizes(path: str) -> dict:
+    '''
+    Returns the font sizes to use with a template
+    '''
+    return FONT_SIZES[font_profile(path)]
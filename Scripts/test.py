@@ -2,6 +2,7 @@
 import random
 from slide_builders import create_from_template, create_offering_slide,create_starting_slides, create_title_and_text_slide, create_title_slide, add_title_with_image_on_right, append_song_to_powerpoint, append_song_to_powerpoint_translated
 from helpers import scripts_folder
+from template_manifest import FONT_SIZES
 from bible_passage import bible_passage, get_correct_copyright_message
 import PIL
 import os
@@ -20,10 +21,6 @@ def test():
 
     count = 0
 
-    font_sizes_large = {'title': 40, 'song': 27, 'bible reading': 23, 'tithing': 16}
-    font_sizes_medium = {'title': 50, 'song': 33, 'bible reading': 32, 'tithing': 23}
-    font_sizes_small = {'title': 70, 'song': 53, 'bible reading': 43, 'tithing': 32}
-
     # select some random numbers from that range
     selected_nums = set()
     for _ in range(6):
@@ -39,14 +36,7 @@ def test():
         ppt_obj = my_ppt.presentation
         ppt_font_size = my_ppt.font_size
 
-        used_font = font_sizes_medium
-
-        if ppt_font_size == 'small':
-            used_font = font_sizes_small
-        elif ppt_font_size == 'medium':
-            used_font = font_sizes_medium
-        elif ppt_font_size == 'large':
-            used_font = font_sizes_large
+        used_font = FONT_SIZES[ppt_font_size]
         
         ppt_obj = create_starting_slides(ppt_obj, used_font['title'], used_font['title'] - 10)
 
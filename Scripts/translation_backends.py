@@ -0,0 +1,296 @@
+"""
+Module for the backends used to translate songs.
+
+Every backend follows the TranslationBackend protocol: it translates a list of texts into a language, returning
+each text's translation with the same number of lines. The backends are Google translate (through deep_translator),
+Gemini, and a stub which translates offline and always gives the same result, for testing and benchmarking builds.
+
+Which backend is used is configured by environment variables. TRANSLATION_BACKEND sets the backend for everything,
+and SONG_TRANSLATION_BACKEND overrides it for song lyrics. By default lyrics are translated by Gemini and everything
+else by Google translate. Either can be a comma separated list of backends (e.g. "gemini,google"), in which case
+each translation uses the fastest healthy backend in the list so far.
+
+The latency, bytes sent and received and failures of every call to a backend are recorded. Run this file directly
+to benchmark backends on a song, e.g. python translation_backends.py google stub
+"""
+import os
+import sys
+import threading
+import time
+from typing import Protocol
+from deep_translator import GoogleTranslator
+from ai_translate import GEMINI_MODEL, PROMPT_VERSION, request_gemini_translation
+from translation_cache import cached_translations
+from translation_scheduler import call_backend
+
+# mapping
+top_languages = {
+    "Mandarin Chinese": "zh-CN",
+    "Spanish": "es",
+    "Hindi": "hi",
+    "Arabic": "ar",
+    "Bengali": "bn",
+    "Portuguese": "pt",
+    "Russian": "ru",
+    "Japanese": "ja",
+    "Punjabi": "pa",
+    "German": "de"
+}
+
+# Backends used for song lyrics ('songs') and everything else ('lines') unless set by an environment variable
+DEFAULT_BACKENDS = {'songs': 'gemini', 'lines': 'google'}
+
+# A backend is unhealthy once more than this fraction of at least MIN_CALLS calls have failed
+MAX_FAILURE_RATE = 0.5
+MIN_CALLS = 3
+
+def get_language_code(language: str) -> str:
+    '''
+    Returns the Google translate code of a language, defaulting to chinese if it is not found
+    '''
+    for lang, code in top_languages.items():
+        if language.lower() in lang.lower():
+            return code
+    return "zh-CN"
+
+def _lines(text: str) -> list[str]:
+    return [line.strip() for line in text.split('\n') if line.strip()]
+
+def _split_by_line_counts(lines: list[str], line_counts: list[int]) -> list[str]:
+    texts = []
+    for line_count in line_counts:
+        texts.append('\n'.join(lines[:line_count]))
+        lines = lines[line_count:]
+    return texts
+
+class LineCountError(ValueError):
+    '''
+    Raised when a translation does not have one line for each line of its text, so the lines cannot be matched up
+    '''
+
+class TranslationBackend(Protocol):
+    '''
+    name, model and version are part of the translation cache key, so a change to any of them means
+    translations are not reused
+    '''
+    name: str
+    model: str
+    version: int
+
+    def translate(self, texts: list[str], language: str) -> list[str]:
+        '''
+        Returns the translation of each text into language, with one translated line for each non-empty line
+        '''
+        ...
+
+class GoogleBackend:
+    '''
+    Translates with Google translate. Texts are joined into requests of up to BATCH_CHARACTERS characters
+    '''
+    name = 'google'
+    model = 'deep_translator'
+    version = 1
+
+    # Most characters sent to Google translate in one request (it accepts up to 5000)
+    BATCH_CHARACTERS = 4500
+
+    def __init__(self):
+        # GoogleTranslator keeps the text being translated on itself, so each thread has its own translators
+        self._translators = threading.local()
+
+    def _translator(self, target: str) -> GoogleTranslator:
+        translators = self._translators.__dict__.setdefault('translators', {})
+        if target not in translators:
+            translators[target] = GoogleTranslator(source='auto', target=target)
+        return translators[target]
+
+    def _request(self, text: str, target: str, line_count: int) -> list[str]:
+        # Blank lines are not translated, so blank lines in the answer are dropped
+        translated = _lines(call_backend(self.name, self._translator(target).translate, text) or '')
+        if len(translated) != line_count:
+            raise LineCountError(f"Google translate gave {len(translated)} translated lines for {line_count} lines")
+        return translated
+
+    def _translate_text(self, text: str, target: str) -> str:
+        '''
+        Translates a text in one request, or each of its lines in a request of its own if lines were merged or split
+        '''
+        lines = _lines(text)
+        if not lines:
+            return ''
+        try:
+            return '\n'.join(self._request(text, target, len(lines)))
+        except LineCountError:
+            if len(lines) == 1:
+                raise
+        return '\n'.join(self._request(line, target, 1)[0] for line in lines)
+
+    def translate(self, texts: list[str], language: str) -> list[str]:
+        target = get_language_code(language)
+        if len(texts) == 1:
+            return [self._translate_text(texts[0], target)]
+
+        # Group texts into requests of at most BATCH_CHARACTERS characters
+        batches = [[]]
+        batch_length = 0
+        for text in texts:
+            if batches[-1] and batch_length + len(text) + 1 > self.BATCH_CHARACTERS:
+                batches.append([])
+                batch_length = 0
+            batches[-1].append(text)
+            batch_length += len(text) + 1
+
+        translations = []
+        for batch in batches:
+            line_counts = [len(_lines(text)) for text in batch]
+            if sum(line_counts) == 0:
+                translations += [''] * len(batch)
+                continue
+            try:
+                translations += _split_by_line_counts(self._request('\n'.join(batch), target, sum(line_counts)), line_counts)
+            except LineCountError:
+                # Lines were merged or split in the translation, so they cannot be matched up. Translate them one by one
+                translations += [self._translate_text(text, target) for text in batch]
+        return translations
+
+class GeminiBackend:
+    '''
+    Translates with Gemini, which is asked to match the syllables of each line so the translation can be sung.
+    All texts are sent in one request
+    '''
+    name = 'gemini'
+    model = GEMINI_MODEL
+    version = PROMPT_VERSION
+
+    def _request(self, text: str, language: str) -> list[str]:
+        # Gemini answers with each line followed by its translation
+        translated = _lines(call_backend(self.name, request_gemini_translation, text, language, 'English'))[1::2]
+        if len(translated) != len(_lines(text)):
+            raise LineCountError(f"Gemini gave {len(translated)} translated lines for {len(_lines(text))} lines")
+        return translated
+
+    def translate(self, texts: list[str], language: str) -> list[str]:
+        line_counts = [len(_lines(text)) for text in texts]
+        try:
+            return _split_by_line_counts(self._request('\n'.join(texts), language), line_counts)
+        except LineCountError:
+            if len(texts) == 1:
+                raise
+
+        # Lines were merged or split in the translation, so they cannot be matched up with texts. Translate them one by one
+        return ['\n'.join(self._request(text, language)) for text in texts]
+
+class StubBackend:
+    '''
+    Translates offline by marking each line with the language code, e.g. "[zh-CN] Amazing grace".
+    Always gives the same translation, so translated builds can be tested and benchmarked without a network
+    '''
+    name = 'stub'
+    model = 'stub'
+    version = 1
+
+    def translate(self, texts: list[str], language: str) -> list[str]:
+        code = get_language_code(language)
+        return ['\n'.join(f'[{code}] {line}' for line in _lines(text)) for text in texts]
+
+BACKENDS = {backend.name: backend for backend in (GoogleBackend(), GeminiBackend(), StubBackend())}
+
+class BackendMetrics:
+    '''
+    The calls made to a backend: how many, how many failed, and their total latency and bytes sent and received
+    '''
+
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        self.seconds = 0.0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    @property
+    def mean_latency(self) -> float:
+        return self.seconds / self.calls if self.calls else 0.0
+
+    @property
+    def healthy(self) -> bool:
+        return self.calls < MIN_CALLS or self.failures / self.calls <= MAX_FAILURE_RATE
+
+_metrics = {name: BackendMetrics() for name in BACKENDS}
+_metrics_lock = threading.Lock()
+
+def measured_translate(backend: TranslationBackend, texts: list[str], language: str) -> list[str]:
+    '''
+    Calls backend.translate, recording its latency, bytes and whether it failed
+    '''
+    start = time.perf_counter()
+    translations = None
+    try:
+        translations = backend.translate(texts, language)
+        return translations
+    finally:
+        with _metrics_lock:
+            metrics = _metrics[backend.name]
+            metrics.calls += 1
+            metrics.seconds += time.perf_counter() - start
+            metrics.bytes_sent += sum(len(text.encode('utf-8')) for text in texts)
+            if translations is None:
+                metrics.failures += 1
+            else:
+                metrics.bytes_received += sum(len(text.encode('utf-8')) for text in translations)
+
+def backend_metrics() -> dict[str, BackendMetrics]:
+    '''
+    Returns the metrics of every backend which has been called in this process
+    '''
+    return {name: metrics for name, metrics in _metrics.items() if metrics.calls}
+
+def print_backend_metrics() -> None:
+    '''
+    Prints the calls, failures, mean latency and bytes of every backend which has been called
+    '''
+    for name, metrics in sorted(backend_metrics().items()):
+        print(f"Translation backend ({name}): {metrics.calls} calls, {metrics.failures} failed, "
+              f"{metrics.mean_latency * 1000:.0f}ms mean latency, {metrics.bytes_sent:,} bytes sent, {metrics.bytes_received:,} received")
+
+def choose_backend(kind: str = 'lines') -> TranslationBackend:
+    '''
+    Returns the backend configured for a kind of translation ('songs' or 'lines'). If several backends are configured,
+    the healthy one with the lowest mean latency is returned. Backends which have not been called yet count as the
+    fastest, so each is tried once
+    '''
+    names = os.environ.get('TRANSLATION_BACKEND', DEFAULT_BACKENDS[kind])
+    if kind == 'songs':
+        names = os.environ.get('SONG_TRANSLATION_BACKEND', os.environ.get('TRANSLATION_BACKEND', DEFAULT_BACKENDS[kind]))
+
+    candidates = []
+    for name in names.split(','):
+        name = name.strip().lower()
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown translation backend {name}, choose from {', '.join(BACKENDS)}")
+        candidates.append(BACKENDS[name])
+
+    with _metrics_lock:
+        healthy = [backend for backend in candidates if _metrics[backend.name].healthy] or candidates
+        return min(healthy, key=lambda backend: _metrics[backend.name].mean_latency)
+
+def translate_texts(texts: list[str], language: str, kind: str = 'lines') -> list[str]:
+    '''
+    Translates texts with the backend configured for kind, reusing translations from the translation cache.
+    Only texts which are not in the cache are sent, together in one call to the backend
+    '''
+    backend = choose_backend(kind)
+    return cached_translations(texts, 'auto', get_language_code(language), backend.name, backend.model, backend.version,
+                               lambda texts: measured_translate(backend, texts, language))
+
+if __name__ == '__main__':
+    from slide_builders import song_object_from_name
+
+    song = song_object_from_name('Amazing Grace', 2)
+    sections = [lyrics for _, lyrics in song.lyrics]
+    for name in sys.argv[1:] or list(BACKENDS):
+        try:
+            # The cache is skipped so every backend is actually called
+            measured_translate(BACKENDS[name], sections, "Chinese (Simplified)")
+        except Exception as e:
+            print(f"{name} failed: {e}")
+    print_backend_metrics()
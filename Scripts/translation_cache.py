@@ -0,0 +1,105 @@
+"""
+Module for caching translations between runs.
+
+Translations are stored in an SQLite database in the cache folder, keyed by the normalised text, the source and
+target languages, the engine (e.g. google or gemini), its model and the version of the prompt given to it.
+Changing the model or the prompt therefore never reuses translations made with the old one.
+Failed translations raise instead of returning, and empty translations are not kept, so neither is ever stored.
+
+Hits and misses are counted for each engine, so a run can report how many translations it made over the network.
+"""
+import sqlite3
+import threading
+from collections import Counter
+from typing import Callable
+from cache_utils import cache_path
+
+DATABASE_FILE_NAME = 'translations.sqlite3'
+
+_connection = None
+# Translations may be looked up from several threads at once
+_lock = threading.Lock()
+
+# Maps (engine, 'hits' or 'misses') to the number of lookups in this process
+_stats = Counter()
+
+def _get_connection() -> sqlite3.Connection:
+    global _connection
+
+    if _connection is None:
+        _connection = sqlite3.connect(cache_path(DATABASE_FILE_NAME), check_same_thread=False)
+        _connection.execute('''
+            CREATE TABLE IF NOT EXISTS translations (
+                text TEXT NOT NULL,
+                source TEXT NOT NULL,
+                target TEXT NOT NULL,
+                engine TEXT NOT NULL,
+                model TEXT NOT NULL,
+                prompt_version INTEGER NOT NULL,
+                translation TEXT NOT NULL,
+                PRIMARY KEY (text, source, target, engine, model, prompt_version)
+            )
+        ''')
+        _connection.commit()
+    return _connection
+
+def normalise_text(text: str) -> str:
+    '''
+    Removes whitespace which does not change a translation: line endings, spaces around each line and blank lines
+    at the start and end
+    '''
+    return '\n'.join(line.strip() for line in text.replace('\r\n', '\n').split('\n')).strip('\n')
+
+def cached_translations(texts: list[str], source: str, target: str, engine: str, model: str, prompt_version: int,
+                        translate_many: Callable[[list[str]], list[str]]) -> list[str]:
+    '''
+    Returns the translations of texts in order. Texts without a stored translation are normalised and given to
+    translate_many in a single call, which must return their translations in the same order
+    '''
+    texts = [normalise_text(text) for text in texts]
+    translations = {}
+
+    with _lock:
+        connection = _get_connection()
+        for text in texts:
+            if text in translations:
+                continue
+            row = connection.execute('''
+                SELECT translation FROM translations
+                WHERE text = ? AND source = ? AND target = ? AND engine = ? AND model = ? AND prompt_version = ?
+            ''', (text, source, target, engine, model, prompt_version)).fetchone()
+            if row is not None:
+                translations[text] = row[0]
+        missing = list(dict.fromkeys(text for text in texts if text not in translations))
+        _stats[engine, 'hits'] += len(texts) - len(missing)
+        _stats[engine, 'misses'] += len(missing)
+
+    if missing:
+        # The lock is not held while translating, so other threads can use the cache in the meantime
+        new_translations = dict(zip(missing, translate_many(missing)))
+        translations.update(new_translations)
+
+        with _lock:
+            connection = _get_connection()
+            connection.executemany('INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?, ?, ?)',
+                                   [(text, source, target, engine, model, prompt_version, translation)
+                                    for text, translation in new_translations.items() if translation])
+            connection.commit()
+
+    return [translations[text] for text in texts]
+
+def translation_cache_stats() -> dict[str, dict[str, int]]:
+    '''
+    Returns the number of hits and misses of each engine in this process, e.g. {'google': {'hits': 10, 'misses': 2}}
+    '''
+    stats = {}
+    for (engine, kind), count in _stats.items():
+        stats.setdefault(engine, {'hits': 0, 'misses': 0})[kind] = count
+    return stats
+
+def print_translation_cache_stats() -> None:
+    '''
+    Prints how many translations were reused from the cache and how many were made
+    '''
+    for engine, counts in sorted(translation_cache_stats().items()):
+        print(f"Translation cache ({engine}): {counts['hits']} hits, {counts['misses']} misses")
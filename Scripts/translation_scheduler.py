@@ -0,0 +1,117 @@
+"""
+Module for translating the songs of a service at the same time.
+
+Every song in a set is translated at once on a FetchStage, and the results are returned in setlist order.
+Requests to each translation backend go through call_backend, which keeps to the backend's rate limit (how many
+requests can run at once and how many can start each minute) and retries failed requests with exponential backoff.
+"""
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable
+from fetch_stage import FetchStage
+
+# Limits of each translation backend. Gemini's free tier allows 10 requests a minute
+BACKEND_LIMITS = {
+    'gemini': {'concurrency': 6, 'per_minute': 10},
+    'google': {'concurrency': 4, 'per_minute': 60},
+}
+
+# Times a request is attempted before giving up, and the seconds waited after the first failure (doubled each time)
+MAX_ATTEMPTS = 3
+BACKOFF = 2
+
+# Errors caused by the code or its configuration (e.g. a missing API key), which retrying will not fix
+NOT_RETRIED = (KeyError, TypeError, ValueError, AttributeError)
+
+class RateLimiter:
+    '''
+    Limits how many requests run at once, and how many start in any minute. Requests within both limits start
+    straight away, so a whole set of songs can be sent together. Use as a context manager around each request
+    '''
+
+    def __init__(self, concurrency: int, per_minute: int):
+        self._semaphore = threading.BoundedSemaphore(concurrency)
+        self._per_minute = per_minute
+        # Start times of the requests in the last minute
+        self._starts = deque()
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> 'RateLimiter':
+        self._semaphore.acquire()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._starts and now - self._starts[0] >= 60:
+                    self._starts.popleft()
+                if len(self._starts) < self._per_minute:
+                    self._starts.append(now)
+                    return self
+                wait = 60 - (now - self._starts[0])
+            time.sleep(wait)
+
+    def __exit__(self, *exc_info):
+        self._semaphore.release()
+
+_limiters = {backend: RateLimiter(**limits) for backend, limits in BACKEND_LIMITS.items()}
+
+def call_backend(backend: str, function: Callable, *args):
+    '''
+    Returns function(*args), making the request within the backend's rate limit and retrying it if it fails.
+    The error of the last attempt is raised if every attempt fails
+    '''
+    limiter = _limiters[backend]
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        try:
+            with limiter:
+                return function(*args)
+        except NOT_RETRIED:
+            raise
+        except Exception as e:
+            if attempt == MAX_ATTEMPTS:
+                raise
+            # Jitter stops requests which failed together from all being retried together
+            delay = BACKOFF * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+            print(f"Warning: {backend} request failed ({e}), retrying in {delay:.1f} seconds")
+            time.sleep(delay)
+
+def start_translating_songs(song_names: list[str], language: str, ccli_messages: dict[str, str], stage: FetchStage) -> dict[str, Future]:
+    '''
+    Starts preparing the translated slides of every song at once, returning each song's future by name
+    '''
+    from slide_builders import prepare_song_translated
+
+    futures = {}
+    for song in song_names:
+        if len(song) > 0 and song not in futures:
+            print(f"Preparing slides with translation for {song}")
+            futures[song] = stage.submit('translation', prepare_song_translated, song, language, ccli_messages)
+    return futures
+
+def finish_translating_song(song: str, futures: dict[str, Future], ccli_messages: dict[str, str], stage: FetchStage):
+    '''
+    Waits for a song started by start_translating_songs and returns its slides, or None if the song does not exist.
+    A song whose translation failed or did not finish before the stage's deadline is prepared without a translation
+    '''
+    from slide_builders import prepare_song
+
+    failed = object()
+    song_slides = stage.result(futures[song], failed, f'Translating {song}')
+    if song_slides is failed:
+        song_slides = prepare_song(song, ccli_messages)
+    return song_slides
+
+def translate_songs(song_names: list[str], language: str = "Chinese (Simplified)", ccli_messages: dict[str, str] = None,
+                    stage: FetchStage = None) -> list:
+    '''
+    Prepares the translated slides of songs at the same time, returning them in the same order as song_names.
+    Songs which do not exist are None
+    '''
+    if stage is None:
+        with FetchStage() as stage:
+            return translate_songs(song_names, language, ccli_messages, stage)
+
+    futures = start_translating_songs(song_names, language, ccli_messages, stage)
+    return [finish_translating_song(song, futures, ccli_messages, stage) if song in futures else None for song in song_names]
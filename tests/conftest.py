@@ -0,0 +1,39 @@
+import os
+import sys
+import pytest
+
+# The scripts import each other by module name, as they do when run from the Scripts folder
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'Scripts'))
+
+@pytest.fixture
+def translation_cache(tmp_path, monkeypatch):
+    '''
+    Keeps the translations made by a test in a database of its own
+    '''
+    import translation_cache
+
+    monkeypatch.setattr(translation_cache, 'cache_path', lambda name: str(tmp_path / name))
+    monkeypatch.setattr(translation_cache, '_connection', None)
+    return translation_cache
+
+@pytest.fixture
+def song_library(tmp_path, monkeypatch):
+    '''
+    Points the song library at an empty Songs folder, keeping its index in a cache folder of the test's own
+    '''
+    import song_library
+
+    (tmp_path / 'Songs').mkdir()
+    (tmp_path / 'cache').mkdir()
+    monkeypatch.setattr(song_library, 'songs_folder', str(tmp_path / 'Songs'))
+    monkeypatch.setattr(song_library, 'cache_path', lambda name: str(tmp_path / 'cache' / name))
+    monkeypatch.setattr(song_library, '_song_index', None)
+    return song_library
+
+def touch(path) -> None:
+    '''
+    Moves a file's or folder's modified time forward, as if it was changed a second after it was last changed.
+    Files written in quick succession can otherwise share a modified time
+    '''
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
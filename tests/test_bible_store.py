@@ -0,0 +1,98 @@
+import re
+from urllib.parse import parse_qs, urlparse
+import pytest
+from meaningless import WebExtractor
+from meaningless.utilities import common
+from meaningless.utilities.exceptions import InvalidSearchError
+import bible_store
+
+# Verses in each chapter of the made up John. A new paragraph starts every 5 verses
+CHAPTER_LENGTHS = {3: 36, 4: 12}
+
+def _chapter_range(query: str) -> tuple[int, int, int, int]:
+    match = re.fullmatch(r'John (\d+)(?::(\d+))?(?:\s*-\s*(?:(\d+):)?(\d+))?', query)
+    chapter_from, verse_from = int(match[1]), int(match[2] or 1)
+    if match[4] is None:
+        return chapter_from, verse_from, chapter_from, verse_from if match[2] else 9000
+    if match[3] is not None:
+        return chapter_from, verse_from, int(match[3]), int(match[4])
+    if match[2] is not None:
+        return chapter_from, verse_from, chapter_from, int(match[4])
+    return chapter_from, 1, int(match[4]), 9000
+
+def _page(url: str, *args) -> bytes:
+    '''
+    Answers a Bible Gateway search with a page laid out like Bible Gateway's, for a book of John with made up verses
+    '''
+    chapter_from, verse_from, chapter_to, verse_to = _chapter_range(parse_qs(urlparse(url).query)['search'][0])
+    verses = [(chapter, verse) for chapter, length in CHAPTER_LENGTHS.items() for verse in range(1, length + 1)
+              if (chapter_from, verse_from) <= (chapter, verse) <= (chapter_to, verse_to)]
+    if not verses:
+        return b'<html><body><div class="search-results">No results found.</div></body></html>'
+
+    html = ''
+    paragraph = []
+    for chapter, verse in verses:
+        if paragraph and (verse == 1 or verse % 5 == 1):
+            html += f'<p>{" ".join(paragraph)}</p>'
+            paragraph = []
+        if verse == 1:
+            html += f'<h2>John {chapter}</h2><h3>Heading {chapter}</h3>'
+        number = f'<span class="chapternum">{chapter}\xa0</span>' if verse == 1 else f'<sup class="versenum">{verse}\xa0</sup>'
+        paragraph.append(f'<span class="text John-{chapter}-{verse}">{number}Verse {chapter}:{verse} text.</span>')
+    html += f'<p>{" ".join(paragraph)}</p>'
+    return f'<html><body><div class="passage-content"><div>{html}</div></div></body></html>'.encode('utf-8')
+
+@pytest.fixture
+def pages(tmp_path, monkeypatch):
+    '''
+    Serves Bible Gateway pages from _page, keeping the chapters a test stores in a folder of its own.
+    Returns the searches made on Bible Gateway
+    '''
+    searches = []
+
+    def get_page(url, *args):
+        searches.append(parse_qs(urlparse(url).query)['search'][0])
+        return _page(url)
+
+    monkeypatch.setattr(common, 'get_page', get_page)
+    monkeypatch.setattr(bible_store, 'cache_path', lambda name: str(tmp_path / name))
+    monkeypatch.setattr(bible_store, '_stores', {})
+    return searches
+
+@pytest.mark.parametrize('reference', ['John 3:16', 'John 3:16-20', 'John 3:35 - 4:2', 'John 3:34-4:7', 'John 3:1-3',
+                                       'John 4', 'John 3-4'])
+def test_search_matches_bible_gateway(pages, reference):
+    expected = WebExtractor(translation='NIV', output_as_list=True).search(reference)
+
+    assert bible_store.search(reference) == expected
+    # Searched again from the stored chapters, without going to Bible Gateway
+    searches = len(pages)
+    assert bible_store.search(reference) == expected
+    assert len(pages) == searches
+
+def test_chapters_are_kept_between_runs(pages):
+    bible_store.search('John 3:16')
+    bible_store._stores.clear()
+
+    assert bible_store.search('John 3:17') == ['¹⁷ Verse 3:17 text.']
+    assert pages == ['John 3:1 - 9000']
+
+def test_parse_reference():
+    end = common.get_end_of_chapter()
+    assert bible_store.parse_reference('John 3:16') == ('John', 3, 16, 3, 16)
+    assert bible_store.parse_reference('john 3:16 - 20') == ('John', 3, 16, 3, 20)
+    assert bible_store.parse_reference('1 John 3:1-4:2') == ('1 John', 3, 1, 4, 2)
+    assert bible_store.parse_reference('Psalm 23') == ('Psalms', 23, 1, 23, end)
+    assert bible_store.parse_reference('John 3; Romans 5:8') is None
+
+def test_invalid_book_is_searched_on_bible_gateway(pages, monkeypatch):
+    monkeypatch.setattr(common, 'get_chapter_count', lambda book, translation: 0)
+
+    assert bible_store.parse_reference('John 3:16') is None
+    assert bible_store.search('John 3:16') == ['¹⁶ Verse 3:16 text.']
+    assert pages == ['John 3:16']
+
+def test_verse_which_does_not_exist(pages):
+    with pytest.raises(InvalidSearchError):
+        bible_store.search('John 3:40')
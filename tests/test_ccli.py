@@ -0,0 +1,73 @@
+import csv
+import os
+import pytest
+import fuzzywuzzy.fuzz
+import ccli
+from conftest import touch
+
+ROWS = [
+    ['10,000 Reasons (Bless the Lord)', 'Matt Redman, Jonas Myrin', '6016351'],
+    ['Oceans (Where Feet May Fail)', 'Joel Houston, Matt Crocker, Salomon Ligthelm', '6428767'],
+    ['Way Maker', 'Osinachi Kalu Okoro Egbu', '7115744'],
+    ['Amazing Grace (My Chains Are Gone)', 'Chris Tomlin, Louie Giglio', '4768151'],
+    ['Amazing Grace', 'John Newton', '22025'],
+    ['What A Beautiful Name', 'Ben Fielding, Brooke Ligertwood', '7068424'],
+]
+
+def _scan(rows, song_title, matching=12):
+    '''
+    Looks up a title by scanning every row in order, as find_ccli did before the csv was indexed
+    '''
+    for row in rows:
+        if row[0].lower().strip() == song_title:
+            return f'{row[1]}. CCLI Song number: {row[2]}'
+    for row in rows:
+        name = row[0].lower().strip()
+        for start in range(len(name) - matching + 1):
+            if fuzzywuzzy.fuzz.partial_ratio(name[start:start + matching], song_title) > ccli.MATCH_SCORE:
+                return f'{row[1]}. CCLI Song number: {row[2]}'
+    return None
+
+def _write_csv(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        csv.writer(file).writerows(rows)
+
+@pytest.fixture
+def ccli_file(tmp_path, monkeypatch):
+    '''
+    Writes ROWS to a csv file, loaded into an index of the test's own. Returns the file's path
+    '''
+    monkeypatch.setattr(ccli, '_ccli_indexes', {})
+    path = str(tmp_path / 'ccli.csv')
+    _write_csv(path, ROWS)
+    return path
+
+@pytest.mark.parametrize('song_title', ['way maker', 'amazing grace', 'oceans', 'amazing grace (my chains',
+                                        'what a beautful name', 'bless the lord', 'wey maker', 'goodness of god',
+                                        '10,000 reasons', 'gr', ''])
+@pytest.mark.parametrize('matching', [12, 6])
+def test_lookup_matches_scanning_every_row(ccli_file, song_title, matching):
+    assert ccli.get_ccli_index(ccli_file).lookup(song_title, matching) == _scan(ROWS, song_title, matching)
+
+def test_first_lookup_loads_the_csv(ccli_file):
+    assert ccli.get_ccli_index(ccli_file).lookup('way maker') == 'Osinachi Kalu Okoro Egbu. CCLI Song number: 7115744'
+    assert ccli.get_ccli_index(ccli_file) is ccli.get_ccli_index(ccli_file)
+
+def test_edited_csv_is_loaded_again(ccli_file):
+    index = ccli.get_ccli_index(ccli_file)
+    assert index.lookup('goodness of god') is None
+
+    _write_csv(ccli_file, ROWS + [['Goodness Of God', 'Ed Cash, Jenn Johnson', '7117726']])
+    touch(ccli_file)
+
+    assert ccli.get_ccli_index(ccli_file) is not index
+    assert ccli.get_ccli_index(ccli_file).lookup('goodness of god') == 'Ed Cash, Jenn Johnson. CCLI Song number: 7117726'
+
+def test_find_ccli_many(ccli_file, monkeypatch):
+    monkeypatch.setenv('CCLI_NUM', '123456')
+    monkeypatch.setattr(ccli, 'scripts_folder', os.path.dirname(ccli_file))
+
+    messages = ccli.find_ccli_many(['Way Maker (live)', 'Goodness Of God', 'Way Maker (live)'])
+
+    assert messages == {'Way Maker (live)': 'Osinachi Kalu Okoro Egbu. CCLI Song number: 7115744',
+                        'Goodness Of God': 'CCLI Licence No: 123456'}
@@ -0,0 +1,24 @@
+import threading
+import time
+from fetch_stage import FetchStage
+
+def test_fetch_blocking_past_the_deadline_is_given_up_on(capsys):
+    release = threading.Event()
+    start = time.monotonic()
+
+    with FetchStage(deadline=0.2, limits={'genius': 1}) as stage:
+        hung = stage.submit('genius', release.wait, 10)
+        # Queued behind the hung fetch, so it only gets to start after the deadline
+        queued = stage.submit('genius', lambda: 'lyrics')
+
+        assert stage.result(hung, 'default', 'Fetching a song') == 'default'
+        assert stage.result(queued, 'default', 'Fetching another song') == 'default'
+
+    # Neither waiting for the results nor leaving the stage waits for the hung fetch
+    assert time.monotonic() - start < 2
+    assert not hung.done()
+    assert 'Fetching a song did not finish before the deadline' in capsys.readouterr().out
+
+    # Let the hung fetch finish, since the process waits for it before exiting
+    release.set()
+    hung.exception(timeout=5)
@@ -0,0 +1,86 @@
+import os
+import pytest
+from io import BytesIO
+from PIL import Image
+from pptx.util import Inches
+import image_assets
+from conftest import touch
+
+# 5 by 2.5 inches is shown with 720 by 360 pixels at 144 dpi
+WIDTH, HEIGHT = Inches(5), Inches(2.5)
+
+@pytest.fixture
+def cache_folder(tmp_path, monkeypatch):
+    '''
+    Keeps the prepared images and source hashes of a test in a cache folder of its own. Returns the folder
+    '''
+    monkeypatch.setattr(image_assets, 'cache_path', lambda name: str(tmp_path / 'cache' / name))
+    monkeypatch.setattr(image_assets, '_source_hashes', None)
+    monkeypatch.setattr(image_assets, '_dirty', False)
+    return tmp_path / 'cache'
+
+def _save_image(path, size, image_format='PNG'):
+    # Noise keeps the image from compressing to almost nothing, so scaling it down makes it smaller
+    image = Image.merge('RGB', [Image.effect_noise(size, 64) for _ in range(3)])
+    image.save(path, image_format)
+
+def _new_process(monkeypatch):
+    '''
+    Forgets the source hashes held in memory, as if the cache was next used by another run
+    '''
+    image_assets.save_source_hashes()
+    monkeypatch.setattr(image_assets, '_source_hashes', None)
+
+def _prepared_files(cache_folder):
+    return sorted(file for file in os.listdir(cache_folder / 'images') if file.endswith('.png'))
+
+def test_target_pixels():
+    assert image_assets.target_pixels(WIDTH, HEIGHT) == (720, 360)
+    assert image_assets.target_pixels(WIDTH, HEIGHT, dpi=72) == (360, 180)
+    assert image_assets.target_pixels(0, 0) == (1, 1)
+
+def test_first_run_without_a_cache(cache_folder, tmp_path):
+    _save_image(tmp_path / 'photo.png', (1000, 800))
+
+    with Image.open(image_assets.prepared_image(str(tmp_path / 'photo.png'), WIDTH, HEIGHT)) as prepared:
+        assert prepared.size == (720, 360)
+    assert len(_prepared_files(cache_folder)) == 1
+
+def test_unchanged_image_is_not_read_again(cache_folder, tmp_path, monkeypatch):
+    _save_image(tmp_path / 'photo.png', (1000, 800))
+    first = image_assets.prepared_image(str(tmp_path / 'photo.png'), WIDTH, HEIGHT).getvalue()
+    _new_process(monkeypatch)
+
+    def read_image(path):
+        raise AssertionError(f'{path} was read again')
+
+    monkeypatch.setattr(image_assets, '_read_image', read_image)
+    assert image_assets.prepared_image(str(tmp_path / 'photo.png'), WIDTH, HEIGHT).getvalue() == first
+
+def test_edited_image_is_prepared_again(cache_folder, tmp_path, monkeypatch):
+    _save_image(tmp_path / 'photo.png', (1000, 800))
+    image_assets.prepared_image(str(tmp_path / 'photo.png'), WIDTH, HEIGHT)
+    _new_process(monkeypatch)
+
+    _save_image(tmp_path / 'photo.png', (400, 300))
+    touch(tmp_path / 'photo.png')
+
+    with Image.open(image_assets.prepared_image(str(tmp_path / 'photo.png'), WIDTH, HEIGHT)) as prepared:
+        assert prepared.size == (400, 300)
+    assert len(_prepared_files(cache_folder)) == 2
+
+def test_each_size_is_prepared_separately(cache_folder, tmp_path):
+    _save_image(tmp_path / 'photo.png', (1000, 800))
+
+    image_assets.prepared_image(str(tmp_path / 'photo.png'), WIDTH, HEIGHT)
+    with Image.open(image_assets.prepared_image(str(tmp_path / 'photo.png'), WIDTH / 2, HEIGHT / 2)) as prepared:
+        assert prepared.size == (360, 180)
+    assert len(_prepared_files(cache_folder)) == 2
+
+def test_image_which_would_not_get_smaller_is_kept(cache_folder, tmp_path):
+    # The image fits its box, and as a png it would be larger than the jpeg it is
+    _save_image(tmp_path / 'small.jpg', (100, 100), 'JPEG')
+
+    prepared = image_assets.prepared_image(str(tmp_path / 'small.jpg'), WIDTH, HEIGHT)
+
+    assert prepared.getvalue() == (tmp_path / 'small.jpg').read_bytes()
@@ -0,0 +1,88 @@
+import os
+import shutil
+import pytest
+import lyric_search
+from conftest import touch
+
+SONGS = {
+    'Oceans': 'Oceans (Where Feet May Fail)\nCCLI Song # 1234\n[Verse 1]\nYou call me out upon the waters\n'
+              'The great unknown where feet may fail\n[Chorus]\nAnd I will call upon Your name\n',
+    'Diamonds': 'Diamonds\nCCLI Song # 5678\n[Verse 1]\nBeing held under the pressure\n'
+                "Don't know what'll be left\n",
+}
+
+@pytest.fixture
+def search(song_library, tmp_path, monkeypatch):
+    '''
+    Keeps the search table of a test in a cache of its own, over a Songs folder holding SONGS
+    '''
+    monkeypatch.setattr(lyric_search, 'songs_folder', song_library.songs_folder)
+    monkeypatch.setattr(lyric_search, 'cache_path', lambda name: str(tmp_path / 'cache' / name))
+    monkeypatch.setattr(lyric_search, '_index_checked', False)
+    for name, lyrics in SONGS.items():
+        _write_song(song_library, name, lyrics)
+    return lyric_search
+
+def _write_song(song_library, name, lyrics):
+    folder = os.path.join(song_library.songs_folder, name)
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, f'{name}_Lyrics.txt')
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(lyrics)
+    return path
+
+def test_first_run_without_a_search_table(search):
+    assert not os.path.exists(search.cache_path(search.DATABASE_FILE_NAME))
+
+    assert search.search_lyrics('call upon your') == [('Oceans', 'Chorus', 'And I will call upon Your name')]
+    assert search.update_search_index() == 0
+
+def test_every_word_must_be_on_the_line(search):
+    assert search.search_lyrics('feet fail') == [('Oceans', 'Verse 1', 'The great unknown where feet may fail')]
+    assert search.search_lyrics('feet waters') == []
+
+def test_last_word_is_a_prefix(search):
+    assert search.search_lyrics('under the pres') == [('Diamonds', 'Verse 1', 'Being held under the pressure')]
+
+def test_words_with_apostrophes(search):
+    assert search.search_lyrics("don't know") == [('Diamonds', 'Verse 1', "Don't know what'll be left")]
+    assert search.search_lyrics("what'll") == [('Diamonds', 'Verse 1', "Don't know what'll be left")]
+
+def test_titles_and_sections_are_not_searched(search):
+    assert search.search_lyrics('where feet') == [('Oceans', 'Verse 1', 'The great unknown where feet may fail')]
+    assert search.search_lyrics('oceans') == []
+    assert search.search_lyrics('chorus') == []
+
+def test_one_line_per_song(search):
+    # Both of Oceans' lines with "call" match, but only its best one is given
+    assert [name for name, _, _ in search.search_lyrics('call')] == ['Oceans']
+
+def test_query_without_words(search):
+    assert search.search_lyrics(' "-*" ') == []
+
+def test_edited_song_is_indexed_again(search, song_library):
+    search.update_search_index()
+
+    path = _write_song(song_library, 'Diamonds', 'Diamonds\nCCLI Song # 5678\n[Verse 1]\nShine like diamonds\n')
+    touch(path)
+
+    assert search.update_search_index(refresh=True) == 1
+    assert search.search_lyrics('pressure') == []
+    assert search.search_lyrics('shine') == [('Diamonds', 'Verse 1', 'Shine like diamonds')]
+    # The other song's lines are kept
+    assert search.search_lyrics('waters') == [('Oceans', 'Verse 1', 'You call me out upon the waters')]
+
+def test_removed_song_is_dropped(search, song_library):
+    search.update_search_index()
+
+    shutil.rmtree(os.path.join(song_library.songs_folder, 'Diamonds'))
+    touch(song_library.songs_folder)
+
+    assert search.update_search_index(refresh=True) == 0
+    assert search.search_lyrics('pressure') == []
+
+def test_unchanged_songs_are_not_indexed_again(search, song_library, monkeypatch):
+    search.update_search_index()
+    monkeypatch.setattr(song_library, '_song_index', None)
+
+    assert search.update_search_index() == 0
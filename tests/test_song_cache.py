@@ -0,0 +1,87 @@
+import os
+import pytest
+import song_cache
+from conftest import touch
+from song_parser import parse_song_file
+
+@pytest.fixture
+def lyrics_file(tmp_path, monkeypatch):
+    '''
+    Keeps the parsed songs of a test in a cache of its own. Returns the path of a lyrics file to parse
+    '''
+    monkeypatch.setattr(song_cache, 'cache_path', lambda name: str(tmp_path / name))
+    monkeypatch.setattr(song_cache, '_disk_cache', None)
+    monkeypatch.setattr(song_cache, '_dirty', False)
+    song_cache._load_parsed_song.cache_clear()
+
+    path = tmp_path / 'Oceans_Lyrics.txt'
+    path.write_text('Oceans\nCCLI Song # 1234\n[Verse 1]\nYou call me out upon the waters\n', encoding='utf-8')
+    return str(path)
+
+def _new_process(monkeypatch):
+    '''
+    Forgets the parsed songs held in memory, as if the cache was next used by another run
+    '''
+    song_cache.save_parsed_songs()
+    monkeypatch.setattr(song_cache, '_disk_cache', None)
+    song_cache._load_parsed_song.cache_clear()
+
+def _counting(parser, calls):
+    def counted(path, max_lines):
+        calls.append(path)
+        return parser(path, max_lines)
+    return counted
+
+def test_first_run_without_a_cache_file(lyrics_file):
+    calls = []
+    parser = _counting(parse_song_file, calls)
+
+    parsed = song_cache.load_parsed_song(lyrics_file, 4, parser)
+
+    assert parsed == parse_song_file(lyrics_file, 4)
+    assert song_cache.load_parsed_song(lyrics_file, 4, parser) is parsed
+    assert len(calls) == 1
+    # The cache file is only written once, when the run ends
+    assert not os.path.exists(song_cache.cache_path(song_cache.CACHE_FILE_NAME))
+    song_cache.save_parsed_songs()
+    assert os.path.exists(song_cache.cache_path(song_cache.CACHE_FILE_NAME))
+
+def test_unchanged_song_is_not_parsed_again(lyrics_file, monkeypatch):
+    song_cache.load_parsed_song(lyrics_file, 4, parse_song_file)
+    _new_process(monkeypatch)
+
+    def parser(path, max_lines):
+        raise AssertionError(f'{path} was parsed again')
+
+    assert song_cache.load_parsed_song(lyrics_file, 4, parser) == parse_song_file(lyrics_file, 4)
+
+def test_edited_song_is_parsed_again(lyrics_file, monkeypatch):
+    song_cache.load_parsed_song(lyrics_file, 4, parse_song_file)
+    _new_process(monkeypatch)
+
+    with open(lyrics_file, 'a', encoding='utf-8') as file:
+        file.write('And there I find You in the mystery\n')
+    touch(lyrics_file)
+
+    parsed = song_cache.load_parsed_song(lyrics_file, 4, parse_song_file)
+    assert parsed == parse_song_file(lyrics_file, 4)
+    assert 'mystery' in parsed[2][0][1]
+
+def test_each_max_lines_is_parsed_separately(lyrics_file):
+    calls = []
+    parser = _counting(parse_song_file, calls)
+
+    song_cache.load_parsed_song(lyrics_file, 4, parser)
+    song_cache.load_parsed_song(lyrics_file, 2, parser)
+
+    assert len(calls) == 2
+
+def test_unreadable_cache_file_is_ignored(lyrics_file):
+    with open(song_cache.cache_path(song_cache.CACHE_FILE_NAME), 'wb') as file:
+        file.write(b'not a pickle')
+
+    assert song_cache.load_parsed_song(lyrics_file, 4, parse_song_file) == parse_song_file(lyrics_file, 4)
+
+def test_missing_file(lyrics_file):
+    with pytest.raises(FileNotFoundError):
+        song_cache.load_parsed_song(lyrics_file + '.missing', 4, parse_song_file)
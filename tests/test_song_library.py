@@ -0,0 +1,86 @@
+import os
+import pytest
+from conftest import touch
+
+def _write_song(song_library, folder_name, title, file_name=None):
+    '''
+    Writes a lyrics file with one verse into a song folder, making the folder if needed. Returns the file's path
+    '''
+    folder = os.path.join(song_library.songs_folder, folder_name)
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, file_name or f'{folder_name}_Lyrics.txt')
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(f'{title}\nCCLI Song # 1234\n[Verse 1]\nA line of {title}\n')
+    return path
+
+def _new_process(song_library, monkeypatch):
+    '''
+    Forgets the index held in memory, as if the index was next used by another run
+    '''
+    monkeypatch.setattr(song_library, '_song_index', None)
+
+def test_first_run_without_an_index(song_library):
+    _write_song(song_library, 'Amazing Grace', 'Amazing Grace (My Chains Are Gone)')
+    _write_song(song_library, 'Oceans', 'Oceans (Where Feet May Fail)')
+
+    assert song_library.get_song_names() == {'Amazing Grace', 'Oceans'}
+    assert song_library.get_song_entry(' amazing grace ')['header_title'] == 'Amazing Grace (My Chains Are Gone)'
+    assert os.path.exists(song_library.cache_path(song_library.INDEX_FILE_NAME))
+
+def test_unchanged_songs_are_not_read_again(song_library, monkeypatch):
+    _write_song(song_library, 'Oceans', 'Oceans (Where Feet May Fail)')
+    song_library.get_song_names()
+    _new_process(song_library, monkeypatch)
+
+    def read_header(lyrics_path):
+        raise AssertionError(f'{lyrics_path} was read again')
+
+    monkeypatch.setattr(song_library, '_read_header', read_header)
+    assert song_library.get_song_entry('Oceans')['header_title'] == 'Oceans (Where Feet May Fail)'
+
+def test_edited_song_is_read_again(song_library, monkeypatch):
+    path = _write_song(song_library, 'Oceans', 'Oceans')
+    song_library.get_song_names()
+    _new_process(song_library, monkeypatch)
+
+    _write_song(song_library, 'Oceans', 'Oceans (Where Feet May Fail)')
+    touch(path)
+
+    assert song_library.get_song_entry('Oceans')['header_title'] == 'Oceans (Where Feet May Fail)'
+
+def test_added_and_removed_songs(song_library, monkeypatch):
+    _write_song(song_library, 'Oceans', 'Oceans')
+    song_library.get_song_names()
+
+    _write_song(song_library, 'Way Maker', 'Way Maker')
+    touch(song_library.songs_folder)
+    # A song added during a run is found by refreshing the index once
+    assert song_library.get_lyrics_path('way maker') == os.path.join(song_library.songs_folder, 'Way Maker',
+                                                                     'Way Maker_Lyrics.txt')
+
+    os.remove(os.path.join(song_library.songs_folder, 'Oceans', 'Oceans_Lyrics.txt'))
+    os.rmdir(os.path.join(song_library.songs_folder, 'Oceans'))
+    touch(song_library.songs_folder)
+    _new_process(song_library, monkeypatch)
+    assert song_library.get_song_names() == {'Way Maker'}
+    assert song_library.get_lyrics_path('Oceans') is None
+
+@pytest.mark.parametrize('file_names, lyrics_file', [
+    (['Oceans_Lyrics.txt', 'Oceans_Lyrics.zh-cn.txt'], 'Oceans_Lyrics.txt'),
+    (['oceans_lyrics.txt'], 'oceans_lyrics.txt'),
+    (['Notes.txt', 'Old Name_Lyrics.txt'], 'Old Name_Lyrics.txt'),
+    (['Oceans_Lyrics.zh-cn.txt'], None),
+])
+def test_lyrics_file_in_song_folder(song_library, file_names, lyrics_file):
+    for file_name in file_names:
+        _write_song(song_library, 'Oceans', 'Oceans', file_name)
+
+    assert song_library.get_song_index()['Oceans']['lyrics_file'] == lyrics_file
+    assert song_library.get_song_names() == ({'Oceans'} if lyrics_file else set())
+
+def test_outdated_index_file_is_ignored(song_library):
+    with open(song_library.cache_path(song_library.INDEX_FILE_NAME), 'w', encoding='utf-8') as file:
+        file.write('{"version": 0, "songs": {"Gone": {}}}')
+    _write_song(song_library, 'Oceans', 'Oceans')
+
+    assert song_library.get_song_names() == {'Oceans'}
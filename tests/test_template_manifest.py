@@ -0,0 +1,147 @@
+import os
+import pytest
+from io import BytesIO
+from PIL import Image
+from pptx import Presentation
+from pptx.util import Inches
+import template_cache
+import template_manifest
+from conftest import touch
+
+FIELDS = {'mtime', 'size', 'sha256', 'slide_width', 'slide_height', 'blank_layout', 'blank_layout_name',
+          'theme_colours', 'media_bytes', 'font_profile'}
+
+@pytest.fixture
+def manifest_cache(tmp_path, monkeypatch):
+    '''
+    Keeps the manifest of a test in a cache folder of its own
+    '''
+    monkeypatch.setattr(template_manifest, 'cache_path', lambda name: str(tmp_path / name))
+    monkeypatch.setattr(template_manifest, '_template_manifest', None)
+    monkeypatch.setattr(template_cache, '_template_bytes', {})
+    return template_manifest
+
+@pytest.fixture
+def templates(manifest_cache, tmp_path, monkeypatch):
+    '''
+    Points the manifest at an empty Templates folder. Returns the folder
+    '''
+    folder = tmp_path / 'Templates'
+    folder.mkdir()
+    monkeypatch.setattr(template_cache, 'templates_folder', str(folder))
+    monkeypatch.setattr(template_manifest, 'templates_folder', str(folder))
+    return folder
+
+def _save_template(path, width=Inches(10), picture=False):
+    '''
+    Saves python-pptx's default presentation as a template, optionally with a picture on a slide
+    '''
+    prs = Presentation()
+    prs.slide_width = width
+    if picture:
+        image = BytesIO()
+        Image.new('RGB', (64, 64), 'red').save(image, 'PNG')
+        prs.slides.add_slide(prs.slide_layouts[6]).shapes.add_picture(image, 0, 0)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    prs.save(path)
+
+def _new_process(monkeypatch):
+    '''
+    Forgets the manifest and templates held in memory, as if the manifest was next used by another run
+    '''
+    monkeypatch.setattr(template_manifest, '_template_manifest', None)
+    monkeypatch.setattr(template_cache, '_template_bytes', {})
+
+def _not_read(path, signature):
+    raise AssertionError(f'{path} was read again')
+
+def test_first_run_without_a_manifest(templates):
+    _save_template(templates / 'Small' / 'small_1.pptx', picture=True)
+    _save_template(templates / 'Large' / 'large_1.pptx', width=Inches(13.333))
+
+    manifest = template_manifest.get_template_manifest()
+
+    assert set(manifest) == {os.path.join('Small', 'small_1.pptx'), os.path.join('Large', 'large_1.pptx')}
+    small, large = manifest[os.path.join('Small', 'small_1.pptx')], manifest[os.path.join('Large', 'large_1.pptx')]
+    assert set(small) == set(large) == FIELDS
+    assert (small['slide_width'], large['slide_width'], small['slide_height']) == (Inches(10), Inches(13.333), Inches(7.5))
+    assert (small['blank_layout'], small['blank_layout_name']) == (6, 'Blank')
+    assert small['theme_colours']['accent1'] == '4F81BD' and small['theme_colours']['dk1'] == '000000'
+    assert small['media_bytes'] > 0 and large['media_bytes'] == 0
+    assert (small['font_profile'], large['font_profile']) == ('small', 'large')
+    assert os.path.exists(template_manifest.cache_path(template_manifest.MANIFEST_FILE_NAME))
+
+def test_unchanged_templates_are_not_read_again(templates, monkeypatch):
+    _save_template(templates / 'small_1.pptx')
+    manifest = dict(template_manifest.get_template_manifest())
+    _new_process(monkeypatch)
+
+    monkeypatch.setattr(template_manifest, '_read_template', _not_read)
+    assert template_manifest.get_template_manifest() == manifest
+
+def test_template_only_touched_is_hashed(templates, monkeypatch):
+    '''
+    A fresh checkout gives every template a new modified time without changing it
+    '''
+    _save_template(templates / 'small_1.pptx')
+    entry = dict(template_manifest.get_template_manifest()['small_1.pptx'])
+    _new_process(monkeypatch)
+
+    touch(templates / 'small_1.pptx')
+    monkeypatch.setattr(template_manifest, '_read_template', _not_read)
+
+    touched = template_manifest.get_template_manifest()['small_1.pptx']
+    assert touched['mtime'] == os.stat(templates / 'small_1.pptx').st_mtime_ns != entry['mtime']
+    assert {**touched, 'mtime': entry['mtime']} == entry
+
+def test_edited_template_is_read_again(templates, monkeypatch):
+    _save_template(templates / 'small_1.pptx')
+    template_manifest.get_template_manifest()
+    _new_process(monkeypatch)
+
+    _save_template(templates / 'small_1.pptx', width=Inches(13.333), picture=True)
+    touch(templates / 'small_1.pptx')
+
+    entry = template_manifest.get_template_manifest()['small_1.pptx']
+    assert entry['slide_width'] == Inches(13.333)
+    assert entry['media_bytes'] > 0
+
+def test_added_and_removed_templates(templates):
+    _save_template(templates / 'small_1.pptx')
+    template_manifest.get_template_manifest()
+
+    _save_template(templates / 'med_1.pptx')
+    os.remove(templates / 'small_1.pptx')
+
+    assert set(template_manifest.get_template_manifest()) == {'med_1.pptx'}
+    assert template_manifest.choose_template() == (template_manifest.template_path('med_1.pptx'),
+                                                   template_manifest.get_template_manifest()['med_1.pptx'])
+
+def test_no_templates(templates):
+    with pytest.raises(FileNotFoundError):
+        template_manifest.choose_template()
+
+@pytest.mark.parametrize('layout_names, index', [
+    ([f'Layout {number}' for number in range(11)], 6),
+    (['Title Slide', 'Blank'], 1),
+    (['Only Layout'], 0),
+    (['Title Slide', 'Title Only'], None),
+])
+def test_blank_layout_index(layout_names, index):
+    assert template_manifest._blank_layout_index(layout_names) == index
+
+def test_manifest_agrees_with_python_pptx(manifest_cache):
+    '''
+    The entries read from each template's zip file describe the presentation python-pptx makes from it
+    '''
+    manifest = template_manifest.get_template_manifest()
+    assert manifest
+
+    for name, entry in manifest.items():
+        assert set(entry) == FIELDS
+        prs = template_cache.load_template(template_manifest.template_path(name))
+        assert (entry['slide_width'], entry['slide_height']) == (prs.slide_width, prs.slide_height)
+        assert entry['blank_layout'] == template_manifest.blank_layout_index(prs)
+        assert entry['blank_layout_name'] == prs.slide_layouts[entry['blank_layout']].name
+        assert entry['font_profile'] == template_manifest.font_profile(name)
+        assert entry['theme_colours']
@@ -0,0 +1,108 @@
+import pytest
+import translation_backends
+from translation_backends import BACKENDS, LineCountError
+from slide_builders import Song, translate_song_lyrics
+
+# Part of a section of "Diamonds" read with max_lines=2, which has a blank line in it
+SECTION_WITH_BLANK_LINE = "(Oh-oh-oh-oh-oh-oh-oh-oh)\n\nBeing held under the pressure\nDon't know what'll be left\n"
+
+def test_stub_translates_only_non_empty_lines():
+    translated = BACKENDS['stub'].translate([SECTION_WITH_BLANK_LINE], "Chinese (Simplified)")
+
+    assert translated == ["[zh-CN] (Oh-oh-oh-oh-oh-oh-oh-oh)\n[zh-CN] Being held under the pressure\n"
+                          "[zh-CN] Don't know what'll be left"]
+
+def test_stub_song_lines_stay_paired(translation_cache, monkeypatch):
+    monkeypatch.setenv('SONG_TRANSLATION_BACKEND', 'stub')
+    song = Song('Diamonds\n', '', [['Verse 1', "Here and now I'm in the fire\nIn above my head\n"],
+                                   ['Verse 1', SECTION_WITH_BLANK_LINE]])
+
+    lyric_slides = translate_song_lyrics(song)
+
+    assert [translated for translated, _ in lyric_slides] == [False] * 5
+    for _, text in lyric_slides:
+        line, translated_line = text.split('\n')
+        assert translated_line == f'[zh-CN] {line}'
+
+def _gemini_answering(monkeypatch, answers):
+    '''
+    Makes Gemini give each of answers in turn, where an answer is a list of (line, translation)
+    '''
+    requests = []
+
+    def request_gemini_translation(text, language, source_language):
+        requests.append(text)
+        return '\n'.join(f'{line}\n{translation}' for line, translation in answers.pop(0))
+
+    monkeypatch.setattr(translation_backends, 'request_gemini_translation', request_gemini_translation)
+    return requests
+
+def test_gemini_single_text_with_merged_lines_raises(monkeypatch):
+    _gemini_answering(monkeypatch, [[('Amazing grace how sweet the sound', '奇异恩典 何等甘甜')]])
+
+    with pytest.raises(LineCountError):
+        BACKENDS['gemini'].translate(["Amazing grace\nHow sweet the sound"], "Chinese (Simplified)")
+
+def test_gemini_texts_are_translated_one_by_one_when_lines_are_merged(monkeypatch):
+    requests = _gemini_answering(monkeypatch, [[('Amazing grace how sweet the sound', '奇异恩典 何等甘甜'), ('That saved', '救了')],
+                                               [('Amazing grace', '奇异恩典'), ('How sweet the sound', '何等甘甜')],
+                                               [('That saved', '救了')]])
+
+    translated = BACKENDS['gemini'].translate(["Amazing grace\nHow sweet the sound", "That saved"], "Chinese (Simplified)")
+
+    assert translated == ['奇异恩典\n何等甘甜', '救了']
+    assert len(requests) == 3
+
+def test_mismatched_gemini_translation_is_not_cached(translation_cache, monkeypatch):
+    monkeypatch.setenv('SONG_TRANSLATION_BACKEND', 'gemini')
+    monkeypatch.setenv('TRANSLATION_BACKEND', 'stub')
+    _gemini_answering(monkeypatch, [[('Amazing grace how sweet the sound', '奇异恩典 何等甘甜')]])
+    song = Song('Amazing Grace\n', '', [['Verse 1', "Amazing grace\nHow sweet the sound\n"]])
+
+    lyric_slides = translate_song_lyrics(song)
+
+    # Google translate (here the stub) is used for the song instead, and nothing from Gemini is kept
+    assert lyric_slides == [(True, "Amazing grace\n[zh-CN] Amazing grace\nHow sweet the sound\n[zh-CN] How sweet the sound")]
+    assert translation_cache.translation_cache_stats()['gemini'] == {'hits': 0, 'misses': 1}
+    assert translation_cache._get_connection().execute("SELECT COUNT(*) FROM translations WHERE engine = 'gemini'").fetchone() == (0,)
+
+class _Translator:
+    '''
+    Stands in for deep_translator's GoogleTranslator, giving each of answers in turn
+    '''
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.requests = []
+
+    def translate(self, text):
+        self.requests.append(text)
+        return self.answers.pop(0)
+
+def _google_answering(monkeypatch, answers):
+    translator = _Translator(answers)
+    monkeypatch.setattr(BACKENDS['google'], '_translator', lambda target: translator)
+    return translator
+
+def test_google_blank_lines_in_the_answer_are_dropped(monkeypatch):
+    _google_answering(monkeypatch, ['奇异恩典\n\n何等甘甜\n'])
+
+    assert BACKENDS['google'].translate(["Amazing grace\n\nHow sweet the sound"], "Chinese (Simplified)") == ['奇异恩典\n何等甘甜']
+
+def test_google_merged_lines_are_translated_one_by_one(monkeypatch):
+    translator = _google_answering(monkeypatch, ['奇异恩典 何等甘甜\n救了', '奇异恩典 何等甘甜', '奇异恩典', '何等甘甜', '救了'])
+
+    translated = BACKENDS['google'].translate(["Amazing grace\nHow sweet the sound", "That saved"], "Chinese (Simplified)")
+
+    assert translated == ['奇异恩典\n何等甘甜', '救了']
+    # The batch, then each text, then each line of a text whose lines were still merged
+    assert translator.requests == ["Amazing grace\nHow sweet the sound\nThat saved", "Amazing grace\nHow sweet the sound",
+                                   'Amazing grace', 'How sweet the sound', 'That saved']
+
+def test_google_empty_translation_raises_and_is_not_cached(translation_cache, monkeypatch):
+    monkeypatch.setenv('TRANSLATION_BACKEND', 'google')
+    _google_answering(monkeypatch, [''])
+
+    with pytest.raises(LineCountError):
+        translation_backends.translate_texts(["Amazing grace"], "Chinese (Simplified)")
+    assert translation_cache._get_connection().execute('SELECT COUNT(*) FROM translations').fetchone() == (0,)